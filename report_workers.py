@@ -0,0 +1,80 @@
+"""Chart rendering for the item-level PDF appendix, run in worker processes.
+
+Kept out of stats_app.py so a spawned worker imports only this module and
+never executes the Streamlit script. Everything here is a plain function of
+picklable inputs returning image bytes.
+"""
+import threading
+from io import BytesIO
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.ticker import AutoLocator, ScalarFormatter
+
+# One set of axes per thread (a worker process has one; the in-process
+# fallback may have several) and chart size, reused between charts: building
+# a Figure, its axes and tick artists costs more than drawing a small bar
+# chart, so only the bars, ticks and limits change per item
+_local = threading.local()
+
+
+def reusable_bar_axes(size):
+    if not hasattr(_local, "axes"):
+        _local.axes = {}
+    ax = _local.axes.get(size)
+    if ax is None:
+        figure = Figure(figsize=size)
+        ax = _local.axes[size] = figure.add_axes((0.16, 0.2, 0.8, 0.72))
+        ax.set_ylabel("Frequency", fontsize=7)
+        ax.tick_params(labelsize=6)
+        ax.grid(True, axis="y", alpha=0.3)
+    for bars in list(ax.collections):
+        bars.remove()
+    ax.xaxis.set_major_locator(AutoLocator())
+    ax.xaxis.set_major_formatter(ScalarFormatter())
+    return ax
+
+
+def bar_width(values):
+    gaps = np.diff(values)
+    return 0.8 * gaps.min() if gaps.size else 0.8
+
+
+def plot_item_bars(ax, values, counts, color):
+    # All bars as one collection with explicit limits: Axes.bar() adds a
+    # patch per bar and re-derives the data limits from each
+    width = bar_width(values)
+    left, right, zero = values - width / 2, values + width / 2, np.zeros_like(counts)
+    corners = ((left, zero), (left, counts), (right, counts), (right, zero))
+    bars = np.stack([np.column_stack(corner) for corner in corners], axis=1)
+    ax.add_collection(
+        PolyCollection(bars, facecolors=color, edgecolors="black", linewidths=0.5, alpha=0.8),
+        autolim=False,
+    )
+    ax.set_xlim(values[0] - width, values[-1] + width)
+    ax.set_ylim(0, max(counts.max(), 1) * 1.05)
+    if values.size <= 15:
+        ax.set_xticks(values, [f"{v:g}" for v in values])
+
+
+def item_bar_chart(values, counts, color, size, dpi, chart_format="png", jpeg_quality=80):
+    """PNG (or JPEG) bytes of a frequency bar chart for one item."""
+    ax = reusable_bar_axes(tuple(size))
+    plot_item_bars(
+        ax, np.asarray(values, dtype=float), np.asarray(counts, dtype=float), color
+    )
+    image = BytesIO()
+    if chart_format == "jpeg":
+        ax.figure.savefig(
+            image,
+            format="jpeg",
+            dpi=dpi,
+            facecolor="white",
+            pil_kwargs={"quality": jpeg_quality, "optimize": True},
+        )
+    else:
+        ax.figure.savefig(image, format="png", dpi=dpi, facecolor="white")
+    return image.getvalue()
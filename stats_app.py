@@ -1,24 +1,64 @@
 import base64
+import gzip
+import hashlib
+import json
+import lzma
+import multiprocessing
+import os
+import platform
+import shutil
+import site
+import sys
+import threading
+import time
+import types
+import uuid
+import warnings
+import weakref
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from importlib.metadata import version as package_version
 from io import BytesIO
 from pathlib import Path
+from tempfile import SpooledTemporaryFile
 from PIL import Image
 
 # Set matplotlib backend before importing pyplot (important for Streamlit Cloud)
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend for server environments
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
 import numpy as np
 import pandas as pd
 import streamlit as st
+from reportlab import rl_config
+from reportlab.graphics import renderPDF
+from reportlab.graphics.shapes import Circle, Drawing, Group, Line, PolyLine, Polygon, Rect, String
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.lib.units import inch
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Image as RLImage
-from scipy import stats
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import (
+    Flowable,
+    KeepTogether,
+    PageBreak,
+    Paragraph,
+    SimpleDocTemplate,
+    Spacer,
+    Table,
+    TableStyle,
+)
+from scipy import optimize, special, stats
 from scipy.stats import shapiro
 
+import report_workers
+
 # ---------------------------------------------------------
 # Page configuration
 # ---------------------------------------------------------
@@ -78,6 +118,89 @@ LANG_OPTIONS = {
         "error_loading": "Gagal memuat dataset. Periksa format file Anda.",
         "reco_pearson": "Gunakan Pearson correlation karena X_total dan Y_total memenuhi asumsi normalitas (p ≥ 0.05).",
         "reco_spearman": "Gunakan Spearman correlation karena setidaknya salah satu variabel tidak normal dan/atau berskala ordinal.",
+        "chart_mode_label": "Tampilan grafik",
+        "chart_mode_static": "Gambar statis (server)",
+        "chart_mode_interactive": "Interaktif (browser)",
+        "scatter_bin_label": "Kelompokkan scatter plot di atas n =",
+        "parsing_dataset": "Memproses dataset di latar belakang…",
+        "pdf_building": "Menyusun laporan PDF…",
+        "pdf_failed": "Gagal menyusun laporan PDF",
+        "reliability_title": "Reliabilitas Skala",
+        "reliability_unavailable": "Reliabilitas membutuhkan minimal 2 item dan 3 respons lengkap.",
+        "scoring_options": "Opsi penskoran",
+        "scoring_method": "Skor komposit",
+        "scale_min": "Nilai minimum skala",
+        "scale_max": "Nilai maksimum skala",
+        "reverse_items": "Item berkode terbalik",
+        "min_answered": "Minimum item terjawab",
+        "construct_title": "7. Matriks Korelasi Konstruk",
+        "construct_define": "Definisikan konstruk",
+        "construct_count": "Jumlah konstruk",
+        "construct_name": "Nama",
+        "construct_items": "Item",
+        "construct_hint": "Definisikan minimal dua konstruk untuk menghitung matriks korelasi.",
+        "construct_duplicate": "Nama konstruk ganda (entri berikutnya dilewati)",
+        "grouped_title": "Analisis per Kelompok",
+        "group_by": "Kelompokkan menurut",
+        "too_many_groups": "Terlalu banyak kelompok",
+        "p_adjust_label": "Koreksi perbandingan berganda",
+        "partial_title": "Korelasi Parsial",
+        "covariates": "Kendalikan (kovariat)",
+        "partial_matrix": "Matriks korelasi parsial lengkap",
+        "regression_title": "Regresi Linear: Y_total atas X_total",
+        "residual_plot": "Residual vs Nilai Prediksi",
+        "summary_title": "Ringkasan Inkremental (survei berjalan)",
+        "summary_resume": "Lanjutkan dari ringkasan tersimpan (JSON)",
+        "summary_meta_mismatch": "Ringkasan tersimpan diberi skor dengan cara berbeda",
+        "summary_invalid": "File ringkasan tidak valid",
+        "summary_save": "Simpan ringkasan (JSON)",
+        "sketch_threshold_label": "Perkiraan kuantil di atas n =",
+        "sketch_epsilon_label": "Batas galat peringkat kuantil (ε)",
+        "sketch_note": "Median dan kuartil diperkirakan dengan quantile sketch",
+        "sketch_achieved": "galat peringkat tercapai",
+        "sketch_spearman_note": "Peringkat Spearman diperkirakan dengan quantile sketch",
+        "item_association_title": "Hubungan Tingkat Item",
+        "association_skipped": "Dilewati (lebih dari {0} nilai berbeda)",
+        "association_pair": "Tabulasi silang",
+        "weight_label": "Bobot survei",
+        "weight_none": "Tidak ada (tanpa bobot)",
+        "weighted_note": "Dibobot dengan",
+        "effective_n": "N efektif",
+        "quality_title": "Kualitas Responden",
+        "quality_max_missing": "Rasio kosong maksimum",
+        "quality_max_run": "Deret jawaban identik maksimum",
+        "quality_alpha": "α Mahalanobis",
+        "quality_count": "Responden",
+        "quality_exclude": "Keluarkan responden yang ditandai dari analisis",
+        "quality_excluded": "Responden yang ditandai dikeluarkan",
+        "missing_strategy": "Jawaban kosong",
+        "missing_report": "Penanganan data kosong",
+        "em_corr": "Matriks korelasi item (EM)",
+        "archive_mode": "Arsip ini berisi beberapa file",
+        "archive_separate": "Buka satu file",
+        "archive_stacked": "Gabungkan semua file sebagai gelombang",
+        "archive_member": "File",
+        "waves_title": "8. Perbandingan Gelombang",
+        "waves_upload": "Unggah gelombang berikutnya (kuesioner yang sama)",
+        "waves_missing": "kolom tidak ditemukan",
+        "waves_wave": "Gelombang",
+        "waves_deltas": "Perubahan antargelombang",
+        "waves_hint": "Unggah minimal satu gelombang lagi untuk membandingkan.",
+        "waves_duplicate": "data sama dengan",
+        "waves_unadjusted": "Statistik gelombang tidak dibobot dan memakai semua responden, sehingga baris pertama bisa berbeda dari Bagian 3–5 (bobot survei dan pengecualian responden tidak diterapkan pada gelombang).",
+        "pdf_chart_format": "Format grafik",
+        "pdf_chart_dpi": "Resolusi raster (DPI)",
+        "pdf_chart_vector": "Vektor (tajam di setiap zoom)",
+        "pdf_chart_png": "PNG (raster tanpa kompresi lossy)",
+        "pdf_chart_jpeg": "JPEG (raster terkompresi)",
+        "pdf_item_appendix": "Sertakan lampiran per item (deskriptif, frekuensi, dan grafik per item)",
+        "pdf_appendix_title": "Lampiran: Statistik per Item",
+        "bundle_title": "9. Paket Hasil",
+        "bundle_format": "Format",
+        "bundle_zip": "JSON + CSV (zip)",
+        "bundle_xlsx": "Workbook Excel (satu sheet per tabel)",
+        "bundle_download": "Unduh paket hasil",
+        "archive_empty": "File zip ini tidak berisi file CSV atau Excel.",
     },
     "en": {
         "label": "English",
@@ -125,6 +248,89 @@ LANG_OPTIONS = {
         "error_loading": "Failed to load dataset. Please check your file format.",
         "reco_pearson": "Use Pearson correlation because X_total and Y_total meet normality (p ≥ 0.05).",
         "reco_spearman": "Use Spearman correlation because at least one variable is non-normal and/or ordinal.",
+        "chart_mode_label": "Chart rendering",
+        "chart_mode_static": "Static image (server)",
+        "chart_mode_interactive": "Interactive (browser)",
+        "scatter_bin_label": "Bin scatter plots above n =",
+        "parsing_dataset": "Parsing dataset in the background…",
+        "pdf_building": "Building PDF report…",
+        "pdf_failed": "Failed to build the PDF report",
+        "reliability_title": "Scale Reliability",
+        "reliability_unavailable": "Reliability needs at least 2 items and 3 complete responses.",
+        "scoring_options": "Scoring options",
+        "scoring_method": "Composite score",
+        "scale_min": "Scale minimum",
+        "scale_max": "Scale maximum",
+        "reverse_items": "Reverse-coded items",
+        "min_answered": "Minimum answered items",
+        "construct_title": "7. Construct Correlation Matrix",
+        "construct_define": "Define constructs",
+        "construct_count": "Number of constructs",
+        "construct_name": "Name",
+        "construct_items": "Items",
+        "construct_hint": "Define at least two constructs to compute the correlation matrix.",
+        "construct_duplicate": "Duplicate construct names (later entries skipped)",
+        "grouped_title": "Grouped Analysis",
+        "group_by": "Group by",
+        "too_many_groups": "Too many groups",
+        "p_adjust_label": "Multiple-comparison correction",
+        "partial_title": "Partial Correlation",
+        "covariates": "Control for (covariates)",
+        "partial_matrix": "Full partial correlation matrix",
+        "regression_title": "Linear Regression: Y_total on X_total",
+        "residual_plot": "Residuals vs Fitted",
+        "summary_title": "Incremental Summary (live surveys)",
+        "summary_resume": "Resume from a saved summary (JSON)",
+        "summary_meta_mismatch": "The saved summary was scored differently",
+        "summary_invalid": "Invalid summary file",
+        "summary_save": "Save summary (JSON)",
+        "sketch_threshold_label": "Approximate quantiles above n =",
+        "sketch_epsilon_label": "Quantile rank error bound (ε)",
+        "sketch_note": "Median and quartiles are approximated with a quantile sketch",
+        "sketch_achieved": "achieved rank error",
+        "sketch_spearman_note": "Spearman ranks approximated with a quantile sketch",
+        "item_association_title": "Item-level Association",
+        "association_skipped": "Skipped (more than {0} distinct values)",
+        "association_pair": "Crosstab",
+        "weight_label": "Survey weights",
+        "weight_none": "None (unweighted)",
+        "weighted_note": "Weighted by",
+        "effective_n": "effective N",
+        "quality_title": "Respondent Quality",
+        "quality_max_missing": "Max missing ratio",
+        "quality_max_run": "Max identical run",
+        "quality_alpha": "Mahalanobis α",
+        "quality_count": "Respondents",
+        "quality_exclude": "Exclude flagged respondents from the analysis",
+        "quality_excluded": "Flagged respondents excluded",
+        "missing_strategy": "Missing answers",
+        "missing_report": "Missing data handling",
+        "em_corr": "EM item correlation matrix",
+        "archive_mode": "This archive contains several files",
+        "archive_separate": "Open one file",
+        "archive_stacked": "Stack all files as waves",
+        "archive_member": "File",
+        "waves_title": "8. Wave Comparison",
+        "waves_upload": "Upload later waves (same questionnaire)",
+        "waves_missing": "missing columns",
+        "waves_wave": "Wave",
+        "waves_deltas": "Wave-over-wave changes",
+        "waves_hint": "Upload at least one more wave to compare.",
+        "waves_duplicate": "same data as",
+        "waves_unadjusted": "Wave statistics are unweighted and use every respondent, so the first row can differ from Sections 3–5 (survey weights and the respondent exclusion are not applied to the waves).",
+        "pdf_chart_format": "Chart format",
+        "pdf_chart_dpi": "Raster resolution (DPI)",
+        "pdf_chart_vector": "Vector (sharp at any zoom)",
+        "pdf_chart_png": "PNG (lossless raster)",
+        "pdf_chart_jpeg": "JPEG (compressed raster)",
+        "pdf_item_appendix": "Include item-level appendix (descriptives, frequencies and a chart per item)",
+        "pdf_appendix_title": "Appendix: Item-level Statistics",
+        "bundle_title": "9. Results Bundle",
+        "bundle_format": "Format",
+        "bundle_zip": "JSON + CSV (zip)",
+        "bundle_xlsx": "Excel workbook (one sheet per table)",
+        "bundle_download": "Download results bundle",
+        "archive_empty": "This zip file contains no CSV or Excel file.",
     },
     "zh": {
         "label": "中文",
@@ -172,6 +378,89 @@ LANG_OPTIONS = {
         "error_loading": "加载数据集失败。请检查文件格式。",
         "reco_pearson": "当 X_total 和 Y_total 满足正态性假设 (p ≥ 0.05) 时，推荐使用皮尔逊相关。",
         "reco_spearman": "当至少一个变量不满足正态性且/或为有序尺度时，推荐使用斯皮尔曼相关。",
+        "chart_mode_label": "图表渲染方式",
+        "chart_mode_static": "静态图片（服务器）",
+        "chart_mode_interactive": "交互式（浏览器）",
+        "scatter_bin_label": "散点图分箱阈值 n >",
+        "parsing_dataset": "正在后台解析数据集…",
+        "pdf_building": "正在生成 PDF 报告…",
+        "pdf_failed": "生成 PDF 报告失败",
+        "reliability_title": "量表信度",
+        "reliability_unavailable": "信度分析至少需要 2 个题项和 3 份完整回答。",
+        "scoring_options": "计分选项",
+        "scoring_method": "综合得分",
+        "scale_min": "量表最小值",
+        "scale_max": "量表最大值",
+        "reverse_items": "反向计分题项",
+        "min_answered": "最少作答题项数",
+        "construct_title": "7. 构念相关矩阵",
+        "construct_define": "定义构念",
+        "construct_count": "构念数量",
+        "construct_name": "名称",
+        "construct_items": "题项",
+        "construct_hint": "至少定义两个构念才能计算相关矩阵。",
+        "construct_duplicate": "构念名称重复（后面的条目已跳过）",
+        "grouped_title": "分组分析",
+        "group_by": "分组依据",
+        "too_many_groups": "分组过多",
+        "p_adjust_label": "多重比较校正",
+        "partial_title": "偏相关",
+        "covariates": "控制变量（协变量）",
+        "partial_matrix": "完整偏相关矩阵",
+        "regression_title": "线性回归：Y_total 对 X_total",
+        "residual_plot": "残差与拟合值",
+        "summary_title": "增量摘要（进行中的调查）",
+        "summary_resume": "从已保存的摘要继续（JSON）",
+        "summary_meta_mismatch": "已保存摘要的计分方式不同",
+        "summary_invalid": "摘要文件无效",
+        "summary_save": "保存摘要（JSON）",
+        "sketch_threshold_label": "近似分位数阈值 n >",
+        "sketch_epsilon_label": "分位数秩误差上限 (ε)",
+        "sketch_note": "中位数和四分位数由分位数草图近似",
+        "sketch_achieved": "实际秩误差",
+        "sketch_spearman_note": "Spearman 秩由分位数草图近似",
+        "item_association_title": "题项层面的关联",
+        "association_skipped": "已跳过（超过 {0} 个不同取值）",
+        "association_pair": "交叉表",
+        "weight_label": "调查权重",
+        "weight_none": "无（不加权）",
+        "weighted_note": "加权变量",
+        "effective_n": "有效 N",
+        "quality_title": "受访者质量",
+        "quality_max_missing": "最大缺失比例",
+        "quality_max_run": "最长相同作答串",
+        "quality_alpha": "马氏距离 α",
+        "quality_count": "受访者",
+        "quality_exclude": "从分析中排除被标记的受访者",
+        "quality_excluded": "已排除被标记的受访者",
+        "missing_strategy": "缺失回答",
+        "missing_report": "缺失数据处理",
+        "em_corr": "EM 题项相关矩阵",
+        "archive_mode": "此压缩包包含多个文件",
+        "archive_separate": "打开单个文件",
+        "archive_stacked": "将所有文件按轮次合并",
+        "archive_member": "文件",
+        "waves_title": "8. 多轮调查比较",
+        "waves_upload": "上传后续轮次（相同问卷）",
+        "waves_missing": "缺少列",
+        "waves_wave": "轮次",
+        "waves_deltas": "相邻轮次间的变化",
+        "waves_hint": "至少再上传一轮数据才能比较。",
+        "waves_duplicate": "数据与以下相同：",
+        "waves_unadjusted": "各轮统计未加权且包含所有受访者，因此第一行可能与第 3–5 节不同（调查权重和受访者排除不适用于轮次比较）。",
+        "pdf_chart_format": "图表格式",
+        "pdf_chart_dpi": "栅格分辨率（DPI）",
+        "pdf_chart_vector": "矢量（任意缩放均清晰）",
+        "pdf_chart_png": "PNG（无损栅格）",
+        "pdf_chart_jpeg": "JPEG（压缩栅格）",
+        "pdf_item_appendix": "包含题项附录（每个题项的描述统计、频数和图表）",
+        "pdf_appendix_title": "附录：题项统计",
+        "bundle_title": "9. 结果数据包",
+        "bundle_format": "格式",
+        "bundle_zip": "JSON + CSV（zip）",
+        "bundle_xlsx": "Excel 工作簿（每个表一个工作表）",
+        "bundle_download": "下载结果数据包",
+        "archive_empty": "此 zip 文件不包含 CSV 或 Excel 文件。",
     },
     "ja": {
         "label": "日本語",
@@ -219,6 +508,89 @@ LANG_OPTIONS = {
         "error_loading": "データセットの読み込みに失敗しました。ファイル形式を確認してください。",
         "reco_pearson": "X_total と Y_total が正規性を満たす場合 (p ≥ 0.05)、ピアソンの相関を使用してください。",
         "reco_spearman": "少なくとも一方の変数が正規分布でない、または順序尺度の場合、スピアマンの相関を使用してください。",
+        "chart_mode_label": "グラフの描画方式",
+        "chart_mode_static": "静止画像（サーバー）",
+        "chart_mode_interactive": "インタラクティブ（ブラウザ）",
+        "scatter_bin_label": "散布図をビン化する n の閾値",
+        "parsing_dataset": "バックグラウンドでデータセットを解析中…",
+        "pdf_building": "PDF レポートを作成中…",
+        "pdf_failed": "PDF レポートの作成に失敗しました",
+        "reliability_title": "尺度の信頼性",
+        "reliability_unavailable": "信頼性の算出には 2 項目以上と 3 件以上の完全回答が必要です。",
+        "scoring_options": "採点オプション",
+        "scoring_method": "合成得点",
+        "scale_min": "尺度の最小値",
+        "scale_max": "尺度の最大値",
+        "reverse_items": "逆転項目",
+        "min_answered": "最低回答項目数",
+        "construct_title": "7. 構成概念の相関行列",
+        "construct_define": "構成概念を定義",
+        "construct_count": "構成概念の数",
+        "construct_name": "名前",
+        "construct_items": "項目",
+        "construct_hint": "相関行列を計算するには構成概念を 2 つ以上定義してください。",
+        "construct_duplicate": "構成概念名が重複しています（後の項目はスキップ）",
+        "grouped_title": "グループ別分析",
+        "group_by": "グループ化の基準",
+        "too_many_groups": "グループが多すぎます",
+        "p_adjust_label": "多重比較の補正",
+        "partial_title": "偏相関",
+        "covariates": "統制する変数（共変量）",
+        "partial_matrix": "偏相関行列（全体）",
+        "regression_title": "線形回帰：Y_total を X_total で回帰",
+        "residual_plot": "残差と予測値",
+        "summary_title": "増分サマリー（実施中の調査）",
+        "summary_resume": "保存したサマリーから再開（JSON）",
+        "summary_meta_mismatch": "保存したサマリーは採点方法が異なります",
+        "summary_invalid": "無効なサマリーファイル",
+        "summary_save": "サマリーを保存（JSON）",
+        "sketch_threshold_label": "分位点を近似する n の閾値",
+        "sketch_epsilon_label": "分位点の順位誤差の上限 (ε)",
+        "sketch_note": "中央値と四分位数は分位点スケッチによる近似値です",
+        "sketch_achieved": "実際の順位誤差",
+        "sketch_spearman_note": "スピアマンの順位は分位点スケッチによる近似値です",
+        "item_association_title": "項目レベルの関連",
+        "association_skipped": "スキップ（異なる値が {0} 個超）",
+        "association_pair": "クロス集計表",
+        "weight_label": "調査ウェイト",
+        "weight_none": "なし（重み付けなし）",
+        "weighted_note": "重み変数",
+        "effective_n": "有効 N",
+        "quality_title": "回答者の品質",
+        "quality_max_missing": "最大欠損率",
+        "quality_max_run": "同一回答の最大連続数",
+        "quality_alpha": "マハラノビス α",
+        "quality_count": "回答者",
+        "quality_exclude": "フラグ付きの回答者を分析から除外",
+        "quality_excluded": "除外したフラグ付き回答者",
+        "missing_strategy": "欠損回答",
+        "missing_report": "欠損データの処理",
+        "em_corr": "EM による項目相関行列",
+        "archive_mode": "このアーカイブには複数のファイルが含まれています",
+        "archive_separate": "1 つのファイルを開く",
+        "archive_stacked": "すべてのファイルを調査回として結合",
+        "archive_member": "ファイル",
+        "waves_title": "8. 調査回の比較",
+        "waves_upload": "後続の調査回をアップロード（同じ質問票）",
+        "waves_missing": "不足している列",
+        "waves_wave": "調査回",
+        "waves_deltas": "調査回ごとの変化",
+        "waves_hint": "比較するには調査回をもう 1 つ以上アップロードしてください。",
+        "waves_duplicate": "次と同じデータ：",
+        "waves_unadjusted": "調査回の統計は重み付けなしで全回答者を用いるため、1 行目は第 3～5 節と異なる場合があります（調査ウェイトと回答者の除外は調査回には適用されません）。",
+        "pdf_chart_format": "グラフ形式",
+        "pdf_chart_dpi": "ラスター解像度（DPI）",
+        "pdf_chart_vector": "ベクター（拡大しても鮮明）",
+        "pdf_chart_png": "PNG（可逆圧縮ラスター）",
+        "pdf_chart_jpeg": "JPEG（圧縮ラスター）",
+        "pdf_item_appendix": "項目別の付録を含める（項目ごとの記述統計・度数・グラフ）",
+        "pdf_appendix_title": "付録：項目別統計",
+        "bundle_title": "9. 結果バンドル",
+        "bundle_format": "形式",
+        "bundle_zip": "JSON + CSV（zip）",
+        "bundle_xlsx": "Excel ブック（表ごとに 1 シート）",
+        "bundle_download": "結果バンドルをダウンロード",
+        "archive_empty": "この zip ファイルには CSV または Excel ファイルが含まれていません。",
     },
     "ko": {
         "label": "한국어",
@@ -266,6 +638,89 @@ LANG_OPTIONS = {
         "error_loading": "데이터셋을 불러오지 못했습니다. 파일 형식을 확인하세요.",
         "reco_pearson": "X_total과 Y_total이 정규성을 만족하는 경우 (p ≥ 0.05), 피어슨 상관을 사용하세요.",
         "reco_spearman": "적어도 한 변수라도 정규성을 만족하지 않거나 서열 척도인 경우, 스피어만 상관을 사용하세요.",
+        "chart_mode_label": "차트 렌더링",
+        "chart_mode_static": "정적 이미지(서버)",
+        "chart_mode_interactive": "대화형(브라우저)",
+        "scatter_bin_label": "산점도 구간화 기준 n =",
+        "parsing_dataset": "백그라운드에서 데이터셋을 읽는 중…",
+        "pdf_building": "PDF 보고서를 만드는 중…",
+        "pdf_failed": "PDF 보고서를 만들지 못했습니다",
+        "reliability_title": "척도 신뢰도",
+        "reliability_unavailable": "신뢰도 분석에는 최소 2개 문항과 3개의 완전한 응답이 필요합니다.",
+        "scoring_options": "점수 산출 옵션",
+        "scoring_method": "합성 점수",
+        "scale_min": "척도 최솟값",
+        "scale_max": "척도 최댓값",
+        "reverse_items": "역코딩 문항",
+        "min_answered": "최소 응답 문항 수",
+        "construct_title": "7. 구성개념 상관행렬",
+        "construct_define": "구성개념 정의",
+        "construct_count": "구성개념 수",
+        "construct_name": "이름",
+        "construct_items": "문항",
+        "construct_hint": "상관행렬을 계산하려면 구성개념을 두 개 이상 정의하세요.",
+        "construct_duplicate": "구성개념 이름 중복(뒤의 항목은 건너뜀)",
+        "grouped_title": "집단별 분석",
+        "group_by": "집단 기준",
+        "too_many_groups": "집단이 너무 많습니다",
+        "p_adjust_label": "다중 비교 보정",
+        "partial_title": "부분 상관",
+        "covariates": "통제 변수(공변량)",
+        "partial_matrix": "전체 부분 상관행렬",
+        "regression_title": "선형 회귀: X_total에 대한 Y_total",
+        "residual_plot": "잔차 대 적합값",
+        "summary_title": "증분 요약(진행 중인 조사)",
+        "summary_resume": "저장된 요약에서 이어서 하기(JSON)",
+        "summary_meta_mismatch": "저장된 요약은 다른 방식으로 점수가 산출되었습니다",
+        "summary_invalid": "잘못된 요약 파일",
+        "summary_save": "요약 저장(JSON)",
+        "sketch_threshold_label": "분위수 근사 기준 n =",
+        "sketch_epsilon_label": "분위수 순위 오차 한계 (ε)",
+        "sketch_note": "중앙값과 사분위수는 분위수 스케치로 근사했습니다",
+        "sketch_achieved": "달성된 순위 오차",
+        "sketch_spearman_note": "스피어만 순위는 분위수 스케치로 근사했습니다",
+        "item_association_title": "문항 수준 연관성",
+        "association_skipped": "건너뜀(서로 다른 값이 {0}개 초과)",
+        "association_pair": "교차표",
+        "weight_label": "조사 가중치",
+        "weight_none": "없음(가중치 없음)",
+        "weighted_note": "가중치 변수",
+        "effective_n": "유효 N",
+        "quality_title": "응답자 품질",
+        "quality_max_missing": "최대 결측 비율",
+        "quality_max_run": "최대 동일 응답 연속",
+        "quality_alpha": "마할라노비스 α",
+        "quality_count": "응답자",
+        "quality_exclude": "표시된 응답자를 분석에서 제외",
+        "quality_excluded": "제외된 표시 응답자",
+        "missing_strategy": "결측 응답",
+        "missing_report": "결측 데이터 처리",
+        "em_corr": "EM 문항 상관행렬",
+        "archive_mode": "이 압축 파일에는 여러 파일이 있습니다",
+        "archive_separate": "파일 하나 열기",
+        "archive_stacked": "모든 파일을 차수로 쌓기",
+        "archive_member": "파일",
+        "waves_title": "8. 차수 비교",
+        "waves_upload": "후속 차수 업로드(동일 설문지)",
+        "waves_missing": "누락된 열",
+        "waves_wave": "차수",
+        "waves_deltas": "차수 간 변화",
+        "waves_hint": "비교하려면 차수를 하나 이상 더 업로드하세요.",
+        "waves_duplicate": "다음과 같은 데이터:",
+        "waves_unadjusted": "차수 통계는 가중치 없이 모든 응답자를 사용하므로 첫 행이 3–5절과 다를 수 있습니다(조사 가중치와 응답자 제외는 차수에 적용되지 않습니다).",
+        "pdf_chart_format": "차트 형식",
+        "pdf_chart_dpi": "래스터 해상도(DPI)",
+        "pdf_chart_vector": "벡터(확대해도 선명)",
+        "pdf_chart_png": "PNG(무손실 래스터)",
+        "pdf_chart_jpeg": "JPEG(압축 래스터)",
+        "pdf_item_appendix": "문항별 부록 포함(문항별 기술통계, 빈도, 차트)",
+        "pdf_appendix_title": "부록: 문항별 통계",
+        "bundle_title": "9. 결과 묶음",
+        "bundle_format": "형식",
+        "bundle_zip": "JSON + CSV(zip)",
+        "bundle_xlsx": "Excel 통합 문서(표마다 시트 하나)",
+        "bundle_download": "결과 묶음 다운로드",
+        "archive_empty": "이 zip 파일에는 CSV 또는 Excel 파일이 없습니다.",
     },
     "de": {
         "label": "Deutsch",
@@ -313,6 +768,89 @@ LANG_OPTIONS = {
         "error_loading": "Datensatz konnte nicht geladen werden. Bitte prüfen Sie das Dateiformat.",
         "reco_pearson": "Verwenden Sie die Pearson-Korrelation, da X_total und Y_total die Normalität erfüllen (p ≥ 0.05).",
         "reco_spearman": "Verwenden Sie die Spearman-Korrelation, da mindestens eine Variable nicht normalverteilt ist und/oder ordinal ist.",
+        "chart_mode_label": "Diagrammdarstellung",
+        "chart_mode_static": "Statisches Bild (Server)",
+        "chart_mode_interactive": "Interaktiv (Browser)",
+        "scatter_bin_label": "Streudiagramme binnen ab n =",
+        "parsing_dataset": "Datensatz wird im Hintergrund eingelesen…",
+        "pdf_building": "PDF-Bericht wird erstellt…",
+        "pdf_failed": "PDF-Bericht konnte nicht erstellt werden",
+        "reliability_title": "Skalenreliabilität",
+        "reliability_unavailable": "Die Reliabilität benötigt mindestens 2 Items und 3 vollständige Antworten.",
+        "scoring_options": "Bewertungsoptionen",
+        "scoring_method": "Summenwert",
+        "scale_min": "Skalenminimum",
+        "scale_max": "Skalenmaximum",
+        "reverse_items": "Umgepolte Items",
+        "min_answered": "Mindestanzahl beantworteter Items",
+        "construct_title": "7. Korrelationsmatrix der Konstrukte",
+        "construct_define": "Konstrukte festlegen",
+        "construct_count": "Anzahl der Konstrukte",
+        "construct_name": "Name",
+        "construct_items": "Items",
+        "construct_hint": "Legen Sie mindestens zwei Konstrukte fest, um die Korrelationsmatrix zu berechnen.",
+        "construct_duplicate": "Doppelte Konstruktnamen (spätere Einträge übersprungen)",
+        "grouped_title": "Gruppierte Analyse",
+        "group_by": "Gruppieren nach",
+        "too_many_groups": "Zu viele Gruppen",
+        "p_adjust_label": "Korrektur für multiples Testen",
+        "partial_title": "Partielle Korrelation",
+        "covariates": "Kontrollieren für (Kovariaten)",
+        "partial_matrix": "Vollständige partielle Korrelationsmatrix",
+        "regression_title": "Lineare Regression: Y_total auf X_total",
+        "residual_plot": "Residuen gegen angepasste Werte",
+        "summary_title": "Inkrementelle Zusammenfassung (laufende Umfragen)",
+        "summary_resume": "Von gespeicherter Zusammenfassung fortsetzen (JSON)",
+        "summary_meta_mismatch": "Die gespeicherte Zusammenfassung wurde anders bewertet",
+        "summary_invalid": "Ungültige Zusammenfassungsdatei",
+        "summary_save": "Zusammenfassung speichern (JSON)",
+        "sketch_threshold_label": "Quantile approximieren ab n =",
+        "sketch_epsilon_label": "Rangfehlergrenze der Quantile (ε)",
+        "sketch_note": "Median und Quartile sind mit einem Quantil-Sketch angenähert",
+        "sketch_achieved": "erreichter Rangfehler",
+        "sketch_spearman_note": "Spearman-Ränge mit einem Quantil-Sketch angenähert",
+        "item_association_title": "Zusammenhang auf Itemebene",
+        "association_skipped": "Übersprungen (mehr als {0} verschiedene Werte)",
+        "association_pair": "Kreuztabelle",
+        "weight_label": "Stichprobengewichte",
+        "weight_none": "Keine (ungewichtet)",
+        "weighted_note": "Gewichtet mit",
+        "effective_n": "effektives N",
+        "quality_title": "Qualität der Antworten",
+        "quality_max_missing": "Max. Anteil fehlender Antworten",
+        "quality_max_run": "Max. Folge gleicher Antworten",
+        "quality_alpha": "Mahalanobis-α",
+        "quality_count": "Befragte",
+        "quality_exclude": "Markierte Befragte von der Analyse ausschließen",
+        "quality_excluded": "Ausgeschlossene markierte Befragte",
+        "missing_strategy": "Fehlende Antworten",
+        "missing_report": "Umgang mit fehlenden Daten",
+        "em_corr": "EM-Korrelationsmatrix der Items",
+        "archive_mode": "Dieses Archiv enthält mehrere Dateien",
+        "archive_separate": "Eine Datei öffnen",
+        "archive_stacked": "Alle Dateien als Wellen zusammenführen",
+        "archive_member": "Datei",
+        "waves_title": "8. Wellenvergleich",
+        "waves_upload": "Spätere Wellen hochladen (gleicher Fragebogen)",
+        "waves_missing": "fehlende Spalten",
+        "waves_wave": "Welle",
+        "waves_deltas": "Veränderungen zwischen Wellen",
+        "waves_hint": "Laden Sie mindestens eine weitere Welle zum Vergleich hoch.",
+        "waves_duplicate": "gleiche Daten wie",
+        "waves_unadjusted": "Die Wellenstatistiken sind ungewichtet und nutzen alle Befragten, daher kann die erste Zeile von den Abschnitten 3–5 abweichen (Gewichte und Ausschluss von Befragten gelten nicht für die Wellen).",
+        "pdf_chart_format": "Diagrammformat",
+        "pdf_chart_dpi": "Rasterauflösung (DPI)",
+        "pdf_chart_vector": "Vektor (scharf bei jedem Zoom)",
+        "pdf_chart_png": "PNG (verlustfreies Raster)",
+        "pdf_chart_jpeg": "JPEG (komprimiertes Raster)",
+        "pdf_item_appendix": "Anhang je Item einfügen (Kennwerte, Häufigkeiten und ein Diagramm pro Item)",
+        "pdf_appendix_title": "Anhang: Statistiken je Item",
+        "bundle_title": "9. Ergebnispaket",
+        "bundle_format": "Format",
+        "bundle_zip": "JSON + CSV (zip)",
+        "bundle_xlsx": "Excel-Arbeitsmappe (ein Blatt pro Tabelle)",
+        "bundle_download": "Ergebnispaket herunterladen",
+        "archive_empty": "Diese ZIP-Datei enthält keine CSV- oder Excel-Datei.",
     },
     "nl": {
         "label": "Nederlands",
@@ -360,6 +898,89 @@ LANG_OPTIONS = {
         "error_loading": "Laden van de dataset mislukt. Controleer het bestandsformaat.",
         "reco_pearson": "Gebruik Pearson-correlatie omdat X_total en Y_total aan normaliteit voldoen (p ≥ 0.05).",
         "reco_spearman": "Gebruik Spearman-correlatie omdat ten minste één variabele niet normaal is en/of ordinaal is.",
+        "chart_mode_label": "Grafiekweergave",
+        "chart_mode_static": "Statische afbeelding (server)",
+        "chart_mode_interactive": "Interactief (browser)",
+        "scatter_bin_label": "Spreidingsdiagrammen binnen boven n =",
+        "parsing_dataset": "Dataset wordt op de achtergrond ingelezen…",
+        "pdf_building": "PDF-rapport wordt gemaakt…",
+        "pdf_failed": "PDF-rapport kon niet worden gemaakt",
+        "reliability_title": "Betrouwbaarheid van de schaal",
+        "reliability_unavailable": "Voor betrouwbaarheid zijn minstens 2 items en 3 volledige antwoorden nodig.",
+        "scoring_options": "Scoreopties",
+        "scoring_method": "Samengestelde score",
+        "scale_min": "Schaalminimum",
+        "scale_max": "Schaalmaximum",
+        "reverse_items": "Omgekeerd gescoorde items",
+        "min_answered": "Minimaal aantal beantwoorde items",
+        "construct_title": "7. Correlatiematrix van constructen",
+        "construct_define": "Constructen definiëren",
+        "construct_count": "Aantal constructen",
+        "construct_name": "Naam",
+        "construct_items": "Items",
+        "construct_hint": "Definieer minstens twee constructen om de correlatiematrix te berekenen.",
+        "construct_duplicate": "Dubbele constructnamen (latere invoer overgeslagen)",
+        "grouped_title": "Analyse per groep",
+        "group_by": "Groeperen op",
+        "too_many_groups": "Te veel groepen",
+        "p_adjust_label": "Correctie voor meervoudig toetsen",
+        "partial_title": "Partiële correlatie",
+        "covariates": "Corrigeren voor (covariaten)",
+        "partial_matrix": "Volledige partiële correlatiematrix",
+        "regression_title": "Lineaire regressie: Y_total op X_total",
+        "residual_plot": "Residuen versus voorspelde waarden",
+        "summary_title": "Incrementele samenvatting (lopende enquêtes)",
+        "summary_resume": "Verdergaan vanaf een opgeslagen samenvatting (JSON)",
+        "summary_meta_mismatch": "De opgeslagen samenvatting is anders gescoord",
+        "summary_invalid": "Ongeldig samenvattingsbestand",
+        "summary_save": "Samenvatting opslaan (JSON)",
+        "sketch_threshold_label": "Kwantielen benaderen boven n =",
+        "sketch_epsilon_label": "Foutgrens voor kwantielrang (ε)",
+        "sketch_note": "Mediaan en kwartielen zijn benaderd met een kwantielschets",
+        "sketch_achieved": "bereikte rangfout",
+        "sketch_spearman_note": "Spearman-rangen benaderd met een kwantielschets",
+        "item_association_title": "Samenhang op itemniveau",
+        "association_skipped": "Overgeslagen (meer dan {0} verschillende waarden)",
+        "association_pair": "Kruistabel",
+        "weight_label": "Surveygewichten",
+        "weight_none": "Geen (ongewogen)",
+        "weighted_note": "Gewogen met",
+        "effective_n": "effectieve N",
+        "quality_title": "Kwaliteit van respondenten",
+        "quality_max_missing": "Max. aandeel ontbrekend",
+        "quality_max_run": "Max. reeks gelijke antwoorden",
+        "quality_alpha": "Mahalanobis-α",
+        "quality_count": "Respondenten",
+        "quality_exclude": "Gemarkeerde respondenten uitsluiten van de analyse",
+        "quality_excluded": "Uitgesloten gemarkeerde respondenten",
+        "missing_strategy": "Ontbrekende antwoorden",
+        "missing_report": "Omgang met ontbrekende gegevens",
+        "em_corr": "EM-correlatiematrix van de items",
+        "archive_mode": "Dit archief bevat meerdere bestanden",
+        "archive_separate": "Eén bestand openen",
+        "archive_stacked": "Alle bestanden als metingen samenvoegen",
+        "archive_member": "Bestand",
+        "waves_title": "8. Vergelijking van metingen",
+        "waves_upload": "Latere metingen uploaden (zelfde vragenlijst)",
+        "waves_missing": "ontbrekende kolommen",
+        "waves_wave": "Meting",
+        "waves_deltas": "Veranderingen tussen metingen",
+        "waves_hint": "Upload minstens nog één meting om te vergelijken.",
+        "waves_duplicate": "zelfde gegevens als",
+        "waves_unadjusted": "Statistieken per meting zijn ongewogen en gebruiken alle respondenten, dus de eerste rij kan afwijken van secties 3–5 (surveygewichten en uitsluiting van respondenten gelden niet voor de metingen).",
+        "pdf_chart_format": "Grafiekformaat",
+        "pdf_chart_dpi": "Rasterresolutie (DPI)",
+        "pdf_chart_vector": "Vector (scherp bij elke zoom)",
+        "pdf_chart_png": "PNG (verliesvrij raster)",
+        "pdf_chart_jpeg": "JPEG (gecomprimeerd raster)",
+        "pdf_item_appendix": "Bijlage per item toevoegen (beschrijvende statistieken, frequenties en een grafiek per item)",
+        "pdf_appendix_title": "Bijlage: Statistieken per item",
+        "bundle_title": "9. Resultatenbundel",
+        "bundle_format": "Formaat",
+        "bundle_zip": "JSON + CSV (zip)",
+        "bundle_xlsx": "Excel-werkmap (één blad per tabel)",
+        "bundle_download": "Resultatenbundel downloaden",
+        "archive_empty": "Dit zip-bestand bevat geen CSV- of Excel-bestand.",
     },
     "ru": {
         "label": "Русский",
@@ -407,6 +1028,89 @@ LANG_OPTIONS = {
         "error_loading": "Не удалось загрузить датасет. Проверьте формат файла.",
         "reco_pearson": "Используйте корреляцию Пирсона, если X_total и Y_total удовлетворяют нормальному распределению (p ≥ 0.05).",
         "reco_spearman": "Используйте корреляцию Спирмена, если хотя бы одна переменная не нормально распределена и/или является порядковой.",
+        "chart_mode_label": "Отрисовка графиков",
+        "chart_mode_static": "Статичное изображение (сервер)",
+        "chart_mode_interactive": "Интерактивно (браузер)",
+        "scatter_bin_label": "Группировать точки диаграммы рассеяния при n >",
+        "parsing_dataset": "Датасет обрабатывается в фоне…",
+        "pdf_building": "Формируется PDF-отчёт…",
+        "pdf_failed": "Не удалось сформировать PDF-отчёт",
+        "reliability_title": "Надёжность шкалы",
+        "reliability_unavailable": "Для надёжности нужны минимум 2 пункта и 3 полных ответа.",
+        "scoring_options": "Параметры подсчёта баллов",
+        "scoring_method": "Композитный балл",
+        "scale_min": "Минимум шкалы",
+        "scale_max": "Максимум шкалы",
+        "reverse_items": "Обратно кодируемые пункты",
+        "min_answered": "Минимум отвеченных пунктов",
+        "construct_title": "7. Корреляционная матрица конструктов",
+        "construct_define": "Задать конструкты",
+        "construct_count": "Число конструктов",
+        "construct_name": "Название",
+        "construct_items": "Пункты",
+        "construct_hint": "Задайте хотя бы два конструкта, чтобы вычислить корреляционную матрицу.",
+        "construct_duplicate": "Повторяющиеся названия конструктов (последующие пропущены)",
+        "grouped_title": "Анализ по группам",
+        "group_by": "Группировать по",
+        "too_many_groups": "Слишком много групп",
+        "p_adjust_label": "Поправка на множественные сравнения",
+        "partial_title": "Частная корреляция",
+        "covariates": "Контролировать (ковариаты)",
+        "partial_matrix": "Полная матрица частных корреляций",
+        "regression_title": "Линейная регрессия: Y_total по X_total",
+        "residual_plot": "Остатки и предсказанные значения",
+        "summary_title": "Инкрементальная сводка (текущие опросы)",
+        "summary_resume": "Продолжить с сохранённой сводки (JSON)",
+        "summary_meta_mismatch": "Сохранённая сводка подсчитана иначе",
+        "summary_invalid": "Недопустимый файл сводки",
+        "summary_save": "Сохранить сводку (JSON)",
+        "sketch_threshold_label": "Приближённые квантили при n >",
+        "sketch_epsilon_label": "Граница ошибки ранга квантилей (ε)",
+        "sketch_note": "Медиана и квартили приближены квантильным скетчем",
+        "sketch_achieved": "достигнутая ошибка ранга",
+        "sketch_spearman_note": "Ранги Спирмена приближены квантильным скетчем",
+        "item_association_title": "Связь на уровне пунктов",
+        "association_skipped": "Пропущено (более {0} различных значений)",
+        "association_pair": "Таблица сопряжённости",
+        "weight_label": "Веса опроса",
+        "weight_none": "Нет (без весов)",
+        "weighted_note": "Взвешено по",
+        "effective_n": "эффективный N",
+        "quality_title": "Качество ответов респондентов",
+        "quality_max_missing": "Макс. доля пропусков",
+        "quality_max_run": "Макс. серия одинаковых ответов",
+        "quality_alpha": "α Махаланобиса",
+        "quality_count": "Респонденты",
+        "quality_exclude": "Исключить отмеченных респондентов из анализа",
+        "quality_excluded": "Исключено отмеченных респондентов",
+        "missing_strategy": "Пропущенные ответы",
+        "missing_report": "Обработка пропущенных данных",
+        "em_corr": "Корреляционная матрица пунктов (EM)",
+        "archive_mode": "Архив содержит несколько файлов",
+        "archive_separate": "Открыть один файл",
+        "archive_stacked": "Объединить все файлы как волны",
+        "archive_member": "Файл",
+        "waves_title": "8. Сравнение волн",
+        "waves_upload": "Загрузить последующие волны (та же анкета)",
+        "waves_missing": "отсутствуют столбцы",
+        "waves_wave": "Волна",
+        "waves_deltas": "Изменения между волнами",
+        "waves_hint": "Загрузите ещё хотя бы одну волну для сравнения.",
+        "waves_duplicate": "те же данные, что и",
+        "waves_unadjusted": "Статистика волн не взвешена и использует всех респондентов, поэтому первая строка может отличаться от разделов 3–5 (веса опроса и исключение респондентов к волнам не применяются).",
+        "pdf_chart_format": "Формат графиков",
+        "pdf_chart_dpi": "Разрешение растра (DPI)",
+        "pdf_chart_vector": "Вектор (чётко при любом масштабе)",
+        "pdf_chart_png": "PNG (растр без потерь)",
+        "pdf_chart_jpeg": "JPEG (сжатый растр)",
+        "pdf_item_appendix": "Добавить приложение по пунктам (описательная статистика, частоты и график для каждого пункта)",
+        "pdf_appendix_title": "Приложение: статистика по пунктам",
+        "bundle_title": "9. Пакет результатов",
+        "bundle_format": "Формат",
+        "bundle_zip": "JSON + CSV (zip)",
+        "bundle_xlsx": "Книга Excel (один лист на таблицу)",
+        "bundle_download": "Скачать пакет результатов",
+        "archive_empty": "Этот zip-файл не содержит файлов CSV или Excel.",
     },
 }
 
@@ -426,6 +1130,91 @@ lang_code = st.sidebar.selectbox(
 )
 t = lambda key, fallback="": translate(lang_code, key, fallback)
 
+# ---------------------------------------------------------
+# Chart rendering mode (sidebar)
+# ---------------------------------------------------------
+CHART_MODE_STATIC = "static"
+CHART_MODE_INTERACTIVE = "interactive"
+SCATTER_BIN_THRESHOLD = 5000
+
+chart_mode = st.sidebar.radio(
+    t("chart_mode_label", "Chart rendering"),
+    options=[CHART_MODE_STATIC, CHART_MODE_INTERACTIVE],
+    format_func=lambda mode: {
+        CHART_MODE_STATIC: t("chart_mode_static", "Static image (server)"),
+        CHART_MODE_INTERACTIVE: t("chart_mode_interactive", "Interactive (browser)"),
+    }[mode],
+    index=0,
+    help=(
+        "Interactive mode only sends bin counts, five-number summaries and a "
+        "density grid to the browser, so the payload does not grow with the "
+        "number of rows."
+    ),
+)
+scatter_bin_threshold = int(
+    st.sidebar.number_input(
+        t("scatter_bin_label", "Bin scatter plots above n ="),
+        min_value=100,
+        value=SCATTER_BIN_THRESHOLD,
+        step=1000,
+        help=(
+            "Above this many valid (X, Y) pairs the scatter plot is drawn as "
+            "a 2-D density grid instead of one marker per respondent."
+        ),
+    )
+)
+
+# ---------------------------------------------------------
+# Multiple-comparison correction (sidebar)
+# ---------------------------------------------------------
+P_ADJUST_METHODS = {
+    "none": "None",
+    "bonferroni": "Bonferroni",
+    "holm": "Holm",
+    "fdr_bh": "Benjamini–Hochberg (FDR)",
+}
+
+p_adjust_method = st.sidebar.selectbox(
+    t("p_adjust_label", "Multiple-comparison correction"),
+    options=list(P_ADJUST_METHODS),
+    format_func=lambda m: P_ADJUST_METHODS[m],
+    index=0,
+    help=(
+        "Applied to every family of p-values computed in one run "
+        "(construct matrix, grouped correlations)."
+    ),
+)
+
+# ---------------------------------------------------------
+# Quantile sketch for large samples (sidebar)
+# ---------------------------------------------------------
+QUANTILE_SKETCH_THRESHOLD = 100_000
+QUANTILE_SKETCH_EPSILON = 0.01
+
+quantile_sketch_threshold = int(
+    st.sidebar.number_input(
+        t("sketch_threshold_label", "Approximate quantiles above n ="),
+        min_value=1000,
+        value=QUANTILE_SKETCH_THRESHOLD,
+        step=10_000,
+        help=(
+            "Above this many values the median, boxplot quartiles and Spearman "
+            "ranks come from a streaming quantile sketch instead of a full sort."
+        ),
+    )
+)
+quantile_sketch_epsilon = float(
+    st.sidebar.number_input(
+        t("sketch_epsilon_label", "Quantile rank error bound (ε)"),
+        min_value=0.0005,
+        max_value=0.1,
+        value=QUANTILE_SKETCH_EPSILON,
+        step=0.0005,
+        format="%.4f",
+        help="Maximum rank error as a fraction of n. Smaller values use more memory.",
+    )
+)
+
 # ---------------------------------------------------------
 # Background video ala Matrix app (using local BG.mp4)
 # ---------------------------------------------------------
@@ -964,16 +1753,107 @@ if "x_total" not in st.session_state:
     st.session_state.x_total = None
 if "y_total" not in st.session_state:
     st.session_state.y_total = None
+if "dataset_handle" not in st.session_state:
+    st.session_state.dataset_handle = None
+if "jobs" not in st.session_state:
+    st.session_state.jobs = {}
+if "upload_digests" not in st.session_state:
+    st.session_state.upload_digests = {}
+if "x_spec" not in st.session_state:
+    st.session_state.x_spec = None
+if "y_spec" not in st.session_state:
+    st.session_state.y_spec = None
 
 # ---------------------------------------------------------
 # Helper functions
 # ---------------------------------------------------------
-def load_data(file):
+CSV_CHUNK_ROWS = 100_000
+TABLE_SUFFIXES = (".csv", ".xls", ".xlsx")
+ARCHIVE_SUFFIXES = (".gz", ".xz", ".zip")
+STACKED_WAVES = "*"  # archive member selector: every table file, stacked
+WAVE_COLUMN = "wave"
+
+def archive_members(data, name):
+    """Table files inside a zip upload, in archive order ([] otherwise)."""
+    if not name.endswith(".zip"):
+        return []
+    try:
+        with zipfile.ZipFile(BytesIO(data)) as archive:
+            return [
+                info.filename
+                for info in archive.infolist()
+                if not info.is_dir()
+                and info.filename.endswith(TABLE_SUFFIXES)
+                and not info.filename.startswith("__MACOSX/")
+            ]
+    except zipfile.BadZipFile:
+        return []
+
+def _open_stream(buffer, name, member=None):
+    """(stream, inner file name) of an upload; gzip/xz/zip archives are
+    decompressed on the fly while reading, never to a temp file."""
+    if name.endswith(".gz"):
+        return gzip.GzipFile(fileobj=buffer), name[: -len(".gz")]
+    if name.endswith(".xz"):
+        return lzma.LZMAFile(buffer), name[: -len(".xz")]
+    if name.endswith(".zip"):
+        archive = zipfile.ZipFile(buffer)
+        if member is None:
+            members = archive_members(buffer.getvalue(), name)
+            if not members:
+                raise ValueError(f"{name} contains no CSV or Excel file")
+            member = members[0]
+        return archive.open(member), member
+    return buffer, name
+
+def parse_upload(data, name, progress=None, member=None):
+    """Parse uploaded bytes into a DataFrame.
+
+    CSV files are read in chunks of ``CSV_CHUNK_ROWS`` when a ``progress``
+    callback is given, so a background parse can report how far it got and
+    be cancelled between chunks. Compressed uploads stream through the same
+    parser; ``member`` picks the file inside a zip (``STACKED_WAVES`` stacks
+    all of them).
+    """
+    if member == STACKED_WAVES:
+        return stack_waves(data, name, progress)
+    buffer = BytesIO(data)
+    stream, inner_name = _open_stream(buffer, name, member)
+    if inner_name.endswith((".xls", ".xlsx")):
+        return pd.read_excel(stream)
+    if progress is None:
+        return pd.read_csv(stream)
+
+    chunks = []
+    for chunk in pd.read_csv(stream, chunksize=CSV_CHUNK_ROWS):
+        chunks.append(chunk)
+        # Position in the (compressed) upload, so archives report progress too
+        progress(buffer.tell() / max(len(data), 1))
+    if not chunks:
+        return pd.read_csv(_open_stream(BytesIO(data), name, member)[0])
+    return pd.concat(chunks, ignore_index=True)
+
+def stack_waves(data, name, progress=None):
+    """Every table file of a zip upload stacked into one frame, aligned on
+    column names, with the file name (without suffix) in ``WAVE_COLUMN``."""
+    members = archive_members(data, name)
+    frames = []
+    for i, member in enumerate(members):
+        member_progress = (
+            None
+            if progress is None
+            else lambda fraction, i=i: progress((i + fraction) / len(members))
+        )
+        frame = parse_upload(data, name, member_progress, member)
+        frame = frame.drop(columns=WAVE_COLUMN, errors="ignore")
+        frame.insert(0, WAVE_COLUMN, Path(member).stem)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+def load_data(file, member=None):
     try:
-        if file.name.endswith(".csv"):
-            df = pd.read_csv(file)
-        elif file.name.endswith((".xls", ".xlsx")):
-            df = pd.read_excel(file)
+        if file.name.endswith(TABLE_SUFFIXES + ARCHIVE_SUFFIXES):
+            df = parse_upload(file.getvalue(), file.name, member=member)
         else:
             st.markdown(
                 f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">❌ {t("unsupported_format")}</div>',
@@ -988,7 +1868,850 @@ def load_data(file):
         )
         return None
 
-def compute_descriptive_stats(data, var_name):
+# ---------------------------------------------------------
+# Persistent dataset cache (on disk, survives restarts)
+# ---------------------------------------------------------
+DISK_CACHE_DIR = Path(
+    os.environ.get("STATS_APP_CACHE_DIR", Path.home() / ".cache" / "stats_app")
+)
+DISK_CACHE_MAX_BYTES = 2 * 1024**3
+
+class DiskCache:
+    """Parsed datasets stored as one ``.npy`` file per column, keyed by the
+    upload's content hash and memory-mapped back on load, so a restarted
+    server never reparses a known upload.
+
+    Numeric columns are saved as-is (float64 columns double as their coerced
+    numeric array); text columns as factorized codes plus their categories
+    in ``meta.json``. Entries are written to a staging directory and renamed
+    into place, and ``manifest.json`` keeps their sizes and last use for
+    LRU cleanup once the cache exceeds ``max_bytes``.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, root=DISK_CACHE_DIR, max_bytes=DISK_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._meta = {}
+        self._lock = threading.Lock()
+
+    def _dir(self, key):
+        return self.root / key
+
+    def _read_manifest(self):
+        try:
+            return json.loads((self.root / self.MANIFEST).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, manifest):
+        staging = self.root / f".{self.MANIFEST}.{uuid.uuid4().hex}"
+        staging.write_text(json.dumps(manifest))
+        os.replace(staging, self.root / self.MANIFEST)
+
+    def _touch(self, key):
+        with self._lock:
+            manifest = self._read_manifest()
+            if key in manifest:
+                manifest[key]["last_used"] = time.time()
+                try:
+                    self._write_manifest(manifest)
+                except OSError:
+                    pass
+
+    def _load_meta(self, key):
+        meta = self._meta.get(key)
+        if meta is None:
+            meta = json.loads((self._dir(key) / "meta.json").read_text())
+            self._meta[key] = meta
+        return meta
+
+    def contains(self, key):
+        return (self._dir(key) / "meta.json").exists()
+
+    def load_frame(self, key):
+        """The cached DataFrame for ``key`` (columns memory-mapped), or None."""
+        if not self.contains(key):
+            return None
+        try:
+            columns = {}
+            for column in self._load_meta(key)["columns"]:
+                values = np.load(self._dir(key) / column["file"], mmap_mode="r")
+                if "categories" in column:
+                    lookup = np.array(column["categories"] + [np.nan], dtype=object)
+                    values = lookup[values]
+                columns[column["name"]] = pd.Series(values, dtype=column["dtype"], copy=False)
+            frame = pd.DataFrame(columns, copy=False)
+        except (OSError, ValueError, KeyError, TypeError):
+            self._meta.pop(key, None)
+            return None
+        self._touch(key)
+        return frame
+
+    def load_numeric(self, key, column):
+        """Memory-mapped coerced float64 array of ``column``, or None."""
+        try:
+            for entry in self._load_meta(key)["columns"]:
+                if entry["name"] == column and "numeric" in entry:
+                    return np.load(self._dir(key) / entry["numeric"], mmap_mode="r")
+        except (OSError, ValueError, KeyError):
+            pass
+        return None
+
+    def save(self, key, frame):
+        """Write ``frame`` under ``key``; returns False if it cannot be cached."""
+        staging = self.root / f".{key}.{uuid.uuid4().hex}"
+        try:
+            staging.mkdir(parents=True)
+            columns = []
+            for i, name in enumerate(frame.columns):
+                series = frame[name]
+                column = {"name": name, "dtype": str(series.dtype), "file": f"c{i}.npy"}
+                if pd.api.types.is_numeric_dtype(series.dtype):
+                    np.save(staging / column["file"], series.to_numpy())
+                    numeric = None if series.dtype == np.float64 else series
+                else:
+                    codes, categories = pd.factorize(series)
+                    np.save(staging / column["file"], codes)
+                    column["categories"] = categories.tolist()
+                    numeric = series
+                if numeric is None:
+                    column["numeric"] = column["file"]
+                else:
+                    coerced = pd.to_numeric(numeric, errors="coerce").to_numpy(dtype=float)
+                    if not np.isnan(coerced).all():
+                        column["numeric"] = f"n{i}.npy"
+                        np.save(staging / column["numeric"], coerced)
+                columns.append(column)
+            (staging / "meta.json").write_text(json.dumps({"columns": columns}))
+            size = sum(path.stat().st_size for path in staging.iterdir())
+            try:
+                os.replace(staging, self._dir(key))
+            except OSError:
+                # Another process cached the same upload first
+                shutil.rmtree(staging, ignore_errors=True)
+        except (OSError, TypeError, ValueError):
+            shutil.rmtree(staging, ignore_errors=True)
+            return False
+
+        with self._lock:
+            manifest = self._read_manifest()
+            manifest[key] = {"bytes": size, "last_used": time.time()}
+            total = sum(item["bytes"] for item in manifest.values())
+            for old_key in sorted(manifest, key=lambda k: manifest[k]["last_used"]):
+                if total <= self.max_bytes:
+                    break
+                if old_key == key:
+                    continue
+                shutil.rmtree(self._dir(old_key), ignore_errors=True)
+                self._meta.pop(old_key, None)
+                total -= manifest.pop(old_key)["bytes"]
+            try:
+                self._write_manifest(manifest)
+            except OSError:
+                pass
+        return True
+
+@st.cache_resource
+def get_disk_cache():
+    return DiskCache()
+
+# ---------------------------------------------------------
+# Shared dataset store (process-wide, across sessions)
+# ---------------------------------------------------------
+DATASET_STORE_CAPACITY = 8
+
+class DatasetEntry:
+    """A parsed upload shared read-only by every session that uploaded the
+    same bytes. Sessions must not mutate ``frame``; coerced numeric columns
+    are cached here once and handed out as read-only arrays (memory-mapped
+    from ``disk`` when it has them)."""
+
+    def __init__(self, key, frame, disk=None):
+        self.key = key
+        self.frame = frame
+        self.disk = disk
+        self.refcount = 0
+        self._numeric = {}
+        self._lock = threading.Lock()
+
+    def numeric(self, column):
+        """``pd.to_numeric(frame[column], errors="coerce")`` as a read-only
+        float64 array, computed at most once per column."""
+        with self._lock:
+            values = self._numeric.get(column)
+            if values is None and self.disk is not None:
+                values = self.disk.load_numeric(self.key, column)
+                if values is not None:
+                    self._numeric[column] = values
+            if values is None:
+                values = pd.to_numeric(self.frame[column], errors="coerce").to_numpy(
+                    dtype=float, copy=True
+                )
+                values.setflags(write=False)
+                self._numeric[column] = values
+            return values
+
+    def numeric_frame(self, columns):
+        return pd.DataFrame(
+            {col: self.numeric(col) for col in columns}, index=self.frame.index
+        )
+
+class DatasetStore:
+    """Content-addressed, reference-counted LRU cache of parsed datasets.
+
+    Identical uploads are parsed once; concurrent sessions uploading the same
+    bytes wait for the first parse instead of repeating it. Only entries no
+    session references are evicted once the store exceeds ``capacity``.
+    With a ``disk`` cache, misses are served from disk before parsing and
+    fresh parses are written back.
+    """
+
+    def __init__(self, capacity=DATASET_STORE_CAPACITY, disk=None):
+        self.capacity = capacity
+        self.disk = disk
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key, loader):
+        """Return the entry for ``key`` with its reference count incremented,
+        calling ``loader()`` to parse it if it is not stored yet. Returns None
+        when the loader fails (returns None)."""
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refcount += 1
+                    self._entries.move_to_end(key)
+                    return entry
+                pending = self._pending.get(key)
+                is_loader = pending is None
+                if is_loader:
+                    pending = self._pending[key] = threading.Event()
+            if not is_loader:
+                # Another session is parsing the same bytes; re-check afterwards
+                pending.wait()
+                continue
+
+            frame = None
+            try:
+                if self.disk is not None:
+                    frame = self.disk.load_frame(key)
+                if frame is None:
+                    frame = loader()
+                    if frame is not None and self.disk is not None:
+                        self.disk.save(key, frame)
+            finally:
+                with self._lock:
+                    del self._pending[key]
+                    pending.set()
+                    if frame is not None:
+                        entry = DatasetEntry(key, frame, self.disk)
+                        entry.refcount = 1
+                        self._entries[key] = entry
+                        self._evict()
+            return entry if frame is not None else None
+
+    def contains(self, key):
+        """Whether ``key`` can be opened without parsing (memory or disk)."""
+        with self._lock:
+            if key in self._entries:
+                return True
+        return self.disk is not None and self.disk.contains(key)
+
+    def release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.refcount > 0:
+                entry.refcount -= 1
+                self._evict()
+
+    def _evict(self):
+        if len(self._entries) <= self.capacity:
+            return
+        for key in [k for k, e in self._entries.items() if e.refcount == 0]:
+            del self._entries[key]
+            if len(self._entries) <= self.capacity:
+                break
+
+class DatasetHandle:
+    """Per-session reference to a store entry. The reference is released
+    when the handle is closed or garbage collected with its session."""
+
+    def __init__(self, store, entry):
+        self.key = entry.key
+        self.entry = entry
+        self._finalizer = weakref.finalize(self, store.release, entry.key)
+
+    def close(self):
+        self._finalizer()
+
+@st.cache_resource
+def get_dataset_store():
+    return DatasetStore(disk=get_disk_cache())
+
+def prewarm_dataset(store, key, data, name, member=None, progress=None):
+    """Background job: parse an upload into the store without holding a
+    reference, so the next rerun's ``open_dataset`` finds it cached."""
+    if store.acquire(key, lambda: parse_upload(data, name, progress, member)) is not None:
+        store.release(key)
+
+def upload_digest(file):
+    """SHA-256 of an upload's bytes, hashed once per upload (``file_id``)
+    so reruns do not re-read large files."""
+    digests = st.session_state.upload_digests
+    if file.file_id not in digests:
+        digests[file.file_id] = hashlib.sha256(file.getvalue()).hexdigest()
+    return digests[file.file_id]
+
+def dataset_key(file, member=None):
+    digest = upload_digest(file)
+    if member is None:
+        return f"{digest}{Path(file.name).suffix.lower()}"
+    member_digest = hashlib.sha256(f"{digest}/{member}".encode()).hexdigest()
+    suffix = ".waves" if member == STACKED_WAVES else Path(member).suffix.lower()
+    return f"{member_digest}{suffix}"
+
+def open_dataset(file, member=None):
+    """Resolve an upload (or one ``member`` of a zip upload) to its shared
+    DatasetEntry, parsing it only if no session has opened the same bytes
+    before."""
+    key = dataset_key(file, member)
+    handle = st.session_state.get("dataset_handle")
+    if handle is not None and handle.key == key:
+        return handle.entry
+
+    store = get_dataset_store()
+    if (
+        file.size >= BACKGROUND_PARSE_BYTES
+        and not (member or file.name).endswith((".xls", ".xlsx"))
+        and not store.contains(key)
+    ):
+        job = submit_job(
+            "parse", key, prewarm_dataset, store, key, file.getvalue(), file.name, member
+        )
+        if not job.done():
+            return None
+
+    entry = store.acquire(key, lambda: load_data(file, member))
+    if handle is not None:
+        handle.close()
+    st.session_state.dataset_handle = (
+        DatasetHandle(store, entry) if entry is not None else None
+    )
+    return entry
+
+def open_waves(files):
+    """(wave name, dataset key, shared DatasetEntry) per extra wave upload
+    that parses; every table file of a zip upload is a wave of its own
+    (named "archive.zip/member"). Each session holds one handle per wave;
+    handles of waves that are no longer uploaded are released."""
+    store = get_dataset_store()
+    handles = st.session_state.setdefault("wave_handles", {})
+    entries = []
+    for file in files:
+        for member in archive_members(file.getvalue(), file.name) or [None]:
+            key = dataset_key(file, member)
+            handle = handles.get(key)
+            if handle is None:
+                entry = store.acquire(
+                    key, lambda file=file, member=member: load_data(file, member)
+                )
+                if entry is None:
+                    continue
+                handle = handles[key] = DatasetHandle(store, entry)
+            name = file.name if member is None else f"{file.name}/{member}"
+            entries.append((name, key, handle.entry))
+    open_keys = {key for _, key, _ in entries}
+    for key in [k for k in handles if k not in open_keys]:
+        handles.pop(key).close()
+    return entries
+
+# ---------------------------------------------------------
+# Background jobs (long-running stages off the script thread)
+# ---------------------------------------------------------
+JOB_POOL_WORKERS = 4
+COMPUTE_POOL_WORKERS = os.cpu_count() or 1
+JOB_POLL_SECONDS = 0.5
+BACKGROUND_PARSE_BYTES = 20 * 1024 * 1024
+
+class JobCancelled(Exception):
+    pass
+
+class Job:
+    """A cancellable background computation for one session stage.
+
+    The job function receives a ``progress`` callback taking a fraction in
+    [0, 1]; the callback raises JobCancelled once the job is cancelled, so
+    work stops at the next progress report.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.progress = 0.0
+        self.future = None
+        self._cancelled = threading.Event()
+
+    def run(self, fn, args, kwargs):
+        return fn(*args, progress=self.report, **kwargs)
+
+    def report(self, fraction):
+        if self._cancelled.is_set():
+            raise JobCancelled()
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+
+    def cancel(self):
+        self._cancelled.set()
+        self.future.cancel()
+
+    def done(self):
+        return self.future.done()
+
+    def result(self):
+        return self.future.result()
+
+@st.cache_resource
+def get_job_pool():
+    return ThreadPoolExecutor(
+        max_workers=JOB_POOL_WORKERS, thread_name_prefix="stats-job"
+    )
+
+@st.cache_resource
+def get_compute_pool():
+    """Executor for data-parallel NumPy blocks mapped from the script
+    thread (NumPy releases the GIL, so blocks run side by side). Kept apart
+    from the job pool: a blocking map never waits behind parse/PDF jobs,
+    and never holds the workers those jobs need."""
+    return ThreadPoolExecutor(
+        max_workers=COMPUTE_POOL_WORKERS, thread_name_prefix="stats-compute"
+    )
+
+def submit_job(stage, key, fn, *args, **kwargs):
+    """Start ``fn`` in the background for this session's ``stage``.
+
+    A job already submitted for the same stage and ``key`` is returned as is
+    (its result survives reruns); a job for stale inputs is cancelled.
+    """
+    jobs = st.session_state.jobs
+    job = jobs.get(stage)
+    if job is not None and job.key == key:
+        return job
+    if job is not None:
+        job.cancel()
+    job = Job(key)
+    job.future = get_job_pool().submit(job.run, fn, args, kwargs)
+    jobs[stage] = job
+    return job
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def job_progress(stage, text):
+    """Progress bar of a running job. Only this fragment reruns while the
+    job works; once it has finished the whole page reruns to show the
+    result."""
+    job = st.session_state.jobs.get(stage)
+    if job is None or job.done():
+        st.rerun()
+    st.progress(job.progress, text=text)
+
+def fingerprint(*parts):
+    """Stable digest of job inputs (series/arrays hashed by value)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (pd.Series, pd.DataFrame)):
+            digest.update(pd.util.hash_pandas_object(part).to_numpy().tobytes())
+        elif isinstance(part, np.ndarray):
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+# ---------------------------------------------------------
+# Composite scoring
+# ---------------------------------------------------------
+SCORING_METHODS = {
+    "mean": "Mean of items",
+    "sum": "Sum of items",
+    "weighted_mean": "Weighted mean of items",
+}
+
+MISSING_STRATEGIES = {
+    "available": "Available items (minimum threshold)",
+    "listwise": "Listwise deletion",
+    "person_mean": "Person-mean imputation",
+    "item_mean": "Item-mean imputation",
+    "em": "EM imputation",
+}
+EM_MAX_ITER = 100
+EM_TOLERANCE = 1e-6
+
+@dataclass(frozen=True)
+class CompositeSpec:
+    """How a composite is scored from its items.
+
+    Specs are immutable and hashable, so they double as cache keys and can be
+    reused on any dataset that has the same item columns.
+    """
+
+    items: tuple
+    method: str = "mean"
+    reverse: tuple = ()
+    weights: tuple = ()
+    scale_min: float = 1.0
+    scale_max: float = 5.0
+    min_answered: int = 1
+    missing: str = "available"
+
+    def item_weights(self):
+        if self.method == "weighted_mean" and self.weights:
+            return np.asarray(self.weights, dtype=float)
+        return np.ones(len(self.items))
+
+    def describe(self):
+        text = SCORING_METHODS.get(self.method, self.method)
+        details = []
+        if self.reverse:
+            details.append(
+                f"reverse-coded ({self.scale_min:g}–{self.scale_max:g}): "
+                + ", ".join(self.reverse)
+            )
+        if self.min_answered > 1:
+            details.append(f"at least {self.min_answered} items answered")
+        if self.missing != "available":
+            details.append(MISSING_STRATEGIES.get(self.missing, self.missing))
+        return f"{text} ({'; '.join(details)})" if details else text
+
+def reverse_code_items(item_data, spec):
+    """Item block with the spec's reverse-coded items mirrored on the scale
+    (x → scale_min + scale_max − x) in one vectorized operation."""
+    values = item_data[list(spec.items)].to_numpy(dtype=float)
+    if spec.reverse:
+        flip = np.isin(np.asarray(spec.items, dtype=object), spec.reverse)
+        values = np.where(flip, spec.scale_min + spec.scale_max - values, values)
+    return pd.DataFrame(values, index=item_data.index, columns=list(spec.items))
+
+def em_impute(values, max_iter=EM_MAX_ITER, tol=EM_TOLERANCE):
+    """EM estimates of the item means and covariance under a multivariate
+    normal model, with every missing answer replaced by its conditional
+    expectation given the answered items of that row.
+
+    Rows are grouped by missingness pattern, so each iteration solves one
+    regression per pattern over all of its rows at once.
+
+    Returns (imputed values, mean vector, covariance matrix).
+    """
+    values = np.asarray(values, dtype=float)
+    n, k = values.shape
+    missing = np.isnan(values)
+    mu = np.nanmean(values, axis=0)
+    filled = np.where(missing, mu, values)
+    sigma = np.atleast_2d(np.cov(filled, rowvar=False))
+    patterns, inverse = np.unique(missing, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+
+    for _ in range(max_iter):
+        conditional = np.zeros((k, k))
+        for index, pattern in enumerate(patterns):
+            if not pattern.any():
+                continue
+            rows = np.flatnonzero(inverse == index)
+            m, o = np.flatnonzero(pattern), np.flatnonzero(~pattern)
+            if o.size:
+                coef = np.linalg.lstsq(sigma[np.ix_(o, o)], sigma[np.ix_(o, m)], rcond=None)[0]
+                filled[np.ix_(rows, m)] = mu[m] + (values[np.ix_(rows, o)] - mu[o]) @ coef
+                residual = sigma[np.ix_(m, m)] - sigma[np.ix_(m, o)] @ coef
+            else:
+                filled[np.ix_(rows, m)] = mu[m]
+                residual = sigma[np.ix_(m, m)]
+            conditional[np.ix_(m, m)] += rows.size * residual
+        new_mu = filled.mean(axis=0)
+        centered = filled - new_mu
+        new_sigma = (centered.T @ centered + conditional) / n
+        converged = max(np.abs(new_mu - mu).max(), np.abs(new_sigma - sigma).max()) < tol
+        mu, sigma = new_mu, new_sigma
+        if converged:
+            break
+    return filled, mu, sigma
+
+def impute_items(values, strategy):
+    """Item block (n × k) after the missing-data ``strategy``, vectorized
+    over the whole block. "available" leaves gaps for the scorer to skip;
+    "listwise" blanks every row with a gap."""
+    values = np.asarray(values, dtype=float)
+    missing = np.isnan(values)
+    if strategy == "listwise":
+        return np.where(missing.any(axis=1, keepdims=True), np.nan, values)
+    if strategy == "person_mean":
+        with np.errstate(invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            row_means = np.nanmean(values, axis=1, keepdims=True)
+        return np.where(missing, row_means, values)
+    if strategy == "item_mean":
+        return np.where(missing, np.nanmean(values, axis=0), values)
+    if strategy == "em" and missing.any():
+        return em_impute(values)[0]
+    return values
+
+def score_composite(item_data, spec):
+    """Composite score per respondent as one matrix operation over the
+    (reverse-coded) item block, after the spec's missing-data strategy.
+    Rows with fewer than ``spec.min_answered`` answered items get NaN. Sums
+    of partly answered rows are prorated to the full item set (weighted
+    mean × total weight), so they stay comparable across respondents."""
+    values = reverse_code_items(item_data, spec).to_numpy()
+    n_answered = (~np.isnan(values)).sum(axis=1)
+    values = impute_items(values, spec.missing)
+    weights = spec.item_weights()
+    answered = ~np.isnan(values)
+    weighted_sum = np.where(answered, values, 0.0) @ weights
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = weighted_sum / (answered @ weights)
+        if spec.method == "sum":
+            scores = scores * weights.sum()
+    scores = np.where(
+        (n_answered >= max(spec.min_answered, 1)) & answered.any(axis=1), scores, np.nan
+    )
+    return pd.Series(scores, index=item_data.index)
+
+def missing_data_report(item_data, spec):
+    """How many rows the spec's missing-data strategy touched."""
+    n_answered = item_data[list(spec.items)].notna().to_numpy().sum(axis=1)
+    k = len(spec.items)
+    kept = n_answered >= max(spec.min_answered, 1)
+    if spec.missing == "listwise":
+        kept &= n_answered == k
+    incomplete = n_answered < k
+    imputes = spec.missing in ("person_mean", "item_mean", "em")
+    return {
+        "Strategy": MISSING_STRATEGIES.get(spec.missing, spec.missing),
+        "Rows with missing items": int(incomplete.sum()),
+        "Rows excluded": int((~kept).sum()),
+        "Rows imputed": int((incomplete & kept).sum()) if imputes else 0,
+        "Values imputed": int((k - n_answered)[kept].sum()) if imputes else 0,
+    }
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def cached_composite(dataset_key, spec, _dataset):
+    """Composite for one (dataset, spec) pair. The X and Y composites are
+    cached separately, so editing one spec only recomputes that composite."""
+    return score_composite(_dataset.numeric_frame(spec.items), spec)
+
+def scoring_controls(prefix, items):
+    """Scoring options for one item set (in an expander); returns its spec."""
+    previous = st.session_state.get(f"{prefix}_spec")
+    if previous is None:
+        previous = CompositeSpec(items=tuple(items))
+
+    with st.expander(t("scoring_options", "Scoring options")):
+        method = st.selectbox(
+            t("scoring_method", "Composite score"),
+            options=list(SCORING_METHODS),
+            index=list(SCORING_METHODS).index(previous.method),
+            format_func=lambda m: SCORING_METHODS[m],
+            key=f"{prefix}_method",
+        )
+        c1, c2 = st.columns(2)
+        with c1:
+            scale_min = st.number_input(
+                t("scale_min", "Scale minimum"),
+                value=float(previous.scale_min),
+                key=f"{prefix}_scale_min",
+            )
+        with c2:
+            scale_max = st.number_input(
+                t("scale_max", "Scale maximum"),
+                value=float(previous.scale_max),
+                key=f"{prefix}_scale_max",
+            )
+        reverse = st.multiselect(
+            t("reverse_items", "Reverse-coded items"),
+            options=list(items),
+            default=[item for item in previous.reverse if item in items],
+            key=f"{prefix}_reverse",
+        )
+        min_answered = st.number_input(
+            t("min_answered", "Minimum answered items"),
+            min_value=1,
+            max_value=len(items),
+            value=min(max(previous.min_answered, 1), len(items)),
+            step=1,
+            key=f"{prefix}_min_answered",
+        )
+        missing = st.selectbox(
+            t("missing_strategy", "Missing answers"),
+            options=list(MISSING_STRATEGIES),
+            index=list(MISSING_STRATEGIES).index(previous.missing),
+            format_func=lambda m: MISSING_STRATEGIES[m],
+            key=f"{prefix}_missing",
+        )
+        weights = ()
+        if method == "weighted_mean":
+            old_weights = dict(zip(previous.items, previous.weights))
+            edited = st.data_editor(
+                pd.DataFrame(
+                    {
+                        "Item": list(items),
+                        "Weight": [float(old_weights.get(i, 1.0)) for i in items],
+                    }
+                ),
+                disabled=["Item"],
+                hide_index=True,
+                use_container_width=True,
+                key=f"{prefix}_weights_{fingerprint(tuple(items))[:12]}",
+            )
+            weights = tuple(edited["Weight"].fillna(0.0).astype(float))
+
+    spec = CompositeSpec(
+        items=tuple(items),
+        method=method,
+        reverse=tuple(item for item in items if item in reverse),
+        weights=weights,
+        scale_min=float(scale_min),
+        scale_max=float(scale_max),
+        min_answered=int(min_answered),
+        missing=missing,
+    )
+    st.session_state[f"{prefix}_spec"] = spec
+    return spec
+
+# ---------------------------------------------------------
+# Respondent quality screening
+# ---------------------------------------------------------
+QUALITY_CHUNK_ROWS = 50_000
+QUALITY_MAX_MISSING = 0.5
+QUALITY_OUTLIER_ALPHA = 0.001
+
+def respondent_quality(columns, chunk_rows=QUALITY_CHUNK_ROWS):
+    """Row-wise screening metrics of an item matrix given as its p columns
+    (length-n float arrays, NaN = missing).
+
+    Row blocks (float32, item-major) are gathered from the columns inside
+    the compute pool workers, so memory stays O(chunk_rows × p) beyond the
+    columns and the result. The first pass computes every metric that needs
+    no sample moments (answered count, missing ratio, within-row variance,
+    longest run of identical consecutive answers) together with the item
+    sums and cross-products. The Mahalanobis distance D² (missing answers set
+    to the item mean) needs the finished covariance, so it is the one metric
+    left for a second pass.
+    """
+    columns = list(columns)
+    n, p = len(columns[0]), len(columns)
+    blocks = [slice(start, min(start + chunk_rows, n)) for start in range(0, n, chunk_rows)]
+    pool = get_compute_pool()
+
+    def gather(rows):
+        block = np.empty((p, rows.stop - rows.start), dtype=np.float32)
+        for item, column in zip(block, columns):
+            item[:] = column[rows]
+        missing = np.isnan(block)
+        block[missing] = 0.0
+        return block, missing
+
+    # Cross-products are taken around the first block's item means, so the
+    # float32 sums do not cancel the way raw x·y sums would
+    shift = np.zeros(p, dtype=np.float32)
+    for j, column in enumerate(columns):
+        head = column[:chunk_rows]
+        head = head[~np.isnan(head)]
+        if head.size:
+            shift[j] = head.mean()
+
+    answered = np.empty(n, dtype=int)
+    row_variance = np.empty(n)
+    longest_run = np.empty(n, dtype=int)
+
+    def first_pass(rows):
+        block, missing = gather(rows)
+        observed = (~missing).astype(np.float32)
+        count = p - missing.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            row_mean = block.sum(axis=0, dtype=np.float64) / count
+            variance = np.einsum("ij,ij->j", block, block, dtype=np.float64) / count - row_mean**2
+        row_variance[rows] = np.where(count >= 2, np.maximum(variance, 0.0), np.nan)
+        answered[rows] = count
+
+        # Run lengths item by item, comparing the original float64 answers
+        current = np.zeros(block.shape[1], dtype=np.int32)
+        best = np.zeros_like(current)
+        for left, right in zip(columns, columns[1:]):
+            current += 1
+            current *= left[rows] == right[rows]
+            np.maximum(best, current, out=best)
+        longest_run[rows] = np.where(count > 0, best + 1, 0)
+
+        block -= shift[:, None] * observed
+        # z·o cross-products only differ from the item sums for items with
+        # missing answers in this block
+        partial = missing.any(axis=1)
+        sums = block.sum(axis=1, dtype=np.float64)
+        z_o = np.repeat(sums[:, None], p, axis=1)
+        z_o[:, partial] = block @ observed[partial].T
+        o_o = np.full((p, p), float(block.shape[1]))
+        if partial.any():
+            o_o = (observed @ observed.T).astype(np.float64)
+        return sums, count.size - missing.sum(axis=1), block @ block.T, z_o, o_o
+
+    moments = list(pool.map(first_pass, blocks))
+    sums, counts, z_z, z_o, o_o = (sum(m[k] for m in moments) for k in range(5))
+    offset = sums / np.maximum(counts, 1)
+    means = (shift + offset).astype(np.float32)
+    # Σ (z - o·d)(z - o·d)ᵀ with d = means - shift, from the shifted sums
+    scatter = (
+        z_z
+        - z_o * offset[None, :]
+        - z_o.T * offset[:, None]
+        + o_o * np.outer(offset, offset)
+    )
+    precision = np.linalg.pinv(scatter / max(n - 1, 1)).astype(np.float32)
+
+    distance = np.empty(n)
+
+    def second_pass(rows):
+        block, missing = gather(rows)
+        block -= means[:, None]
+        block[missing] = 0.0
+        distance[rows] = np.einsum("ij,ij->j", precision @ block, block)
+
+    list(pool.map(second_pass, blocks))
+    return pd.DataFrame(
+        {
+            "Answered": answered,
+            "Missing ratio": 1 - answered / p,
+            "Row variance": row_variance,
+            "Longest run": longest_run,
+            "Mahalanobis D²": distance,
+        }
+    )
+
+def flag_respondents(quality, max_missing=QUALITY_MAX_MISSING, max_run=None, alpha=QUALITY_OUTLIER_ALPHA):
+    """Boolean flags per respondent from respondent_quality() metrics.
+    D² is tested against chi-square with one df per answered item."""
+    answered = quality["Answered"].to_numpy()
+    flags = pd.DataFrame(
+        {
+            "Straight-lining": (quality["Row variance"] == 0) & (quality["Answered"] >= 3),
+            "Long identical run": quality["Longest run"] >= (max_run or np.inf),
+            "Too many missing": quality["Missing ratio"] > max_missing,
+            "Multivariate outlier": (answered > 0)
+            & (stats.chi2.sf(quality["Mahalanobis D²"], np.maximum(answered, 1)) < alpha),
+        },
+        index=quality.index,
+    )
+    flags["Flagged"] = flags.any(axis=1)
+    return flags
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_respondent_quality(dataset_key, columns, _dataset):
+    quality = respondent_quality([_dataset.numeric(c) for c in columns])
+    quality.index = _dataset.frame.index
+    return quality
+
+def compute_descriptive_stats(data, var_name, sketch=None, weights=None):
+    if weights is not None:
+        return weighted_descriptive_stats(data, var_name, weights)
     # paksa data jadi numerik, non-numeric jadi NaN
     data_numeric = pd.to_numeric(data, errors="coerce")
     data_clean = data_numeric.dropna()
@@ -999,7 +2722,9 @@ def compute_descriptive_stats(data, var_name):
         "Variable": var_name,
         "N": len(data_clean),
         "Mean": float(np.mean(data_clean)),
-        "Median": float(np.median(data_clean)),
+        "Median": float(sketch.quantile(0.5))
+        if sketch is not None
+        else float(np.median(data_clean)),
         "Mode": stats.mode(data_clean, keepdims=True)[0][0]
         if len(data_clean) > 0
         else np.nan,
@@ -1008,6 +2733,8 @@ def compute_descriptive_stats(data, var_name):
         "Std Dev": float(np.std(data_clean, ddof=1)),
         "Variance": float(np.var(data_clean, ddof=1)),
     }
+    if sketch is not None:
+        stats_dict["Median rank error"] = sketch.relative_error
 
     freq_table = pd.Series(data_clean).value_counts().sort_index()
     freq_table_pct = (freq_table / len(data_clean) * 100).round(2)
@@ -1022,7 +2749,141 @@ def compute_descriptive_stats(data, var_name):
     return stats_dict, freq_df
 
 
-def interpret_correlation(r, p_value):
+def _weight_mask(values, weights):
+    return ~np.isnan(values) & np.isfinite(weights) & (weights > 0)
+
+def weighted_descriptive_stats(data, var_name, weights):
+    """compute_descriptive_stats() under survey weights, read off one
+    weighted value table: pd.factorize + a weighted bincount give the total
+    weight of every distinct value, and the mean, variance, median, mode and
+    percentages all follow from that k-row table. The variance rescales the
+    weighted mean square by n / (n − 1). Rows with a missing or non-positive
+    weight are dropped; ``Frequency`` stays the raw count."""
+    values = np.asarray(pd.to_numeric(pd.Series(data), errors="coerce"), dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    keep = _weight_mask(values, weights)
+    if not keep.any():
+        return None, None
+
+    codes, uniques = pd.factorize(values[keep], sort=True)
+    value_weight = np.bincount(codes, weights=weights[keep])
+    counts = np.bincount(codes)
+    total = value_weight.sum()
+    n = int(keep.sum())
+    mean = float(uniques @ value_weight / total)
+    variance = float((uniques - mean) ** 2 @ value_weight / total * n / (n - 1)) if n > 1 else np.nan
+
+    cumulative = np.cumsum(value_weight)
+    mid = int(np.searchsorted(cumulative, total / 2))
+    median = uniques[mid]
+    if np.isclose(cumulative[mid], total / 2) and mid + 1 < len(uniques):
+        median = (median + uniques[mid + 1]) / 2
+
+    stats_dict = {
+        "Variable": var_name,
+        "N": n,
+        "Mean": mean,
+        "Median": float(median),
+        "Mode": float(uniques[np.argmax(value_weight)]),
+        "Minimum": float(uniques[0]),
+        "Maximum": float(uniques[-1]),
+        "Std Dev": float(np.sqrt(variance)),
+        "Variance": variance,
+        "Effective N": float(total**2 / (weights[keep] ** 2).sum()),
+    }
+    freq_df = pd.DataFrame(
+        {
+            "Value": uniques,
+            "Frequency": counts,
+            "Percentage": (value_weight / total * 100).round(2),
+        }
+    )
+    return stats_dict, freq_df
+
+def compute_reliability(item_data):
+    """Cronbach's alpha, alpha-if-item-deleted and corrected item-total
+    correlations for a block of items (complete responses only).
+
+    Everything is derived from one covariance matrix C of the k items:
+    the total-score variance is sum(C), and removing item i leaves a rest
+    score with variance sum(C) - 2 * rowsum_i + C_ii, so no refits are needed.
+    """
+    complete = item_data.dropna()
+    k = item_data.shape[1]
+    if k < 2 or len(complete) < 3:
+        return None, None
+
+    cov = np.cov(complete.to_numpy(dtype=float), rowvar=False)
+    item_var = np.diag(cov)
+    total_var = cov.sum()
+    row_sums = cov.sum(axis=1)
+    rest_var = total_var - 2 * row_sums + item_var
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        alpha = k / (k - 1) * (1 - item_var.sum() / total_var)
+        corrected_r = (row_sums - item_var) / np.sqrt(item_var * rest_var)
+        if k > 2:
+            alpha_deleted = (k - 1) / (k - 2) * (
+                1 - (item_var.sum() - item_var) / rest_var
+            )
+        else:
+            alpha_deleted = np.full(k, np.nan)
+
+    summary = {"Alpha": float(alpha), "Items": k, "N": len(complete)}
+    item_df = pd.DataFrame(
+        {
+            "Item": item_data.columns,
+            "Mean": complete.mean().to_numpy(),
+            "Corrected Item-Total r": corrected_r,
+            "Alpha if Item Deleted": alpha_deleted,
+        }
+    )
+    return summary, item_df
+
+def interpret_alpha(alpha):
+    if not np.isfinite(alpha):
+        return "undefined"
+    if alpha >= 0.9:
+        return "excellent"
+    if alpha >= 0.8:
+        return "good"
+    if alpha >= 0.7:
+        return "acceptable"
+    if alpha >= 0.6:
+        return "questionable"
+    if alpha >= 0.5:
+        return "poor"
+    return "unacceptable"
+
+def adjust_pvalues(p_values, method="none"):
+    """Multiple-comparison adjusted p-values (Bonferroni, Holm or
+    Benjamini–Hochberg) for a whole array at once; NaNs are left out of the
+    family. Holm and BH need a single sort, so the cost is O(m log m)."""
+    p = np.asarray(p_values, dtype=float)
+    adjusted = p.copy()
+    valid = ~np.isnan(p)
+    m = int(valid.sum())
+    if method == "none" or m == 0:
+        return adjusted
+
+    family = p[valid]
+    if method == "bonferroni":
+        result = family * m
+    else:
+        order = np.argsort(family, kind="mergesort")
+        ranked = family[order]
+        if method == "holm":
+            ranked = np.maximum.accumulate((m - np.arange(m)) * ranked)
+        elif method == "fdr_bh":
+            ranked = np.minimum.accumulate((m / np.arange(1, m + 1) * ranked)[::-1])[::-1]
+        else:
+            raise ValueError(f"Unknown p-value adjustment: {method}")
+        result = np.empty(m)
+        result[order] = ranked
+    adjusted[valid] = np.minimum(result, 1.0)
+    return adjusted
+
+def interpret_correlation(r, p_value, p_adjust="none"):
     direction = "positive" if r > 0 else "negative"
     abs_r = abs(r)
     if abs_r < 0.3:
@@ -1032,14 +2893,16 @@ def interpret_correlation(r, p_value):
     else:
         strength = "strong"
 
+    # p_value is expected to be already adjusted when p_adjust is not "none"
+    p_label = "p" if p_adjust == "none" else f"{P_ADJUST_METHODS[p_adjust]}-adjusted p"
     if p_value < 0.001:
-        sig_text = "highly significant (p < 0.001)"
+        sig_text = f"highly significant ({p_label} < 0.001)"
     elif p_value < 0.01:
-        sig_text = "very significant (p < 0.01)"
+        sig_text = f"very significant ({p_label} < 0.01)"
     elif p_value < 0.05:
-        sig_text = "significant (p < 0.05)"
+        sig_text = f"significant ({p_label} < 0.05)"
     else:
-        sig_text = "not significant (p ≥ 0.05)"
+        sig_text = f"not significant ({p_label} ≥ 0.05)"
 
     interpretation = (
         f"The correlation is {direction} and {strength} (r = {r:.4f}), "
@@ -1047,6 +2910,20 @@ def interpret_correlation(r, p_value):
     )
     return direction, strength, sig_text, interpretation
 
+def significance_column(r_values, p_values, p_adjust="none"):
+    """interpret_correlation()'s significance wording for each (r, adjusted p) pair.
+
+    Rows whose r or p could not be computed get None instead of a label.
+    """
+    return [
+        interpret_correlation(r, p, p_adjust)[2]
+        if np.isfinite(r) and np.isfinite(p)
+        else None
+        for r, p in zip(
+            np.asarray(r_values, dtype=float), np.asarray(p_values, dtype=float)
+        )
+    ]
+
 def check_normality(data):
     data_clean = data.dropna()
     if len(data_clean) < 3 or len(data_clean) > 5000:
@@ -1065,49 +2942,1763 @@ def check_normality(data):
         )
     return statistic, p_value, interpretation
 
-def generate_pdf_report(
-    df,
-    x_columns,
-    y_columns,
-    x_total,
-    y_total,
-    x_stats,
-    y_stats,
-    x_freq,
-    y_freq,
-    correlation_r,
-    correlation_p,
-    interpretation,
-    normality_x,
-    normality_y,
-    lang_code,
-):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    story = []
+# ---------------------------------------------------------
+# Pre-aggregated chart data (interactive, client-side mode)
+# ---------------------------------------------------------
+HIST_BINS = 20
+DENSITY_GRID_BINS = 40
+MAX_OUTLIER_POINTS = 200
 
-    # helper terjemahan lokal untuk PDF
-    _t = lambda key, fallback="": translate(lang_code, key, fallback)
+QUANTILE_SKETCH_MAX_N = 2**32
 
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        "CustomTitle",
-        parent=styles["Heading1"],
-        fontName="Times-Roman",
-        fontSize=18,
-        textColor=colors.HexColor("#1f77b4"),
-        spaceAfter=30,
-        alignment=TA_CENTER,
-    )
-    heading_style = ParagraphStyle(
-        "CustomHeading",
-        parent=styles["Heading2"],
-        fontName="Times-Roman",
-        fontSize=14,
-        textColor=colors.HexColor("#2c3e50"),
-        spaceAfter=12,
-        spaceBefore=12,
-    )
+class QuantileSketch:
+    """Mergeable streaming quantile sketch (KLL-style compactor stack).
+
+    Level h holds items of weight 2**h. When a level reaches capacity k it
+    is sorted and every other item (random offset) is promoted to the next
+    level. One compaction at level h moves any rank by at most 2**h, so the
+    sum of those weights is a hard bound on the rank error; with
+    k = log2(n_max) / epsilon it stays below epsilon * n for n <= n_max.
+    Until the first compaction the sketch is exact.
+    """
+
+    def __init__(self, epsilon=QUANTILE_SKETCH_EPSILON, n_max=QUANTILE_SKETCH_MAX_N, seed=0):
+        self.epsilon = float(epsilon)
+        self.k = int(np.ceil(np.log2(n_max) / self.epsilon))
+        self.levels = []
+        self.n = 0
+        self.rank_error = 0
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def relative_error(self):
+        """Achieved rank error bound as a fraction of n."""
+        return self.rank_error / self.n if self.n else 0.0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if values.size:
+            self.n += int(values.size)
+            self._push(0, values)
+            self._compress()
+        return self
+
+    def merge(self, other):
+        merged = QuantileSketch(min(self.epsilon, other.epsilon))
+        merged.k = max(self.k, other.k)
+        merged.n = self.n + other.n
+        merged.rank_error = self.rank_error + other.rank_error
+        for sketch in (self, other):
+            for h, items in enumerate(sketch.levels):
+                merged._push(h, items)
+        merged._compress()
+        return merged
+
+    def _push(self, h, items):
+        while len(self.levels) <= h:
+            self.levels.append(np.empty(0))
+        self.levels[h] = np.concatenate([self.levels[h], items])
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if items.size >= self.k:
+                items = np.sort(items)
+                paired = items.size - items.size % 2
+                offset = int(self._rng.integers(2))
+                self.levels[h] = items[paired:]
+                self._push(h + 1, items[offset:paired:2])
+                self.rank_error += 2**h
+            h += 1
+
+    def _weighted_items(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(level.size, 2**h, dtype=float) for h, level in enumerate(self.levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        if self.n == 0:
+            return np.nan
+        if self.rank_error == 0:
+            return np.percentile(self.levels[0], np.asarray(q) * 100)
+        items, cumulative = self._weighted_items()
+        index = np.searchsorted(cumulative, np.asarray(q) * cumulative[-1], side="left")
+        return items[np.minimum(index, items.size - 1)]
+
+    def midranks(self, values):
+        """Approximate 1-based midranks of ``values`` (ties share a rank)."""
+        items, cumulative = self._weighted_items()
+        cumulative = np.concatenate([[0.0], cumulative])
+        below = cumulative[np.searchsorted(items, values, side="left")]
+        at_or_below = cumulative[np.searchsorted(items, values, side="right")]
+        return (below + at_or_below + 1) / 2
+
+def build_quantile_sketch(data, epsilon=QUANTILE_SKETCH_EPSILON, chunk_rows=CSV_CHUNK_ROWS):
+    """Feed a series through a QuantileSketch in parse-sized chunks."""
+    values = np.asarray(pd.to_numeric(pd.Series(data), errors="coerce"), dtype=float)
+    sketch = QuantileSketch(epsilon)
+    for start in range(0, values.size, chunk_rows):
+        sketch.update(values[start : start + chunk_rows])
+    return sketch
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def cached_quantile_sketch(data, epsilon):
+    return build_quantile_sketch(data, epsilon)
+
+def sketch_spearman(x, y, x_sketch, y_sketch):
+    """Spearman's rho from sketch midranks (pairwise-complete x, y)."""
+    x_ranks = x_sketch.midranks(np.asarray(x, dtype=float))
+    y_ranks = y_sketch.midranks(np.asarray(y, dtype=float))
+    r = float(np.corrcoef(x_ranks, y_ranks)[0, 1])
+    return r, float(correlation_pvalues(r, x_ranks.size))
+
+def _finite_values(data):
+    values = np.asarray(pd.to_numeric(pd.Series(data), errors="coerce"), dtype=float)
+    return values[~np.isnan(values)]
+
+def histogram_summary(data, bins=HIST_BINS):
+    """Bin counts and edges of a series (NaN ignored)."""
+    values = _finite_values(data)
+    if values.size == 0:
+        return None
+    counts, edges = np.histogram(values, bins=bins)
+    return {"counts": counts, "edges": edges, "n": int(values.size)}
+
+def box_summary(data, sketch=None):
+    """Five-number summary with Tukey whiskers (1.5 × IQR) and outliers.
+
+    Quartiles come from ``sketch`` when given (no full sort of the data).
+    """
+    values = _finite_values(data)
+    if values.size == 0:
+        return None
+    if sketch is not None:
+        q1, median, q3 = sketch.quantile([0.25, 0.5, 0.75])
+    else:
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    whislo = float(inside.min()) if inside.size else float(q1)
+    whishi = float(inside.max()) if inside.size else float(q3)
+    outliers = np.unique(values[(values < whislo) | (values > whishi)])
+    return {
+        "min": float(values.min()),
+        "q1": float(q1),
+        "med": float(median),
+        "q3": float(q3),
+        "max": float(values.max()),
+        "whislo": whislo,
+        "whishi": whishi,
+        # Distinct outlier values only; capped so the payload stays O(1) in n.
+        "fliers": outliers[:MAX_OUTLIER_POINTS],
+        "n": int(values.size),
+        "rank_error": sketch.relative_error if sketch is not None else 0.0,
+    }
+
+def density_grid(x, y, bins=DENSITY_GRID_BINS):
+    """2-D bin counts of the pairwise-complete (x, y) observations."""
+    x_values = np.asarray(pd.to_numeric(pd.Series(x), errors="coerce"), dtype=float)
+    y_values = np.asarray(pd.to_numeric(pd.Series(y), errors="coerce"), dtype=float)
+    mask = ~(np.isnan(x_values) | np.isnan(y_values))
+    if not mask.any():
+        return None
+    counts, x_edges, y_edges = np.histogram2d(x_values[mask], y_values[mask], bins=bins)
+    return {"counts": counts, "x_edges": x_edges, "y_edges": y_edges, "n": int(mask.sum())}
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def composite_chart_summaries(data, sketch_epsilon=None):
+    """Histogram and boxplot summaries of one composite, computed once and
+    reused by every chart (Section 4 and the PDF) on later reruns.
+
+    With ``sketch_epsilon`` the boxplot quartiles come from a quantile sketch.
+    """
+    sketch = cached_quantile_sketch(data, sketch_epsilon) if sketch_epsilon else None
+    return {"hist": histogram_summary(data), "box": box_summary(data, sketch)}
+
+def plot_histogram(ax, summary, color):
+    edges = summary["edges"]
+    ax.bar(
+        edges[:-1],
+        summary["counts"],
+        width=np.diff(edges),
+        align="edge",
+        edgecolor="black",
+        alpha=0.7,
+        color=color,
+    )
+
+def plot_boxplot(ax, summary):
+    ax.bxp(
+        [{k: summary[k] for k in ("med", "q1", "q3", "whislo", "whishi", "fliers")}],
+        showfliers=True,
+    )
+
+def xy_moments(x, y):
+    """Sufficient statistics of the pairwise-complete (x, y) observations:
+    n, means, centred sums of squares/cross-products and the x range.
+    Pearson's r and the simple regression are both derived from these."""
+    x_values = np.asarray(x, dtype=float)
+    y_values = np.asarray(y, dtype=float)
+    mask = ~(np.isnan(x_values) | np.isnan(y_values))
+    x_values, y_values = x_values[mask], y_values[mask]
+    n = int(mask.sum())
+    if n == 0:
+        return None
+    mean_x, mean_y = x_values.mean(), y_values.mean()
+    dx, dy = x_values - mean_x, y_values - mean_y
+    return {
+        "n": n,
+        "mean_x": float(mean_x),
+        "mean_y": float(mean_y),
+        "sxx": float(dx @ dx),
+        "syy": float(dy @ dy),
+        "sxy": float(dx @ dy),
+        "min_x": float(x_values.min()),
+        "max_x": float(x_values.max()),
+    }
+
+def pearson_from_moments(moments):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = moments["sxy"] / np.sqrt(moments["sxx"] * moments["syy"])
+    return float(r), float(correlation_pvalues(r, moments["n"]))
+
+def linear_regression(moments, confidence=0.95):
+    """OLS of y on x from the sufficient statistics in ``moments``: slope,
+    intercept, R², standard errors, t tests and residual diagnostics, with no
+    further pass over the data."""
+    if moments is None or moments["n"] < 3 or moments["sxx"] <= 0:
+        return None
+    n = moments["n"]
+    sxx, syy, sxy = moments["sxx"], moments["syy"], moments["sxy"]
+    mean_x, mean_y = moments["mean_x"], moments["mean_y"]
+
+    slope = sxy / sxx
+    intercept = mean_y - slope * mean_x
+    df = n - 2
+    sse = max(syy - slope * sxy, 0.0)
+    residual_se = np.sqrt(sse / df)
+    r_squared = 1 - sse / syy if syy > 0 else np.nan
+    se_slope = residual_se / np.sqrt(sxx)
+    se_intercept = residual_se * np.sqrt(1 / n + mean_x**2 / sxx)
+    t_crit = stats.t.ppf(0.5 + confidence / 2, df)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_slope = slope / se_slope
+        t_intercept = intercept / se_intercept
+        f_stat = r_squared / (1 - r_squared) * df
+    # Leverage h = 1/n + (x − x̄)²/Sxx is largest at an end of the x range
+    max_leverage = 1 / n + max(
+        (moments["min_x"] - mean_x) ** 2, (moments["max_x"] - mean_x) ** 2
+    ) / sxx
+    return {
+        "n": n,
+        "df": df,
+        "slope": slope,
+        "intercept": intercept,
+        "se_slope": se_slope,
+        "se_intercept": se_intercept,
+        "t_slope": t_slope,
+        "p_slope": float(2 * stats.t.sf(abs(t_slope), df)),
+        "t_intercept": t_intercept,
+        "p_intercept": float(2 * stats.t.sf(abs(t_intercept), df)),
+        "slope_ci": (slope - t_crit * se_slope, slope + t_crit * se_slope),
+        "r_squared": r_squared,
+        "adj_r_squared": 1 - (1 - r_squared) * (n - 1) / df,
+        "residual_se": residual_se,
+        "f_stat": f_stat,
+        "max_leverage": max_leverage,
+        "confidence": confidence,
+        "t_crit": t_crit,
+        "mean_x": mean_x,
+        "sxx": sxx,
+        "x_range": (moments["min_x"], moments["max_x"]),
+    }
+
+def regression_band(regression, points=50):
+    """Fitted line and confidence band for the mean response over the x
+    range: ŷ ± t · s · sqrt(1/n + (x − x̄)²/Sxx)."""
+    x_grid = np.linspace(*regression["x_range"], points)
+    fitted = regression["intercept"] + regression["slope"] * x_grid
+    half_width = (
+        regression["t_crit"]
+        * regression["residual_se"]
+        * np.sqrt(1 / regression["n"] + (x_grid - regression["mean_x"]) ** 2 / regression["sxx"])
+    )
+    return x_grid, fitted, fitted - half_width, fitted + half_width
+
+def regression_residuals(regression, x, y):
+    """One pass over the valid (x, y) pairs for the diagnostics the
+    sufficient statistics cannot give: fitted values and residuals, a
+    normality test of the residuals (Shapiro-Wilk up to 5000 pairs,
+    D'Agostino-Pearson above) and Cook's distance
+    D = e² / (2 s²) · h / (1 − h)².
+
+    Returns (fitted, residuals, diagnostics dict).
+    """
+    valid = pd.DataFrame({"X": x, "Y": y}).dropna()
+    fitted = regression["intercept"] + regression["slope"] * valid["X"]
+    residuals = valid["Y"] - fitted
+    leverage = (
+        1 / regression["n"]
+        + (valid["X"] - regression["mean_x"]) ** 2 / regression["sxx"]
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cooks_d = (
+            residuals**2 / (2 * regression["residual_se"] ** 2) * leverage / (1 - leverage) ** 2
+        )
+    if len(residuals) <= 5000:
+        normality_test, (statistic, p_value) = "Shapiro-Wilk", shapiro(residuals)
+    else:
+        normality_test, (statistic, p_value) = "D'Agostino-Pearson", stats.normaltest(residuals)
+    return fitted, residuals, {
+        "normality_test": normality_test,
+        "normality_stat": float(statistic),
+        "normality_p": float(p_value),
+        "max_cooks_d": float(cooks_d.max()),
+        "influential": int((cooks_d > 4 / regression["n"]).sum()),
+    }
+
+def plot_regression(ax, regression, color="#dc2626"):
+    x_grid, fitted, lower, upper = regression_band(regression)
+    ax.fill_between(x_grid, lower, upper, color=color, alpha=0.2, linewidth=0)
+    ax.plot(
+        x_grid,
+        fitted,
+        color=color,
+        linewidth=2,
+        label=(
+            f"ŷ = {regression['intercept']:.3f} + {regression['slope']:.3f}x "
+            f"(R² = {regression['r_squared']:.3f})"
+        ),
+    )
+    ax.legend(loc="best", fontsize="small")
+
+def plot_xy_scatter(ax, x, y, bin_threshold=None, color="#22c55e"):
+    """Scatter of the valid (x, y) pairs, switching to a 2-D binned density
+    plot once there are more than ``bin_threshold`` pairs.
+
+    Returns the density mappable (for a colorbar) when binned, else None.
+    """
+    if bin_threshold is None:
+        bin_threshold = SCATTER_BIN_THRESHOLD
+    valid = pd.DataFrame({"X": x, "Y": y}).dropna()
+    if len(valid) <= bin_threshold:
+        ax.scatter(valid["X"], valid["Y"], alpha=0.6, color=color)
+        return None
+
+    grid = density_grid(valid["X"], valid["Y"])
+    counts = np.ma.masked_equal(grid["counts"].T, 0)
+    return ax.pcolormesh(grid["x_edges"], grid["y_edges"], counts, cmap="Greens")
+
+def histogram_chart_spec(summary, var_name, color):
+    edges = summary["edges"]
+    values = [
+        {"bin_start": float(lo), "bin_end": float(hi), "count": int(c)}
+        for lo, hi, c in zip(edges[:-1], edges[1:], summary["counts"])
+    ]
+    return {
+        "data": {"values": values},
+        "mark": {"type": "bar", "color": color, "stroke": "black", "opacity": 0.7},
+        "encoding": {
+            "x": {"field": "bin_start", "type": "quantitative", "title": var_name},
+            "x2": {"field": "bin_end"},
+            "y": {"field": "count", "type": "quantitative", "title": "Frequency"},
+            "tooltip": [
+                {"field": "bin_start", "title": "From", "format": ".3f"},
+                {"field": "bin_end", "title": "To", "format": ".3f"},
+                {"field": "count", "title": "Frequency"},
+            ],
+        },
+    }
+
+def boxplot_chart_spec(summaries):
+    """Layered boxplot spec from {variable name: box_summary} pairs."""
+    boxes = [
+        {"variable": name, **{k: s[k] for k in ("whislo", "q1", "med", "q3", "whishi", "n")}}
+        for name, s in summaries.items()
+    ]
+    fliers = [
+        {"variable": name, "value": float(v)}
+        for name, s in summaries.items()
+        for v in s["fliers"]
+    ]
+    x_enc = {"field": "variable", "type": "nominal", "title": None}
+    return {
+        "layer": [
+            {
+                "data": {"values": boxes},
+                "mark": {"type": "rule"},
+                "encoding": {
+                    "x": x_enc,
+                    "y": {"field": "whislo", "type": "quantitative", "title": None},
+                    "y2": {"field": "whishi"},
+                },
+            },
+            {
+                "data": {"values": boxes},
+                "mark": {"type": "bar", "size": 40, "color": "#93c5fd", "stroke": "black"},
+                "encoding": {
+                    "x": x_enc,
+                    "y": {"field": "q1", "type": "quantitative"},
+                    "y2": {"field": "q3"},
+                    "tooltip": [
+                        {"field": "variable"},
+                        {"field": "whislo", "title": "Lower whisker", "format": ".3f"},
+                        {"field": "q1", "title": "Q1", "format": ".3f"},
+                        {"field": "med", "title": "Median", "format": ".3f"},
+                        {"field": "q3", "title": "Q3", "format": ".3f"},
+                        {"field": "whishi", "title": "Upper whisker", "format": ".3f"},
+                        {"field": "n", "title": "N"},
+                    ],
+                },
+            },
+            {
+                "data": {"values": boxes},
+                "mark": {"type": "tick", "size": 40, "color": "#f97316", "thickness": 2},
+                "encoding": {"x": x_enc, "y": {"field": "med", "type": "quantitative"}},
+            },
+            {
+                "data": {"values": fliers},
+                "mark": {"type": "point", "color": "black"},
+                "encoding": {"x": x_enc, "y": {"field": "value", "type": "quantitative"}},
+            },
+        ],
+    }
+
+def density_chart_spec(grid, x_name, y_name, regression=None):
+    counts = grid["counts"]
+    x_edges, y_edges = grid["x_edges"], grid["y_edges"]
+    ix, iy = np.nonzero(counts)
+    values = [
+        {
+            "x": float(x_edges[i]),
+            "x2": float(x_edges[i + 1]),
+            "y": float(y_edges[j]),
+            "y2": float(y_edges[j + 1]),
+            "count": int(counts[i, j]),
+        }
+        for i, j in zip(ix, iy)
+    ]
+    layers = [
+        {
+            "data": {"values": values},
+            "mark": {"type": "rect"},
+            "encoding": {
+                "x": {"field": "x", "type": "quantitative", "title": x_name},
+                "x2": {"field": "x2"},
+                "y": {"field": "y", "type": "quantitative", "title": y_name},
+                "y2": {"field": "y2"},
+                "color": {
+                    "field": "count",
+                    "type": "quantitative",
+                    "title": "Count",
+                    "scale": {"scheme": "greens"},
+                },
+                "tooltip": [{"field": "count", "title": "Count"}],
+            },
+        }
+    ]
+    if regression is not None:
+        x_grid, fitted, lower, upper = regression_band(regression)
+        line = [
+            {"x": float(a), "fit": float(b), "lower": float(c), "upper": float(d)}
+            for a, b, c, d in zip(x_grid, fitted, lower, upper)
+        ]
+        layers += [
+            {
+                "data": {"values": line},
+                "mark": {"type": "area", "color": "#dc2626", "opacity": 0.2},
+                "encoding": {
+                    "x": {"field": "x", "type": "quantitative"},
+                    "y": {"field": "lower", "type": "quantitative"},
+                    "y2": {"field": "upper"},
+                },
+            },
+            {
+                "data": {"values": line},
+                "mark": {"type": "line", "color": "#dc2626", "strokeWidth": 2},
+                "encoding": {
+                    "x": {"field": "x", "type": "quantitative"},
+                    "y": {"field": "fit", "type": "quantitative"},
+                },
+            },
+        ]
+    return {"layer": layers}
+
+COUNTING_RANK_MAX_DISTINCT = 1024
+
+def midranks(values, groups=None, weights=None):
+    """Average ranks (ties share their mean rank, NaN stays NaN), optionally
+    within ``groups``. With (finite) ``weights`` the ranks are cumulative
+    weights, so a respondent counts as much as its weight.
+
+    Composite scores take only a few dozen distinct values, so when the
+    domain is small the ranks come from counting: pd.factorize maps values
+    to sorted codes, a bincount gives the tie sizes, and the cumulative
+    counts give a value→midrank table that every row is mapped through —
+    O(n + k) with exact ties. Larger domains fall back to a sort.
+    """
+    values = np.asarray(values, dtype=float)
+    codes, uniques = pd.factorize(values, sort=True)
+    k = len(uniques)
+    valid = codes >= 0
+    if groups is None:
+        if k > COUNTING_RANK_MAX_DISTINCT and weights is None:
+            # Rank the answered subset (rankdata's nan_policy needs SciPy 1.10)
+            ranks = np.full(values.shape, np.nan)
+            ranks[valid] = stats.rankdata(values[valid])
+            return ranks
+        counts = np.bincount(
+            codes[valid],
+            weights=None if weights is None else np.asarray(weights, dtype=float)[valid],
+            minlength=k,
+        )
+        table = np.cumsum(counts) - (counts - 1) / 2.0
+        return np.where(valid, table[codes], np.nan)
+
+    group_codes, group_labels = pd.factorize(np.asarray(groups))
+    valid &= group_codes >= 0
+    if weights is None and (k > COUNTING_RANK_MAX_DISTINCT or k * len(group_labels) > 2**24):
+        return (
+            pd.Series(values).groupby(group_codes).rank().where(valid).to_numpy()
+        )
+    cells = group_codes[valid] * k + codes[valid]
+    counts = np.bincount(
+        cells,
+        weights=None if weights is None else np.asarray(weights, dtype=float)[valid],
+        minlength=len(group_labels) * k,
+    ).reshape(-1, k)
+    table = np.cumsum(counts, axis=1) - (counts - 1) / 2.0
+    ranks = np.full(values.shape, np.nan)
+    ranks[valid] = table[group_codes[valid], codes[valid]]
+    return ranks
+
+def rank_frame(frame):
+    """Column-wise midranks() of a DataFrame."""
+    return frame.apply(lambda column: pd.Series(midranks(column), index=frame.index))
+
+def spearman_correlation(x, y):
+    """Spearman's rho and its t-test p-value on pairwise-complete rows,
+    ranked with midranks()."""
+    x_values = np.asarray(x, dtype=float)
+    y_values = np.asarray(y, dtype=float)
+    mask = ~(np.isnan(x_values) | np.isnan(y_values))
+    if mask.sum() < 3:
+        return np.nan, np.nan
+    r = float(np.corrcoef(midranks(x_values[mask]), midranks(y_values[mask]))[0, 1])
+    return r, float(correlation_pvalues(r, int(mask.sum())))
+
+def weighted_correlation(x, y, weights, method="Pearson"):
+    """Weighted Pearson (or Spearman, on weighted midranks) correlation of
+    pairwise-complete rows in one pass of weighted sums. The t test uses
+    Kish's effective sample size (Σw)² / Σw².
+
+    Returns (r, p, effective n).
+    """
+    x_values = np.asarray(x, dtype=float)
+    y_values = np.asarray(y, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    keep = _weight_mask(x_values, weights) & ~np.isnan(y_values)
+    x_values, y_values, weights = x_values[keep], y_values[keep], weights[keep]
+    if x_values.size < 3:
+        return np.nan, np.nan, float(x_values.size)
+    if method == "Spearman":
+        x_values = midranks(x_values, weights=weights)
+        y_values = midranks(y_values, weights=weights)
+
+    total = weights.sum()
+    dx = x_values - weights @ x_values / total
+    dy = y_values - weights @ y_values / total
+    r = float(weights @ (dx * dy) / np.sqrt((weights @ (dx * dx)) * (weights @ (dy * dy))))
+    n_eff = float(total**2 / (weights**2).sum())
+    return r, float(correlation_pvalues(r, n_eff)), n_eff
+
+def correlation_pvalues(r, n):
+    """Two-sided p-values of correlation coefficients (array-wise) from the
+    t distribution with n − 2 degrees of freedom."""
+    r = np.asarray(r, dtype=float)
+    n = np.asarray(n, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_stat = r * np.sqrt((n - 2) / (1 - r**2))
+        p = 2 * stats.t.sf(np.abs(t_stat), n - 2)
+    p = np.where(np.abs(r) >= 1, 0.0, p)
+    return np.where(n > 2, p, np.nan)
+
+def construct_matrix_analysis(scores, method="Pearson", p_adjust="none"):
+    """Descriptives, normality and all pairwise correlations of N construct
+    scores in one batched pass. Correlations use pairwise-complete rows.
+
+    The p matrix is adjusted with ``p_adjust`` over the family of
+    N(N − 1)/2 distinct construct pairs.
+
+    Returns (descriptives DataFrame, r matrix, p matrix, n matrix).
+    """
+    values = scores.to_numpy(dtype=float)
+    answered = ~np.isnan(values)
+
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        desc = pd.DataFrame(
+            {
+                "N": answered.sum(axis=0),
+                "Mean": np.nanmean(values, axis=0),
+                "Median": np.nanmedian(values, axis=0),
+                "Std Dev": np.nanstd(values, axis=0, ddof=1),
+                "Minimum": np.nanmin(values, axis=0),
+                "Maximum": np.nanmax(values, axis=0),
+            },
+            index=scores.columns,
+        )
+    normality = [check_normality(scores[col])[:2] for col in scores.columns]
+    desc["Shapiro W"] = [w for w, _ in normality]
+    desc["Shapiro p"] = [p for _, p in normality]
+
+    if answered.all():
+        ranked = rank_frame(scores) if method == "Spearman" else scores
+        r = pd.DataFrame(
+            np.corrcoef(ranked.to_numpy(dtype=float), rowvar=False),
+            index=scores.columns,
+            columns=scores.columns,
+        )
+    else:
+        r = scores.corr(method=method.lower())
+    counts = answered.T.astype(float) @ answered.astype(float)
+    n = pd.DataFrame(counts.astype(int), index=scores.columns, columns=scores.columns)
+    p_values = correlation_pvalues(r, counts)
+    upper = np.triu_indices_from(p_values, k=1)
+    family = adjust_pvalues(p_values[upper], p_adjust)
+    p_values[upper] = family
+    p_values[upper[::-1]] = family
+    np.fill_diagonal(p_values, np.nan)
+    p = pd.DataFrame(p_values, index=scores.columns, columns=scores.columns)
+    return desc, r, p, n
+
+def partial_correlations(data, method="Pearson"):
+    """Partial and semi-partial correlations of every pair of columns given
+    all remaining columns, from a single inversion of the correlation matrix
+    (complete rows only; Spearman works on ranks).
+
+    With P the precision matrix of the correlations, the partial correlation
+    is −P_ij / sqrt(P_ii P_jj), and the semi-partial correlation of column i
+    with column j (j residualized on the rest) is
+    pcor_ij / sqrt(P_ii (1 − pcor_ij²)). The t test is the same for both,
+    with n − 2 − k degrees of freedom for k controlled columns.
+
+    Returns (partial DataFrame, semi-partial DataFrame, p-value DataFrame, n).
+    """
+    complete = data.dropna()
+    n = len(complete)
+    columns = complete.columns
+    if method == "Spearman":
+        complete = rank_frame(complete)
+    corr = np.corrcoef(complete.to_numpy(dtype=float), rowvar=False)
+    precision = np.linalg.pinv(corr)
+    diag = np.diag(precision)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pcor = -precision / np.sqrt(np.outer(diag, diag))
+        np.fill_diagonal(pcor, 1.0)
+        spcor = pcor / np.sqrt(diag[:, None] * (1 - pcor**2))
+        np.fill_diagonal(spcor, 1.0)
+
+    k = len(columns) - 2
+    p_values = correlation_pvalues(pcor, np.full(pcor.shape, n - k))
+    np.fill_diagonal(p_values, np.nan)
+    as_frame = lambda values: pd.DataFrame(values, index=columns, columns=columns)
+    return as_frame(pcor), as_frame(spcor), as_frame(p_values), n
+
+MAX_GROUPS = 1000
+
+def grouped_analysis(x, y, groups, method="Pearson", p_adjust="none"):
+    """Per-group descriptives, normality and X–Y correlation in one
+    split-apply-combine pass.
+
+    Correlations come from per-group sufficient sums (groupby().sum() of x,
+    y, x², y², xy after centering on the pooled means), so no Python loop
+    runs over the groups; Spearman ranks within each group first. Shapiro-Wilk
+    is the only per-group call; it runs inline, since it holds the GIL and
+    threads would not speed it up. Also returns a Fisher z test for the
+    difference between the group correlations. ``p_adjust`` corrects the
+    per-group p-values for the number of groups, and the Significance column
+    is worded from the corrected values.
+    """
+    frame = pd.DataFrame({"group": groups, "X": x, "Y": y}).dropna()
+    if frame.empty:
+        return None, None
+    grouped = frame.groupby("group", sort=True)
+
+    table = grouped.agg(
+        N=("X", "size"),
+        X_mean=("X", "mean"),
+        X_sd=("X", "std"),
+        X_median=("X", "median"),
+        Y_mean=("Y", "mean"),
+        Y_sd=("Y", "std"),
+        Y_median=("Y", "median"),
+    )
+
+    if method == "Spearman":
+        cx = pd.Series(midranks(frame["X"], frame["group"]), index=frame.index)
+        cy = pd.Series(midranks(frame["Y"], frame["group"]), index=frame.index)
+    else:
+        cx, cy = frame["X"], frame["Y"]
+    cx = cx - cx.mean()
+    cy = cy - cy.mean()
+    sums = (
+        pd.DataFrame(
+            {"x": cx, "y": cy, "xx": cx * cx, "yy": cy * cy, "xy": cx * cy}
+        )
+        .groupby(frame["group"], sort=True)
+        .sum()
+    )
+    n = table["N"].to_numpy(dtype=float)
+    sxx = sums["xx"] - sums["x"] ** 2 / n
+    syy = sums["yy"] - sums["y"] ** 2 / n
+    sxy = sums["xy"] - sums["x"] * sums["y"] / n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = (sxy / np.sqrt(sxx * syy)).to_numpy()
+    r = np.where(n >= 3, np.clip(r, -1.0, 1.0), np.nan)
+    table["r"] = r
+    table["p-value"] = correlation_pvalues(r, n)
+    table["p-adjusted"] = adjust_pvalues(table["p-value"].to_numpy(), p_adjust)
+    table["Significance"] = significance_column(table["r"], table["p-adjusted"], p_adjust)
+
+    normality_p = [
+        (check_normality(values["X"])[1], check_normality(values["Y"])[1])
+        for _, values in grouped[["X", "Y"]]
+    ]
+    table["Shapiro p (X)"] = [p for p, _ in normality_p]
+    table["Shapiro p (Y)"] = [p for _, p in normality_p]
+
+    return table, fisher_z_heterogeneity(r, n, method)
+
+def fisher_z_heterogeneity(r, n, method="Pearson"):
+    """Test H0: all group correlations are equal, via Fisher's z.
+
+    Q = Σ w_i (z_i − z̄)² with w_i = n_i − 3 (divided by 1.06 for Spearman)
+    is χ² with k − 1 df; for two groups this is the usual z test (Q = z²).
+    """
+    r = np.asarray(r, dtype=float)
+    n = np.asarray(n, dtype=float)
+    usable = np.isfinite(r) & (n > 3) & (np.abs(r) < 1)
+    if usable.sum() < 2:
+        return None
+    z = np.arctanh(r[usable])
+    weights = n[usable] - 3
+    if method == "Spearman":
+        weights = weights / 1.06
+    z_bar = np.sum(weights * z) / np.sum(weights)
+    q = float(np.sum(weights * (z - z_bar) ** 2))
+    df = int(usable.sum()) - 1
+    result = {"Q": q, "df": df, "p-value": float(stats.chi2.sf(q, df)), "groups": df + 1}
+    if df == 1:
+        result["z"] = float((z[0] - z[1]) / np.sqrt(1 / weights[0] + 1 / weights[1]))
+    return result
+
+def compare_correlations(r1, n1, r2, n2, method="Pearson"):
+    """Two-sided z test for the difference of independent correlations
+    (Fisher's z; variance inflated by 1.06 for Spearman), array-wise.
+
+    Returns (z, p).
+    """
+    r1, n1, r2, n2 = (np.asarray(a, dtype=float) for a in (r1, n1, r2, n2))
+    inflation = 1.06 if method == "Spearman" else 1.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        se = np.sqrt(inflation * (1 / (n1 - 3) + 1 / (n2 - 3)))
+        z = (np.arctanh(np.clip(r2, -0.999999, 0.999999)) - np.arctanh(np.clip(r1, -0.999999, 0.999999))) / se
+    usable = (n1 > 3) & (n2 > 3)
+    return np.where(usable, z, np.nan), np.where(usable, 2 * stats.norm.sf(np.abs(z)), np.nan)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def wave_statistics(dataset_key, x_spec, y_spec, _dataset):
+    """Composite descriptives and X–Y correlations of one wave, cached per
+    (file content, specs) so adding a wave only computes that wave.
+
+    Means and SDs use every answered value of each composite, with their own
+    counts ("X N", "Y N"); "N" is the pairwise-complete count behind the
+    correlations."""
+    x_total = cached_composite(dataset_key, x_spec, _dataset=_dataset)
+    y_total = cached_composite(dataset_key, y_spec, _dataset=_dataset)
+    moments = xy_moments(x_total, y_total)
+    r, p = pearson_from_moments(moments) if moments and moments["n"] > 2 else (np.nan, np.nan)
+    rho, rho_p = spearman_correlation(x_total, y_total)
+    return {
+        "N": moments["n"] if moments else 0,
+        "X N": int(x_total.count()),
+        "X mean": float(x_total.mean()),
+        "X SD": float(x_total.std()),
+        "Y N": int(y_total.count()),
+        "Y mean": float(y_total.mean()),
+        "Y SD": float(y_total.std()),
+        "Pearson r": r,
+        "p (r)": p,
+        "Spearman rho": rho,
+        "p (rho)": rho_p,
+    }
+
+def wave_deltas(waves, p_adjust="none"):
+    """Wave-over-wave changes between consecutive rows of a per-wave table:
+    Welch t tests on the composite means (each with its own count) and z
+    tests on the correlations (pairwise N), with each family of p-values
+    adjusted with ``p_adjust``."""
+    previous, current = waves.iloc[:-1], waves.iloc[1:]
+    deltas = pd.DataFrame(
+        {"From": previous.index, "To": current.index}
+    )
+    for name in ("X", "Y"):
+        test = stats.ttest_ind_from_stats(
+            current[f"{name} mean"].to_numpy(),
+            current[f"{name} SD"].to_numpy(),
+            current[f"{name} N"].to_numpy(),
+            previous[f"{name} mean"].to_numpy(),
+            previous[f"{name} SD"].to_numpy(),
+            previous[f"{name} N"].to_numpy(),
+            equal_var=False,
+        )
+        deltas[f"Δ {name} mean"] = current[f"{name} mean"].to_numpy() - previous[f"{name} mean"].to_numpy()
+        deltas[f"p (Δ {name})"] = adjust_pvalues(np.asarray(test.pvalue), p_adjust)
+    for column, method in (("Pearson r", "Pearson"), ("Spearman rho", "Spearman")):
+        z, p = compare_correlations(
+            previous[column], previous["N"], current[column], current["N"], method
+        )
+        deltas[f"Δ {column}"] = current[column].to_numpy() - previous[column].to_numpy()
+        deltas[f"z (Δ {column})"] = z
+        deltas[f"p (Δ {column})"] = adjust_pvalues(p, p_adjust)
+    return deltas
+
+# ---------------------------------------------------------
+# Item-level association (contingency tables)
+# ---------------------------------------------------------
+CONTINGENCY_MAX_CATEGORIES = 15
+
+def item_crosstabs(x_items, y_items):
+    """Count tables of every X item against every Y item, batched.
+
+    Each item is factorized once into sorted category codes; then, per X
+    item, a single bincount over (Y item, x code, y code) cells builds its
+    tables against all Y items at once. Tables are padded to K × K (K = the
+    largest number of categories) so the statistics run over the whole stack.
+
+    Returns (tables [n_x, n_y, K, K], x categories, y categories).
+    """
+    def encode(frame):
+        factorized = [pd.factorize(frame[col].to_numpy(dtype=float), sort=True) for col in frame.columns]
+        return np.column_stack([codes for codes, _ in factorized]), [cats for _, cats in factorized]
+
+    x_codes, x_categories = encode(x_items)
+    y_codes, y_categories = encode(y_items)
+    k = max(len(cats) for cats in x_categories + y_categories)
+    n_y = y_codes.shape[1]
+    offsets = np.arange(n_y) * k * k
+    tables = np.empty((x_codes.shape[1], n_y, k, k), dtype=np.int64)
+    for i in range(x_codes.shape[1]):
+        x_code = x_codes[:, [i]]
+        answered = (x_code >= 0) & (y_codes >= 0)
+        cells = (offsets + x_code * k + y_codes)[answered]
+        tables[i] = np.bincount(cells, minlength=n_y * k * k).reshape(n_y, k, k)
+    return tables, x_categories, y_categories
+
+def _strict_suffix_sum(a, axis):
+    return np.flip(np.cumsum(np.flip(a, axis), axis), axis) - a
+
+def contingency_statistics(tables):
+    """Chi-square test of independence, Cramér's V and Goodman–Kruskal gamma
+    for a stack of count tables (..., K, K), computed from the counts alone.
+    Empty rows/columns (padding) are ignored."""
+    tables = np.asarray(tables, dtype=float)
+    n = tables.sum(axis=(-2, -1))
+    row_totals = tables.sum(axis=-1)
+    col_totals = tables.sum(axis=-2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = row_totals[..., :, None] * col_totals[..., None, :] / n[..., None, None]
+        chi2 = np.where(expected > 0, (tables - expected) ** 2 / expected, 0.0).sum(axis=(-2, -1))
+    n_rows = (row_totals > 0).sum(axis=-1)
+    n_cols = (col_totals > 0).sum(axis=-1)
+    dof = (n_rows - 1) * (n_cols - 1)
+    p_values = np.where(dof > 0, stats.chi2.sf(chi2, np.maximum(dof, 1)), np.nan)
+    min_dim = np.minimum(n_rows, n_cols) - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cramers_v = np.where(min_dim > 0, np.sqrt(chi2 / (n * min_dim)), np.nan)
+
+    # Pairs strictly below a cell, then strictly right (concordant) or left (discordant)
+    below = _strict_suffix_sum(tables, -2)
+    concordant = (tables * _strict_suffix_sum(below, -1)).sum(axis=(-2, -1))
+    discordant = (tables * (np.cumsum(below, axis=-1) - below)).sum(axis=(-2, -1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = (concordant - discordant) / (concordant + discordant)
+    return {
+        "n": n.astype(int),
+        "chi2": chi2,
+        "dof": dof,
+        "p": p_values,
+        "cramers_v": cramers_v,
+        "gamma": gamma,
+    }
+
+def _bivariate_normal_cdf(h, k, rho):
+    """Standard bivariate normal CDF via Owen's T (finite h, k)."""
+    h = np.where(h == 0, 1e-12, h)
+    k = np.where(k == 0, 1e-12, k)
+    root = np.sqrt(1 - rho * rho)
+    beta = np.where(h * k < 0, 0.5, 0.0)
+    return (
+        0.5 * special.ndtr(h)
+        + 0.5 * special.ndtr(k)
+        - special.owens_t(h, (k - rho * h) / (h * root))
+        - special.owens_t(k, (h - rho * k) / (k * root))
+        - beta
+    )
+
+def polychoric(table):
+    """Two-step polychoric correlation of one ordinal count table.
+
+    Thresholds come from the cumulative margins; rho then maximizes the
+    multinomial likelihood of the cell counts (bounded scalar search), each
+    evaluation being O(k²) in the table size.
+    """
+    table = np.asarray(table, dtype=float)
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    if min(table.shape) < 2:
+        return np.nan
+    n = table.sum()
+    a = special.ndtri(np.cumsum(table.sum(axis=1))[:-1] / n)
+    b = special.ndtri(np.cumsum(table.sum(axis=0))[:-1] / n)
+
+    def cell_probabilities(rho):
+        grid = np.zeros((a.size + 2, b.size + 2))
+        grid[1:-1, 1:-1] = _bivariate_normal_cdf(a[:, None], b[None, :], rho)
+        grid[1:-1, -1] = special.ndtr(a)
+        grid[-1, 1:-1] = special.ndtr(b)
+        grid[-1, -1] = 1.0
+        return np.diff(np.diff(grid, axis=0), axis=1)
+
+    def negative_log_likelihood(rho):
+        return -(table * np.log(np.clip(cell_probabilities(rho), 1e-300, None))).sum()
+
+    result = optimize.minimize_scalar(
+        negative_log_likelihood, bounds=(-0.999, 0.999), method="bounded"
+    )
+    return float(result.x)
+
+def item_association(x_items, y_items, p_adjust="none"):
+    """Chi-square, Cramér's V, gamma and polychoric r for every X item × Y
+    item pair, all from one batched set of count tables.
+
+    Returns (summary DataFrame, tables, x categories, y categories). The
+    Significance column is read from the ``p_adjust``-corrected p-values.
+    """
+    tables, x_categories, y_categories = item_crosstabs(x_items, y_items)
+    measures = contingency_statistics(tables)
+    rows = []
+    for i, x_item in enumerate(x_items.columns):
+        for j, y_item in enumerate(y_items.columns):
+            rows.append(
+                {
+                    "X item": x_item,
+                    "Y item": y_item,
+                    "N": measures["n"][i, j],
+                    "Chi-square": measures["chi2"][i, j],
+                    "df": measures["dof"][i, j],
+                    "p-value": measures["p"][i, j],
+                    "Cramér's V": measures["cramers_v"][i, j],
+                    "Gamma": measures["gamma"][i, j],
+                    "Polychoric r": polychoric(tables[i, j]),
+                }
+            )
+    summary = pd.DataFrame(rows)
+    summary.insert(
+        6, "p-adjusted", adjust_pvalues(summary["p-value"].to_numpy(), p_adjust)
+    )
+    summary.insert(
+        7,
+        "Significance",
+        significance_column(summary["Cramér's V"], summary["p-adjusted"], p_adjust),
+    )
+    return summary, tables, x_categories, y_categories
+
+# ---------------------------------------------------------
+# Mergeable summaries (incremental updates for live surveys)
+# ---------------------------------------------------------
+SUMMARY_VARIABLES = ("X_total", "Y_total")
+
+def _histogram_quantile(values, counts, q):
+    """Quantile of a value histogram (sorted values), interpolated like
+    ``np.percentile``'s default linear method."""
+    cumulative = np.cumsum(counts)
+    position = (cumulative[-1] - 1) * q
+    lower, upper = int(np.floor(position)), int(np.ceil(position))
+    lo_value = values[np.searchsorted(cumulative, lower, side="right")]
+    hi_value = values[np.searchsorted(cumulative, upper, side="right")]
+    return float(lo_value + (hi_value - lo_value) * (position - lower))
+
+class ResponseSummary:
+    """Mergeable sufficient statistics of the X/Y composites.
+
+    Holds, per composite, n, mean, the centred sum of squares (Welford) and
+    the min/max, and a value histogram that doubles as an exact
+    order-statistics sketch. The pairwise-complete (X, Y) block keeps the
+    co-moments needed for Pearson's r and the regression. Batches are folded
+    in with Chan et al.'s pairwise update, so adding rows costs O(batch), and
+    the whole summary round-trips through JSON.
+    """
+
+    def __init__(self, meta=None):
+        self.meta = dict(meta or {})
+        self.univariate = {
+            name: {"n": 0, "mean": 0.0, "m2": 0.0, "min": np.inf, "max": -np.inf, "hist": {}}
+            for name in SUMMARY_VARIABLES
+        }
+        self.joint = {
+            "n": 0, "mean_x": 0.0, "mean_y": 0.0,
+            "sxx": 0.0, "syy": 0.0, "sxy": 0.0,
+            "min_x": np.inf, "max_x": -np.inf,
+        }
+
+    @classmethod
+    def from_batch(cls, x, y, meta=None):
+        summary = cls(meta)
+        summary.update(x, y)
+        return summary
+
+    def update(self, x, y):
+        """Fold a batch of composite scores (NaN = missing) into the summary."""
+        x_values = np.asarray(x, dtype=float)
+        y_values = np.asarray(y, dtype=float)
+        for name, values in zip(SUMMARY_VARIABLES, (x_values, y_values)):
+            values = values[~np.isnan(values)]
+            if values.size == 0:
+                continue
+            counts = pd.Series(values).value_counts()
+            batch = {
+                "n": int(values.size),
+                "mean": float(values.mean()),
+                "m2": float(((values - values.mean()) ** 2).sum()),
+                "min": float(values.min()),
+                "max": float(values.max()),
+                "hist": dict(zip(counts.index.tolist(), counts.tolist())),
+            }
+            self.univariate[name] = self._merge_univariate(self.univariate[name], batch)
+
+        moments = xy_moments(x_values, y_values)
+        if moments is not None:
+            self.joint = self._merge_joint(self.joint, moments)
+        return self
+
+    def merge(self, other):
+        merged = ResponseSummary(self.meta or other.meta)
+        for name in SUMMARY_VARIABLES:
+            merged.univariate[name] = self._merge_univariate(
+                self.univariate[name], other.univariate[name]
+            )
+        merged.joint = self._merge_joint(self.joint, other.joint)
+        return merged
+
+    @staticmethod
+    def _merge_univariate(a, b):
+        if b["n"] == 0:
+            return dict(a, hist=dict(a["hist"]))
+        if a["n"] == 0:
+            return dict(b, hist=dict(b["hist"]))
+        n = a["n"] + b["n"]
+        delta = b["mean"] - a["mean"]
+        hist = dict(a["hist"])
+        for value, count in b["hist"].items():
+            hist[value] = hist.get(value, 0) + count
+        return {
+            "n": n,
+            "mean": a["mean"] + delta * b["n"] / n,
+            "m2": a["m2"] + b["m2"] + delta**2 * a["n"] * b["n"] / n,
+            "min": min(a["min"], b["min"]),
+            "max": max(a["max"], b["max"]),
+            "hist": hist,
+        }
+
+    @staticmethod
+    def _merge_joint(a, b):
+        if b["n"] == 0:
+            return dict(a)
+        if a["n"] == 0:
+            return {key: b[key] for key in a}
+        n = a["n"] + b["n"]
+        dx = b["mean_x"] - a["mean_x"]
+        dy = b["mean_y"] - a["mean_y"]
+        weight = a["n"] * b["n"] / n
+        return {
+            "n": n,
+            "mean_x": a["mean_x"] + dx * b["n"] / n,
+            "mean_y": a["mean_y"] + dy * b["n"] / n,
+            "sxx": a["sxx"] + b["sxx"] + dx * dx * weight,
+            "syy": a["syy"] + b["syy"] + dy * dy * weight,
+            "sxy": a["sxy"] + b["sxy"] + dx * dy * weight,
+            "min_x": min(a["min_x"], b["min_x"]),
+            "max_x": max(a["max_x"], b["max_x"]),
+        }
+
+    def descriptives(self, name):
+        """(stats_dict, freq_df) in the same shape as
+        compute_descriptive_stats(), built from the summary alone."""
+        uni = self.univariate[name]
+        if uni["n"] == 0:
+            return None, None
+        values = np.array(sorted(uni["hist"]), dtype=float)
+        counts = np.array([uni["hist"][v] for v in values])
+        stats_dict = {
+            "Variable": name,
+            "N": uni["n"],
+            "Mean": uni["mean"],
+            "Median": _histogram_quantile(values, counts, 0.5),
+            "Mode": float(values[np.argmax(counts)]),
+            "Minimum": uni["min"],
+            "Maximum": uni["max"],
+            "Std Dev": float(np.sqrt(uni["m2"] / (uni["n"] - 1))) if uni["n"] > 1 else np.nan,
+            "Variance": uni["m2"] / (uni["n"] - 1) if uni["n"] > 1 else np.nan,
+        }
+        freq_df = pd.DataFrame(
+            {
+                "Value": values,
+                "Frequency": counts,
+                "Percentage": (counts / uni["n"] * 100).round(2),
+            }
+        )
+        return stats_dict, freq_df
+
+    def moments(self):
+        return dict(self.joint) if self.joint["n"] > 0 else None
+
+    def pearson(self):
+        if self.joint["n"] < 3:
+            return np.nan, np.nan
+        return pearson_from_moments(self.joint)
+
+    def to_json(self):
+        def encode(uni):
+            return dict(
+                uni,
+                hist={"values": list(uni["hist"]), "counts": list(uni["hist"].values())},
+            )
+        return json.dumps(
+            {
+                "version": 1,
+                "meta": self.meta,
+                "univariate": {k: encode(v) for k, v in self.univariate.items()},
+                "joint": self.joint,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, text):
+        payload = json.loads(text)
+        summary = cls(payload.get("meta"))
+        for name, uni in payload["univariate"].items():
+            hist = uni["hist"]
+            summary.univariate[name] = dict(
+                uni, hist=dict(zip(map(float, hist["values"]), hist["counts"]))
+            )
+        summary.joint = payload["joint"]
+        return summary
+
+def median_error_note(stats_dict):
+    """' (±ε rank)' suffix for a sketched median, else ''."""
+    if "Median rank error" not in stats_dict:
+        return ""
+    return f" (±{stats_dict['Median rank error']:.2%} rank)"
+
+# ---------------------------------------------------------
+# PDF report (lazy charts, vector or compressed raster output)
+# ---------------------------------------------------------
+PDF_CHART_FORMATS = {
+    "vector": "Vector (sharp at any zoom)",
+    "png": "PNG (lossless raster)",
+    "jpeg": "JPEG (compressed raster)",
+}
+PDF_CHART_FORMAT = "png"
+PDF_CHART_DPI = 100
+PDF_JPEG_QUALITY = 80
+# Finished reports stay in memory up to this size, then spill to a temp file
+PDF_SPOOL_BYTES = 8 * 1024**2
+PDF_GRID_COLOR = colors.Color(0, 0, 0, alpha=0.15)
+# Write image and page streams as binary: without reportlab's C accelerator
+# the ASCII85 text encoding runs in pure Python and costs more than drawing
+# the charts, and it makes every stream a quarter larger
+rl_config.useA85 = 0
+
+class ChartFlowable(Flowable):
+    """A chart that is rendered only when the PDF page is drawn.
+
+    ``render(vector, width, height)`` returns a reportlab ``Drawing`` when
+    ``vector`` is true, else a matplotlib ``Figure`` (or its already encoded
+    image bytes); the figure is rasterised at ``dpi`` (PNG or JPEG) straight
+    onto the canvas and dropped, so at most one chart is held in memory while
+    the document is built.
+    """
+
+    def __init__(
+        self,
+        render,
+        width,
+        height,
+        chart_format=PDF_CHART_FORMAT,
+        dpi=PDF_CHART_DPI,
+        on_draw=None,
+    ):
+        super().__init__()
+        self.render = render
+        self.width = width
+        self.height = height
+        self.chart_format = chart_format
+        self.dpi = dpi
+        self.on_draw = on_draw
+
+    def wrap(self, available_width, available_height):
+        return self.width, self.height
+
+    def draw(self):
+        if self.on_draw is not None:
+            self.on_draw()
+        if self.chart_format == "vector":
+            renderPDF.draw(self.render(True, self.width, self.height), self.canv, 0, 0)
+            return
+        figure = self.render(False, self.width, self.height)
+        if isinstance(figure, bytes):
+            # Already encoded, e.g. by a chart pool worker
+            image = BytesIO(figure)
+        else:
+            image = BytesIO()
+            if self.chart_format == "jpeg":
+                figure.savefig(
+                    image,
+                    format="jpeg",
+                    dpi=self.dpi,
+                    facecolor="white",
+                    pil_kwargs={"quality": PDF_JPEG_QUALITY, "optimize": True},
+                )
+            else:
+                figure.savefig(image, format="png", dpi=self.dpi, facecolor="white")
+            image.seek(0)
+        self.canv.drawImage(ImageReader(image), 0, 0, self.width, self.height)
+
+def _padded_range(low, high, pad=0.0):
+    low, high = float(low), float(high)
+    if not high > low:
+        return low - 0.5, high + 0.5
+    margin = (high - low) * pad
+    return low - margin, high + margin
+
+class VectorAxes:
+    """Minimal plot axes on a reportlab ``Drawing``: maps data coordinates
+    into ``box`` (x, y, width, height in points) and draws the grid, tick
+    labels, title and axis labels; ``frame()`` closes the plot once the data
+    has been drawn."""
+
+    def __init__(
+        self, drawing, box, x_range, y_range, title="", x_label="", y_label="", x_ticks=True
+    ):
+        self.drawing = drawing
+        self.left, self.bottom, self.width, self.height = box
+        self.x_range = _padded_range(*x_range)
+        self.y_range = _padded_range(*y_range)
+        right, top = self.left + self.width, self.bottom + self.height
+        center = self.left + self.width / 2
+
+        if x_ticks:
+            for tick in MaxNLocator(5).tick_values(*self.x_range):
+                if self.x_range[0] <= tick <= self.x_range[1]:
+                    px = float(self.x(tick))
+                    drawing.add(
+                        Line(px, self.bottom, px, top, strokeColor=PDF_GRID_COLOR, strokeWidth=0.5)
+                    )
+                    drawing.add(
+                        String(px, self.bottom - 9, f"{tick:g}", fontSize=7, textAnchor="middle")
+                    )
+        for tick in MaxNLocator(5).tick_values(*self.y_range):
+            if self.y_range[0] <= tick <= self.y_range[1]:
+                py = float(self.y(tick))
+                drawing.add(
+                    Line(self.left, py, right, py, strokeColor=PDF_GRID_COLOR, strokeWidth=0.5)
+                )
+                drawing.add(
+                    String(self.left - 3, py - 2.5, f"{tick:g}", fontSize=7, textAnchor="end")
+                )
+        if title:
+            drawing.add(String(center, top + 6, title, fontSize=9, textAnchor="middle"))
+        if x_label:
+            drawing.add(
+                String(center, self.bottom - 21, x_label, fontSize=8, textAnchor="middle")
+            )
+        if y_label:
+            label = String(0, 0, y_label, fontSize=8, textAnchor="middle")
+            rotate = (0, 1, -1, 0, self.left - 26, self.bottom + self.height / 2)
+            drawing.add(Group(label, transform=rotate))
+
+    def frame(self):
+        self.drawing.add(
+            Rect(
+                self.left,
+                self.bottom,
+                self.width,
+                self.height,
+                fillColor=None,
+                strokeColor=colors.black,
+                strokeWidth=0.6,
+            )
+        )
+
+    def x(self, values):
+        low, high = self.x_range
+        return self.left + (np.asarray(values, dtype=float) - low) / (high - low) * self.width
+
+    def y(self, values):
+        low, high = self.y_range
+        return self.bottom + (np.asarray(values, dtype=float) - low) / (high - low) * self.height
+
+def _plot_box(width, height):
+    # Room for tick labels and axis titles around the plotting area
+    return 40, 30, width - 50, height - 48
+
+def vector_histogram(summary, width, height, color, title="", x_label=""):
+    drawing = Drawing(width, height)
+    edges, counts = summary["edges"], summary["counts"]
+    axes = VectorAxes(
+        drawing,
+        _plot_box(width, height),
+        (edges[0], edges[-1]),
+        (0, max(counts.max(), 1) * 1.05),
+        title,
+        x_label,
+        "Frequency",
+    )
+    fill = colors.HexColor(color)
+    for left, right, count in zip(axes.x(edges[:-1]), axes.x(edges[1:]), counts):
+        if count:
+            drawing.add(
+                Rect(
+                    float(left),
+                    axes.bottom,
+                    float(right - left),
+                    float(axes.y(count)) - axes.bottom,
+                    fillColor=fill,
+                    fillOpacity=0.7,
+                    strokeColor=colors.black,
+                    strokeWidth=0.4,
+                )
+            )
+    axes.frame()
+    return drawing
+
+def vector_boxplots(panels, width, height):
+    """Side-by-side Tukey boxplots from ``box_summary`` dicts;
+    ``panels`` is a list of (summary, label)."""
+    drawing = Drawing(width, height)
+    panel_width = width / len(panels)
+    black, orange = colors.black, colors.HexColor("#ff7f0e")
+    for i, (summary, label) in enumerate(panels):
+        left, bottom, box_width, box_height = _plot_box(panel_width, height)
+        axes = VectorAxes(
+            drawing,
+            (i * panel_width + left, bottom, box_width, box_height),
+            (0.5, 1.5),
+            _padded_range(summary["min"], summary["max"], 0.05),
+            f"Boxplot {label}",
+            y_label=label,
+            x_ticks=False,
+        )
+        center, half = float(axes.x(1)), axes.width * 0.125
+        q1, median, q3 = (float(axes.y(summary[k])) for k in ("q1", "med", "q3"))
+        low, high = float(axes.y(summary["whislo"])), float(axes.y(summary["whishi"]))
+        drawing.add(
+            Rect(center - half, q1, 2 * half, q3 - q1,
+                 fillColor=None, strokeColor=black, strokeWidth=0.8)
+        )
+        drawing.add(
+            Line(center - half, median, center + half, median,
+                 strokeColor=orange, strokeWidth=1.2)
+        )
+        for end, whisker in ((q1, low), (q3, high)):
+            drawing.add(Line(center, end, center, whisker, strokeColor=black, strokeWidth=0.8))
+            drawing.add(
+                Line(center - half / 2, whisker, center + half / 2, whisker,
+                     strokeColor=black, strokeWidth=0.8)
+            )
+        for value in axes.y(summary["fliers"]):
+            drawing.add(
+                Circle(center, float(value), 2, fillColor=None, strokeColor=black, strokeWidth=0.5)
+            )
+        axes.frame()
+    return drawing
+
+def vector_scatter(
+    x,
+    y,
+    width,
+    height,
+    bin_threshold,
+    regression=None,
+    title="",
+    x_label="",
+    y_label="",
+    color="#22c55e",
+):
+    """Vector counterpart of ``plot_xy_scatter`` (+ ``plot_regression``):
+    one marker per pair up to ``bin_threshold`` pairs, else shaded 2-D bins."""
+    drawing = Drawing(width, height)
+    valid = pd.DataFrame({"X": x, "Y": y}).dropna()
+    binned = len(valid) > bin_threshold
+    grid = density_grid(valid["X"], valid["Y"]) if binned else None
+    band = regression_band(regression) if regression is not None else None
+
+    if binned:
+        x_range = (grid["x_edges"][0], grid["x_edges"][-1])
+        y_low, y_high = grid["y_edges"][0], grid["y_edges"][-1]
+    else:
+        x_range = _padded_range(valid["X"].min(), valid["X"].max(), 0.05)
+        y_low, y_high = _padded_range(valid["Y"].min(), valid["Y"].max(), 0.05)
+    if band is not None:
+        y_low, y_high = min(y_low, band[2].min()), max(y_high, band[3].max())
+    axes = VectorAxes(
+        drawing, _plot_box(width, height), x_range, (y_low, y_high), title, x_label, y_label
+    )
+
+    if binned:
+        counts = grid["counts"]
+        shades = matplotlib.colormaps["Greens"](counts / counts.max())
+        x_edges, y_edges = axes.x(grid["x_edges"]), axes.y(grid["y_edges"])
+        for i, j in zip(*np.nonzero(counts)):
+            drawing.add(
+                Rect(
+                    float(x_edges[i]),
+                    float(y_edges[j]),
+                    float(x_edges[i + 1] - x_edges[i]),
+                    float(y_edges[j + 1] - y_edges[j]),
+                    fillColor=colors.Color(*shades[i, j, :3]),
+                    strokeColor=None,
+                )
+            )
+    else:
+        fill = colors.HexColor(color)
+        for px, py in zip(axes.x(valid["X"]), axes.y(valid["Y"])):
+            drawing.add(
+                Circle(float(px), float(py), 1.8, fillColor=fill, fillOpacity=0.6, strokeColor=None)
+            )
+
+    if band is not None:
+        x_grid, fitted, lower, upper = band
+        px = axes.x(x_grid)
+        outline = np.column_stack(
+            [np.r_[px, px[::-1]], np.r_[axes.y(lower), axes.y(upper)[::-1]]]
+        )
+        line = np.column_stack([px, axes.y(fitted)])
+        red = colors.HexColor("#dc2626")
+        drawing.add(
+            Polygon(outline.ravel().tolist(), fillColor=red, fillOpacity=0.2, strokeColor=None)
+        )
+        drawing.add(PolyLine(line.ravel().tolist(), strokeColor=red, strokeWidth=1.5))
+        label = (
+            f"y = {regression['intercept']:.3f} + {regression['slope']:.3f}x "
+            f"(R² = {regression['r_squared']:.3f})"
+        )
+        drawing.add(
+            String(axes.left + 4, axes.bottom + axes.height - 10, label, fontSize=7, fillColor=red)
+        )
+    axes.frame()
+    return drawing
+
+def _pdf_figure(width, height):
+    # Figure API (bukan pyplot) agar aman dijalankan di thread latar belakang
+    return Figure(figsize=(width / 72, height / 72), layout="tight")
+
+def pdf_histogram_chart(summary, name, color, title):
+    def render(vector, width, height):
+        if vector:
+            return vector_histogram(summary, width, height, color, title, name)
+        figure = _pdf_figure(width, height)
+        ax = figure.subplots()
+        plot_histogram(ax, summary, color)
+        ax.set_xlabel(name)
+        ax.set_ylabel("Frequency")
+        ax.set_title(title)
+        ax.grid(True, alpha=0.3)
+        return figure
+    return render
+
+def pdf_boxplot_chart(panels):
+    def render(vector, width, height):
+        if vector:
+            return vector_boxplots(panels, width, height)
+        figure = _pdf_figure(width, height)
+        for ax, (summary, label) in zip(figure.subplots(1, len(panels)), panels):
+            plot_boxplot(ax, summary)
+            ax.set_ylabel(label)
+            ax.set_title(f"Boxplot {label}")
+            ax.grid(True, alpha=0.3)
+        return figure
+    return render
+
+def pdf_scatter_chart(x, y, bin_threshold, regression, title, x_label="X_total", y_label="Y_total"):
+    def render(vector, width, height):
+        if vector:
+            return vector_scatter(
+                x, y, width, height, bin_threshold, regression, title, x_label, y_label
+            )
+        figure = _pdf_figure(width, height)
+        ax = figure.subplots()
+        density = plot_xy_scatter(ax, x, y, bin_threshold)
+        if density is not None:
+            figure.colorbar(density, ax=ax, label="Count")
+        if regression is not None:
+            plot_regression(ax, regression)
+        ax.set_xlabel(x_label)
+        ax.set_ylabel(y_label)
+        ax.set_title(title)
+        ax.grid(True, alpha=0.3)
+        return figure
+    return render
+
+# Item-level appendix: one block per selected item
+APPENDIX_CHART_SIZE = (2.8, 1.6)  # inches
+APPENDIX_MAX_FREQ_ROWS = 12
+CHART_POOL_WORKERS = os.cpu_count() or 1
+
+_chart_spawn_lock = threading.Lock()
+
+@st.cache_resource
+def get_chart_pool():
+    """Worker processes for the raster appendix charts, which are GIL-bound
+    so threads do not help. Workers are spawned, not forked: a fork of the
+    running server can deadlock on locks it inherits. Streamlit puts this
+    script's directory on sys.path only while a run executes, so each worker
+    adds it itself before importing report_workers."""
+    return ProcessPoolExecutor(
+        max_workers=CHART_POOL_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=site.addsitedir,
+        initargs=(os.path.dirname(os.path.abspath(report_workers.__file__)),),
+    )
+
+def submit_chart(fn, *args):
+    """``get_chart_pool().submit(fn, *args)`` without re-running the page.
+
+    The pool spawns its workers lazily inside submit(), and a spawned worker
+    first re-runs the parent's ``__main__``, which Streamlit points at this
+    script during a page run; a blank module stands in meanwhile, so the
+    worker imports only report_workers.
+    """
+    pool = get_chart_pool()
+    with _chart_spawn_lock:
+        page = sys.modules["__main__"]
+        sys.modules["__main__"] = types.ModuleType("__main__")
+        try:
+            return pool.submit(fn, *args)
+        finally:
+            sys.modules["__main__"] = page
+
+def pooled_item_chart(task):
+    """Start the raster appendix chart ``task`` (report_workers.item_bar_chart
+    arguments) in the chart pool; returns a ChartFlowable renderer that waits
+    for its image bytes."""
+    try:
+        future = submit_chart(report_workers.item_bar_chart, *task)
+    except BrokenProcessPool:
+        get_chart_pool.clear()
+        future = None
+
+    def render(vector, width, height):
+        if future is not None:
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory): drop the pool, finish in-process
+                get_chart_pool.clear()
+        return report_workers.item_bar_chart(*task)
+    return render
+
+def vector_bars(values, counts, color, width, height):
+    drawing = Drawing(width, height)
+    bar_width = report_workers.bar_width(values)
+    axes = VectorAxes(
+        drawing,
+        (34, 18, width - 40, height - 24),
+        (values[0] - bar_width, values[-1] + bar_width),
+        (0, max(counts.max(), 1) * 1.05),
+    )
+    fill = colors.HexColor(color)
+    lefts, rights = axes.x(values - bar_width / 2), axes.x(values + bar_width / 2)
+    for left, right, count in zip(lefts, rights, counts):
+        drawing.add(
+            Rect(
+                float(left),
+                axes.bottom,
+                float(right - left),
+                float(axes.y(count)) - axes.bottom,
+                fillColor=fill,
+                fillOpacity=0.8,
+                strokeColor=colors.black,
+                strokeWidth=0.4,
+            )
+        )
+    axes.frame()
+    return drawing
+
+def pdf_item_chart(freq, color, chart_format=PDF_CHART_FORMAT, dpi=PDF_CHART_DPI):
+    values = freq["Value"].to_numpy(dtype=float)
+    counts = freq["Frequency"].to_numpy(dtype=float)
+    if len(values) > HIST_BINS:
+        # Many distinct values (a continuous item): chart binned counts
+        counts, edges = np.histogram(values, bins=HIST_BINS, weights=counts)
+        values = (edges[:-1] + edges[1:]) / 2
+
+    if chart_format != "vector":
+        return pooled_item_chart(
+            (values, counts, color, APPENDIX_CHART_SIZE, dpi, chart_format, PDF_JPEG_QUALITY)
+        )
+    return lambda vector, width, height: vector_bars(values, counts, color, width, height)
+
+def pdf_stats_line(stats_dict, _t):
+    return (
+        f"{_t('mean_label', 'Mean')}: {stats_dict['Mean']:.4f}, "
+        f"{_t('median_label', 'Median')}: {stats_dict['Median']:.4f}"
+        f"{median_error_note(stats_dict)}, "
+        f"{_t('std_label', 'Std Dev')}: {stats_dict['Std Dev']:.4f}, "
+        f"{_t('min_label', 'Min')}: {stats_dict['Minimum']:.4f}, "
+        f"{_t('max_label', 'Max')}: {stats_dict['Maximum']:.4f}"
+    )
+
+def item_appendix(
+    item_stats,
+    x_columns,
+    make_chart,
+    heading_style,
+    normal_style,
+    _t,
+    chart_format=PDF_CHART_FORMAT,
+    dpi=PDF_CHART_DPI,
+):
+    """Flowables of the item-level appendix: per item its descriptives, a
+    (truncated) frequency table and a small bar chart. ``item_stats`` maps
+    item → (stats_dict, freq_df) in report order; ``make_chart(render,
+    width, height)`` wraps a chart renderer in a lazy ChartFlowable. Raster
+    charts are all started in the chart pool up front, so they render while
+    the earlier pages are laid out."""
+    width, height = (side * inch for side in APPENDIX_CHART_SIZE)
+    table_style = TableStyle(
+        [
+            ("FONTNAME", (0, 0), (-1, -1), "Times-Roman"),
+            ("FONTNAME", (0, 0), (-1, 0), "Times-Bold"),
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ("LEADING", (0, 0), (-1, -1), 9),
+            ("LINEBELOW", (0, 0), (-1, 0), 0.5, colors.black),
+            ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+            ("TOPPADDING", (0, 0), (-1, -1), 1),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 1),
+        ]
+    )
+    flowables = [
+        PageBreak(),
+        Paragraph(_t("pdf_appendix_title", "Appendix: Item-level Statistics"), heading_style),
+    ]
+    for name, (stats_dict, freq) in item_stats.items():
+        if stats_dict is None:
+            continue
+        rows = [["Value", "Frequency", "%"]] + [
+            [f"{value:g}", f"{count:,}", f"{pct:.2f}"]
+            for value, count, pct in freq.head(APPENDIX_MAX_FREQ_ROWS).itertuples(index=False)
+        ]
+        if len(freq) > APPENDIX_MAX_FREQ_ROWS:
+            rows.append([f"… +{len(freq) - APPENDIX_MAX_FREQ_ROWS}", "", ""])
+        frequency_table = Table(
+            rows, colWidths=[0.7 * inch, 0.8 * inch, 0.6 * inch], style=table_style
+        )
+        color = "#60a5fa" if name in x_columns else "#f97373"
+        chart = make_chart(pdf_item_chart(freq, color, chart_format, dpi), width, height)
+        block = Table(
+            [[frequency_table, chart]],
+            colWidths=[2.4 * inch, width + 0.2 * inch],
+            style=[("VALIGN", (0, 0), (-1, -1), "TOP")],
+        )
+        flowables.append(
+            KeepTogether(
+                [
+                    Paragraph(f"<b>{name}</b> (N = {stats_dict['N']:,})", normal_style),
+                    Paragraph(pdf_stats_line(stats_dict, _t), normal_style),
+                    block,
+                    Spacer(1, 0.15 * inch),
+                ]
+            )
+        )
+    return flowables
+
+def generate_pdf_report(
+    df,
+    x_columns,
+    y_columns,
+    x_total,
+    y_total,
+    x_stats,
+    y_stats,
+    x_freq,
+    y_freq,
+    correlation_r,
+    correlation_p,
+    interpretation,
+    normality_x,
+    normality_y,
+    lang_code,
+    scatter_bin_threshold=SCATTER_BIN_THRESHOLD,
+    chart_summaries=None,
+    reliability=None,
+    composite_specs=None,
+    regression=None,
+    weight_column=None,
+    chart_format=PDF_CHART_FORMAT,
+    chart_dpi=PDF_CHART_DPI,
+    item_stats=None,
+    progress=None,
+):
+    # progress: optional callback (fraction done) when built as a background job
+    if progress is None:
+        progress = lambda fraction: None
+
+    # Output spills to disk past PDF_SPOOL_BYTES; charts are drawn one at a time
+    # while the pages are written (see ChartFlowable)
+    buffer = SpooledTemporaryFile(max_size=PDF_SPOOL_BYTES)
+    doc = SimpleDocTemplate(buffer, pagesize=letter, pageCompression=1)
+    story = []
+    charts = []
+
+    def make_chart(render, width, height):
+        chart = ChartFlowable(render, width, height, chart_format, chart_dpi)
+        charts.append(chart)
+        return chart
+
+    def add_chart(render, width, height):
+        story.append(make_chart(render, width, height))
+
+    # helper terjemahan lokal untuk PDF
+    _t = lambda key, fallback="": translate(lang_code, key, fallback)
+
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        "CustomTitle",
+        parent=styles["Heading1"],
+        fontName="Times-Roman",
+        fontSize=18,
+        textColor=colors.HexColor("#1f77b4"),
+        spaceAfter=30,
+        alignment=TA_CENTER,
+    )
+    heading_style = ParagraphStyle(
+        "CustomHeading",
+        parent=styles["Heading2"],
+        fontName="Times-Roman",
+        fontSize=14,
+        textColor=colors.HexColor("#2c3e50"),
+        spaceAfter=12,
+        spaceBefore=12,
+    )
     normal_style = ParagraphStyle(
         "CustomNormal",
         parent=styles["Normal"],
@@ -1147,16 +4738,30 @@ def generate_pdf_report(
             normal_style,
         )
     )
-    story.append(
-        Paragraph(
-            _t("pdf_x_total_desc", "<b>X_total:</b> Mean of X items"), normal_style
+    if composite_specs:
+        for name, spec in composite_specs.items():
+            story.append(
+                Paragraph(f"<b>{name}:</b> {spec.describe()}", normal_style)
+            )
+    else:
+        story.append(
+            Paragraph(
+                _t("pdf_x_total_desc", "<b>X_total:</b> Mean of X items"), normal_style
+            )
         )
-    )
-    story.append(
-        Paragraph(
-            _t("pdf_y_total_desc", "<b>Y_total:</b> Mean of Y items"), normal_style
+        story.append(
+            Paragraph(
+                _t("pdf_y_total_desc", "<b>Y_total:</b> Mean of Y items"), normal_style
+            )
+        )
+    if weight_column:
+        story.append(
+            Paragraph(
+                f"<b>{_t('weight_label', 'Survey weights')}:</b> {weight_column} "
+                f"({_t('pdf_weight_note', 'descriptives and correlation are weighted')})",
+                normal_style,
+            )
         )
-    )
     story.append(Spacer(1, 0.2 * inch))
 
     story.append(
@@ -1165,26 +4770,29 @@ def generate_pdf_report(
 
     if x_stats:
         story.append(Paragraph("<b>X_total:</b>", normal_style))
-        stats_text = (
-            f"{_t('mean_label', 'Mean')}: {x_stats['Mean']:.4f}, "
-            f"{_t('median_label', 'Median')}: {x_stats['Median']:.4f}, "
-            f"{_t('std_label', 'Std Dev')}: {x_stats['Std Dev']:.4f}, "
-            f"{_t('min_label', 'Min')}: {x_stats['Minimum']:.4f}, "
-            f"{_t('max_label', 'Max')}: {x_stats['Maximum']:.4f}"
-        )
-        story.append(Paragraph(stats_text, normal_style))
+        story.append(Paragraph(pdf_stats_line(x_stats, _t), normal_style))
         story.append(Spacer(1, 0.1 * inch))
 
     if y_stats:
         story.append(Paragraph("<b>Y_total:</b>", normal_style))
-        stats_text = (
-            f"{_t('mean_label', 'Mean')}: {y_stats['Mean']:.4f}, "
-            f"{_t('median_label', 'Median')}: {y_stats['Median']:.4f}, "
-            f"{_t('std_label', 'Std Dev')}: {y_stats['Std Dev']:.4f}, "
-            f"{_t('min_label', 'Min')}: {y_stats['Minimum']:.4f}, "
-            f"{_t('max_label', 'Max')}: {y_stats['Maximum']:.4f}"
-        )
-        story.append(Paragraph(stats_text, normal_style))
+        story.append(Paragraph(pdf_stats_line(y_stats, _t), normal_style))
+        story.append(Spacer(1, 0.2 * inch))
+
+    if reliability:
+        story.append(
+            Paragraph(_t("reliability_title", "Scale Reliability"), heading_style)
+        )
+        for name, summary in reliability.items():
+            if summary is None:
+                continue
+            story.append(
+                Paragraph(
+                    f"<b>{name}:</b> Cronbach's alpha = {summary['Alpha']:.4f} "
+                    f"({interpret_alpha(summary['Alpha'])}; "
+                    f"k = {summary['Items']}, n = {summary['N']})",
+                    normal_style,
+                )
+            )
         story.append(Spacer(1, 0.2 * inch))
 
     story.append(
@@ -1215,6 +4823,35 @@ def generate_pdf_report(
     )
     story.append(Spacer(1, 0.2 * inch))
 
+    if regression is not None:
+        story.append(
+            Paragraph(
+                _t("regression_title", "Linear Regression: Y_total on X_total"),
+                heading_style,
+            )
+        )
+        lo, hi = regression["slope_ci"]
+        story.append(
+            Paragraph(
+                f"Y_total = {regression['intercept']:.4f} + "
+                f"{regression['slope']:.4f} × X_total "
+                f"(SE<sub>b</sub> = {regression['se_slope']:.4f}, "
+                f"SE<sub>a</sub> = {regression['se_intercept']:.4f})",
+                normal_style,
+            )
+        )
+        story.append(
+            Paragraph(
+                f"R² = {regression['r_squared']:.4f}, "
+                f"F(1, {regression['df']}) = {regression['f_stat']:.4f}, "
+                f"p = {regression['p_slope']:.4f}, "
+                f"{regression['confidence']:.0%} CI for slope [{lo:.4f}, {hi:.4f}], "
+                f"residual SE = {regression['residual_se']:.4f}",
+                normal_style,
+            )
+        )
+        story.append(Spacer(1, 0.2 * inch))
+
     story.append(
         Paragraph(
             _t("assumption_checks", "Assumption Checks"),
@@ -1244,68 +4881,42 @@ def generate_pdf_report(
         Paragraph(_t("visual_title", "Visualizations"), heading_style)
     )
 
+    # Ringkasan histogram/boxplot dihitung sekali per komposit lalu dipakai ulang
+    chart_summaries = dict(chart_summaries or {})
+    for name, series in (("X_total", x_total), ("Y_total", y_total)):
+        if series is not None and name not in chart_summaries:
+            chart_summaries[name] = {
+                "hist": histogram_summary(series),
+                "box": box_summary(series),
+            }
+    x_summary = chart_summaries.get("X_total") or {}
+    y_summary = chart_summaries.get("Y_total") or {}
+
     # Histogram X_total
-    if x_total is not None:
-        fig_hx, ax_hx = plt.subplots(figsize=(5, 3))
-        ax_hx.hist(
-            x_total.dropna(),
-            bins=20,
-            edgecolor="black",
-            alpha=0.7,
-            color="#60a5fa",
-        )
-        ax_hx.set_xlabel("X_total")
-        ax_hx.set_ylabel("Frequency")
-        ax_hx.set_title(_t("hist_x", "Histogram: X_total"))
-        ax_hx.grid(True, alpha=0.3)
-
-        img_buf_hx = BytesIO()
-        fig_hx.savefig(img_buf_hx, format="png", bbox_inches="tight")
-        plt.close(fig_hx)
-        img_buf_hx.seek(0)
-        story.append(RLImage(img_buf_hx, width=5.5 * inch))
+    if x_summary.get("hist") is not None:
+        add_chart(
+            pdf_histogram_chart(x_summary["hist"], "X_total", "#60a5fa", _t("hist_x", "Histogram: X_total")),
+            5.5 * inch,
+            3.3 * inch,
+        )
         story.append(Spacer(1, 0.2 * inch))
 
     # Histogram Y_total
-    if y_total is not None:
-        fig_hy, ax_hy = plt.subplots(figsize=(5, 3))
-        ax_hy.hist(
-            y_total.dropna(),
-            bins=20,
-            edgecolor="black",
-            alpha=0.7,
-            color="#f97373",
-        )
-        ax_hy.set_xlabel("Y_total")
-        ax_hy.set_ylabel("Frequency")
-        ax_hy.set_title(_t("hist_y", "Histogram: Y_total"))
-        ax_hy.grid(True, alpha=0.3)
-
-        img_buf_hy = BytesIO()
-        fig_hy.savefig(img_buf_hy, format="png", bbox_inches="tight")
-        plt.close(fig_hy)
-        img_buf_hy.seek(0)
-        story.append(RLImage(img_buf_hy, width=5.5 * inch))
+    if y_summary.get("hist") is not None:
+        add_chart(
+            pdf_histogram_chart(y_summary["hist"], "Y_total", "#f97373", _t("hist_y", "Histogram: Y_total")),
+            5.5 * inch,
+            3.3 * inch,
+        )
         story.append(Spacer(1, 0.2 * inch))
 
     # Boxplots X_total & Y_total
-    if x_total is not None and y_total is not None:
-        fig_bx, (ax_bx1, ax_bx2) = plt.subplots(1, 2, figsize=(7, 3))
-        ax_bx1.boxplot(x_total.dropna(), vert=True)
-        ax_bx1.set_ylabel("X_total")
-        ax_bx1.set_title("Boxplot X_total")
-        ax_bx1.grid(True, alpha=0.3)
-
-        ax_bx2.boxplot(y_total.dropna(), vert=True)
-        ax_bx2.set_ylabel("Y_total")
-        ax_bx2.set_title("Boxplot Y_total")
-        ax_bx2.grid(True, alpha=0.3)
-
-        img_buf_bx = BytesIO()
-        fig_bx.savefig(img_buf_bx, format="png", bbox_inches="tight")
-        plt.close(fig_bx)
-        img_buf_bx.seek(0)
-        story.append(RLImage(img_buf_bx, width=5.5 * inch))
+    if x_summary.get("box") is not None and y_summary.get("box") is not None:
+        add_chart(
+            pdf_boxplot_chart([(x_summary["box"], "X_total"), (y_summary["box"], "Y_total")]),
+            5.5 * inch,
+            2.4 * inch,
+        )
         story.append(Spacer(1, 0.2 * inch))
 
     # Scatter plot X_total vs Y_total
@@ -1315,23 +4926,229 @@ def generate_pdf_report(
             .dropna()
         )
         if not valid_df.empty:
-            fig_sc, ax_sc = plt.subplots(figsize=(5.5, 3.5))
-            ax_sc.scatter(valid_df["X"], valid_df["Y"], alpha=0.6, color="#22c55e")
-            ax_sc.set_xlabel("X_total")
-            ax_sc.set_ylabel("Y_total")
-            ax_sc.set_title(_t("scatter", "Scatter Plot: X_total vs Y_total"))
-            ax_sc.grid(True, alpha=0.3)
-
-            img_buf_sc = BytesIO()
-            fig_sc.savefig(img_buf_sc, format="png", bbox_inches="tight")
-            plt.close(fig_sc)
-            img_buf_sc.seek(0)
-            story.append(RLImage(img_buf_sc, width=5.5 * inch))
+            add_chart(
+                pdf_scatter_chart(
+                    valid_df["X"],
+                    valid_df["Y"],
+                    scatter_bin_threshold,
+                    regression,
+                    _t("scatter", "Scatter Plot: X_total vs Y_total"),
+                ),
+                5.5 * inch,
+                3.5 * inch,
+            )
+
+    if item_stats:
+        story.extend(
+            item_appendix(
+                item_stats,
+                x_columns,
+                make_chart,
+                heading_style,
+                normal_style,
+                _t,
+                chart_format,
+                chart_dpi,
+            )
+        )
 
+    # Chart rendering dominates the build, so progress advances per chart drawn
+    progress(0.1)
+    for i, chart in enumerate(charts):
+        chart.on_draw = lambda i=i: progress(0.1 + 0.85 * i / len(charts))
     doc.build(story)
     buffer.seek(0)
+    progress(1.0)
     return buffer
 
+# ---------------------------------------------------------
+# Results bundle (machine-readable export)
+# ---------------------------------------------------------
+BUNDLE_FORMATS = {
+    "zip": "JSON + CSV (zip)",
+    "xlsx": "Excel workbook (one sheet per table)",
+}
+BUNDLE_PACKAGES = ("numpy", "pandas", "scipy", "streamlit", "matplotlib", "reportlab")
+REGRESSION_FIELDS = (
+    "n", "intercept", "slope", "se_intercept", "se_slope", "t_slope", "p_slope",
+    "r_squared", "adj_r_squared", "residual_se", "f_stat", "confidence",
+)
+
+def bundle_metadata(
+    dataset_key,
+    file_name,
+    x_columns,
+    y_columns,
+    composite_specs,
+    method,
+    p_adjust,
+    weight_column=None,
+    excluded=0,
+):
+    return {
+        # dataset_key: SHA-256 of the uploaded bytes (+ file suffix)
+        "dataset": {"file": file_name, "key": dataset_key},
+        "selections": {
+            "x_items": list(x_columns),
+            "y_items": list(y_columns),
+            "weight_column": weight_column,
+            "excluded_respondents": excluded,
+        },
+        "composites": {name: asdict(spec) for name, spec in composite_specs.items()},
+        "method": {"correlation": method, "p_adjust": p_adjust},
+        "versions": {
+            "python": platform.python_version(),
+            **{package: package_version(package) for package in BUNDLE_PACKAGES},
+        },
+    }
+
+def crosstab_records(crosstabs, x_items, y_items, x_categories, y_categories):
+    """Long-format item crosstabs: one row per (X item, Y item, X value,
+    Y value) cell, without the padding of the batched count tables."""
+    rows = []
+    for i, x_item in enumerate(x_items):
+        for j, y_item in enumerate(y_items):
+            for a, x_value in enumerate(x_categories[i]):
+                for b, y_value in enumerate(y_categories[j]):
+                    rows.append(
+                        {
+                            "X item": x_item,
+                            "Y item": y_item,
+                            "X value": x_value,
+                            "Y value": y_value,
+                            "Count": int(crosstabs[i, j, a, b]),
+                        }
+                    )
+    return pd.DataFrame(rows)
+
+def matrix_pairs(r, p, n, p_adjust="none"):
+    """Distinct pairs of a construct correlation matrix as rows.
+
+    ``p`` holds the already adjusted p-values; ``p_adjust`` only labels them.
+    """
+    upper = np.triu_indices(len(r), k=1)
+    pairs = pd.DataFrame(
+        {
+            "Construct A": r.index[upper[0]],
+            "Construct B": r.columns[upper[1]],
+            "r": r.to_numpy()[upper],
+            "p-value": p.to_numpy()[upper],
+            "N": n.to_numpy()[upper],
+        }
+    )
+    pairs["Significance"] = significance_column(pairs["r"], pairs["p-value"], p_adjust)
+    return pairs
+
+def results_tables(
+    x_columns,
+    item_stats,
+    composite_stats,
+    normality,
+    correlation,
+    regression=None,
+    extra=None,
+):
+    """Tidy tables of the page's results, assembled from objects that were
+    already computed (nothing is re-estimated here).
+
+    ``item_stats``/``composite_stats`` map variable → (stats_dict, freq_df),
+    ``normality`` maps variable → check_normality() output and
+    ``correlation`` holds the composite correlation fields. ``extra`` maps
+    table name → DataFrame for the optional analyses (grouped, partial,
+    item association, constructs, waves) that ran on the page.
+    """
+    described = [
+        ("X item" if name in x_columns else "Y item", name, stats_dict, freq)
+        for name, (stats_dict, freq) in item_stats.items()
+        if stats_dict is not None
+    ] + [
+        ("Composite", name, stats_dict, freq)
+        for name, (stats_dict, freq) in composite_stats.items()
+        if stats_dict is not None
+    ]
+    tables = {
+        "descriptives": pd.DataFrame(
+            [
+                {"Variable": name, "Role": role, **stats_dict}
+                for role, name, stats_dict, _ in described
+            ]
+        ),
+        "frequencies": pd.concat(
+            [
+                freq.assign(Variable=name)[["Variable", "Value", "Frequency", "Percentage"]]
+                for _, name, _, freq in described
+            ],
+            ignore_index=True,
+        ),
+        "normality": pd.DataFrame(
+            [
+                {
+                    "Variable": name,
+                    "Test": "Shapiro-Wilk",
+                    "W": w,
+                    "p-value": p,
+                    "Interpretation": text,
+                }
+                for name, (w, p, text) in normality.items()
+            ]
+        ),
+        "correlation": pd.DataFrame([correlation]),
+    }
+    if regression is not None:
+        low, high = regression["slope_ci"]
+        tables["regression"] = pd.DataFrame(
+            [
+                {
+                    **{field: regression[field] for field in REGRESSION_FIELDS},
+                    "slope_ci_low": low,
+                    "slope_ci_high": high,
+                }
+            ]
+        )
+    tables.update(extra or {})
+    return tables
+
+def _flatten(mapping, prefix=""):
+    for key, value in mapping.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (list, tuple)):
+            yield f"{prefix}{key}", ", ".join(map(str, value))
+        else:
+            yield f"{prefix}{key}", value
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def results_bundle(bundle_format, metadata, *table_args, **table_kwargs):
+    """Bytes of the results bundle: a zip of results.json (metadata and
+    every table as records) plus one CSV per table, or an xlsx workbook with
+    a metadata sheet and one sheet per table. Cached on the results, so a
+    rerun that changes nothing does not serialise the tables again (which is
+    why the bundle carries no build timestamp: a cached copy would report
+    its first build time)."""
+    tables = results_tables(*table_args, **table_kwargs)
+    buffer = BytesIO()
+    if bundle_format == "xlsx":
+        with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+            pd.DataFrame(_flatten(metadata), columns=["Key", "Value"]).to_excel(
+                writer, sheet_name="metadata", index=False
+            )
+            for name, table in tables.items():
+                table.to_excel(writer, sheet_name=name, index=False)
+        return buffer.getvalue()
+
+    payload = {
+        "metadata": metadata,
+        "tables": {
+            name: json.loads(table.to_json(orient="records", double_precision=15))
+            for name, table in tables.items()
+        },
+    }
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("results.json", json.dumps(payload, indent=2, default=str))
+        for name, table in tables.items():
+            archive.writestr(f"{name}.csv", table.to_csv(index=False))
+    return buffer.getvalue()
+
 # ---------------------------------------------------------
 # Main header
 # ---------------------------------------------------------
@@ -1525,12 +5342,43 @@ st.markdown(
     unsafe_allow_html=True,
 )
 uploaded_file = st.file_uploader(
-    t("upload_label"), type=["csv", "xlsx", "xls"]
+    t("upload_label"), type=["csv", "xlsx", "xls", "gz", "xz", "zip"]
 )
 
 if uploaded_file is not None:
-    df = load_data(uploaded_file)
-    if df is not None:
+    # Zip bundles: open one file, or stack every file as waves
+    archive_files = archive_members(uploaded_file.getvalue(), uploaded_file.name)
+    archive_member = archive_files[0] if archive_files else None
+    # A zip without table files has nothing to open: report it once, here
+    empty_archive = uploaded_file.name.endswith(".zip") and not archive_files
+    if empty_archive:
+        st.markdown(
+            f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">❌ {t("archive_empty", "This zip file contains no CSV or Excel file.")}</div>',
+            unsafe_allow_html=True,
+        )
+    elif len(archive_files) > 1:
+        archive_mode = st.radio(
+            t("archive_mode", "This archive contains several files"),
+            options=["separate", "stacked"],
+            format_func=lambda mode: {
+                "separate": t("archive_separate", "Open one file"),
+                "stacked": t("archive_stacked", "Stack all files as waves"),
+            }[mode],
+            horizontal=True,
+            key="archive_mode",
+        )
+        if archive_mode == "stacked":
+            archive_member = STACKED_WAVES
+        else:
+            archive_member = st.selectbox(
+                t("archive_member", "File"), options=archive_files, key="archive_member"
+            )
+    dataset = None if empty_archive else open_dataset(uploaded_file, archive_member)
+    df = dataset.frame if dataset is not None else None
+    parse_job = st.session_state.jobs.get("parse")
+    if df is None and parse_job is not None and not parse_job.done():
+        job_progress("parse", t("parsing_dataset", "Parsing dataset in the background…"))
+    elif df is not None:
         st.session_state.df = df
 
         st.markdown(
@@ -1563,6 +5411,8 @@ if uploaded_file is not None:
                 key="x_select",
             )
             st.session_state.x_columns = x_columns
+            if x_columns:
+                x_spec = scoring_controls("x", x_columns)
 
         with col2:
             st.markdown(
@@ -1576,24 +5426,136 @@ if uploaded_file is not None:
                 key="y_select",
             )
             st.session_state.y_columns = y_columns
+            if y_columns:
+                y_spec = scoring_controls("y", y_columns)
+
+        weight_column = st.selectbox(
+            t("weight_label", "Survey weights"),
+            options=[None]
+            + [
+                c
+                for c in df.columns
+                if c not in x_columns + y_columns and pd.api.types.is_numeric_dtype(df[c])
+            ],
+            format_func=lambda c: t("weight_none", "None (unweighted)") if c is None else c,
+            key="weight_column",
+            help="Post-stratification weight per respondent (rows with missing or non-positive weight are dropped).",
+        )
+
+        # Results gathered for the machine-readable bundle (Section 9)
+        bundle_args = None
+        bundle_tables = {}
 
         if len(x_columns) > 0 and len(y_columns) > 0:
-            x_data = df[x_columns].copy()
-            y_data = df[y_columns].copy()
+            x_data = dataset.numeric_frame(x_columns)
+            y_data = dataset.numeric_frame(y_columns)
 
-            x_data = x_data.apply(pd.to_numeric, errors="coerce")
-            y_data = y_data.apply(pd.to_numeric, errors="coerce")
+            x_total = cached_composite(dataset.key, x_spec, _dataset=dataset)
+            y_total = cached_composite(dataset.key, y_spec, _dataset=dataset)
+            weights = dataset.numeric(weight_column) if weight_column else None
+
+            # Respondent quality: screen rows on the raw item matrix
+            quality_items = list(dict.fromkeys(x_columns + y_columns))
+            quality = cached_respondent_quality(
+                dataset.key, tuple(quality_items), _dataset=dataset
+            )
+            with st.expander(t("quality_title", "Respondent Quality")):
+                c1, c2, c3 = st.columns(3)
+                with c1:
+                    max_missing = st.number_input(
+                        t("quality_max_missing", "Max missing ratio"),
+                        min_value=0.0,
+                        max_value=1.0,
+                        value=QUALITY_MAX_MISSING,
+                        step=0.05,
+                        key="quality_max_missing",
+                    )
+                with c2:
+                    max_run = st.number_input(
+                        t("quality_max_run", "Max identical run"),
+                        min_value=2,
+                        max_value=max(len(quality_items), 2),
+                        value=max(int(np.ceil(0.8 * len(quality_items))), 2),
+                        step=1,
+                        key="quality_max_run",
+                    )
+                with c3:
+                    outlier_alpha = st.number_input(
+                        t("quality_alpha", "Mahalanobis α"),
+                        min_value=0.0001,
+                        max_value=0.1,
+                        value=QUALITY_OUTLIER_ALPHA,
+                        format="%.4f",
+                        key="quality_alpha",
+                    )
+                flags = flag_respondents(quality, max_missing, max_run, outlier_alpha)
+                st.dataframe(
+                    flags.sum().rename(t("quality_count", "Respondents")).to_frame(),
+                    use_container_width=True,
+                )
+                if flags["Flagged"].any():
+                    st.dataframe(
+                        pd.concat([quality, flags.drop(columns="Flagged")], axis=1)[
+                            flags["Flagged"]
+                        ].head(500),
+                        use_container_width=True,
+                    )
+                exclude_flagged = st.checkbox(
+                    t("quality_exclude", "Exclude flagged respondents from the analysis"),
+                    key="quality_exclude",
+                )
 
-            x_total = x_data.mean(axis=1)
-            y_total = y_data.mean(axis=1)
+            if exclude_flagged and flags["Flagged"].any():
+                keep = ~flags["Flagged"]
+                x_data = x_data.where(keep, axis=0)
+                y_data = y_data.where(keep, axis=0)
+                x_total = x_total.where(keep)
+                y_total = y_total.where(keep)
+                st.markdown(
+                    f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">🧹 {t("quality_excluded", "Flagged respondents excluded")}: {int(flags["Flagged"].sum())}</div>',
+                    unsafe_allow_html=True,
+                )
 
             st.session_state.x_total = x_total
             st.session_state.y_total = y_total
 
+            # Statistik cukup X/Y: dipakai untuk Pearson r dan regresi linear
+            xy_stats = xy_moments(x_total, y_total)
+            regression = linear_regression(xy_stats)
+
             st.markdown(
                 f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">✅ {t("composite_success").format(nx=len(x_total.dropna()), ny=len(y_total.dropna()))}</div>',
                 unsafe_allow_html=True,
             )
+            with st.expander(t("missing_report", "Missing data handling")):
+                st.dataframe(
+                    pd.DataFrame(
+                        {
+                            "X_total": missing_data_report(x_data, x_spec),
+                            "Y_total": missing_data_report(y_data, y_spec),
+                        }
+                    ).T,
+                    use_container_width=True,
+                )
+                for name, item_data, spec in (
+                    ("X_total", x_data, x_spec),
+                    ("Y_total", y_data, y_spec),
+                ):
+                    if spec.missing == "em" and len(spec.items) > 1:
+                        _, _, em_sigma = em_impute(reverse_code_items(item_data, spec).to_numpy())
+                        em_sd = np.sqrt(np.diag(em_sigma))
+                        st.markdown(
+                            f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{name}: {t("em_corr", "EM item correlation matrix")}</div>',
+                            unsafe_allow_html=True,
+                        )
+                        st.dataframe(
+                            pd.DataFrame(
+                                em_sigma / np.outer(em_sd, em_sd),
+                                index=list(spec.items),
+                                columns=list(spec.items),
+                            ),
+                            use_container_width=True,
+                        )
 
             # -------------------------------------------------
             # Section 3: Descriptive Statistics
@@ -1604,6 +5566,8 @@ if uploaded_file is not None:
             )
 
             tab1, tab2 = st.tabs([t("variable_x_items"), t("variable_y_items")])
+            # Per-item results, reused by the PDF appendix
+            item_stats = {}
 
             with tab1:
                 for col in x_columns:
@@ -1611,7 +5575,10 @@ if uploaded_file is not None:
                         f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem;">{col}</div>',
                         unsafe_allow_html=True,
                     )
-                    stats_dict, freq_df = compute_descriptive_stats(df[col], col)
+                    stats_dict, freq_df = compute_descriptive_stats(
+                        x_data[col], col, weights=weights
+                    )
+                    item_stats[col] = (stats_dict, freq_df)
                     if stats_dict:
                         c1, c2, c3, c4 = st.columns(4)
                         with c1:
@@ -1640,7 +5607,10 @@ if uploaded_file is not None:
                         f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem;">{col}</div>',
                         unsafe_allow_html=True,
                     )
-                    stats_dict, freq_df = compute_descriptive_stats(df[col], col)
+                    stats_dict, freq_df = compute_descriptive_stats(
+                        y_data[col], col, weights=weights
+                    )
+                    item_stats[col] = (stats_dict, freq_df)
                     if stats_dict:
                         c1, c2, c3, c4 = st.columns(4)
                         with c1:
@@ -1671,23 +5641,51 @@ if uploaded_file is not None:
 
             col1, col2 = st.columns(2)
 
+            # Above the threshold, quantiles come from a streaming sketch
+            x_sketch = (
+                cached_quantile_sketch(x_total, quantile_sketch_epsilon)
+                if weights is None and x_total.count() > quantile_sketch_threshold
+                else None
+            )
+            y_sketch = (
+                cached_quantile_sketch(y_total, quantile_sketch_epsilon)
+                if weights is None and y_total.count() > quantile_sketch_threshold
+                else None
+            )
+            if x_sketch is not None or y_sketch is not None:
+                achieved = max(s.relative_error for s in (x_sketch, y_sketch) if s is not None)
+                st.markdown(
+                    f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">ℹ️ {t("sketch_note", "Median and quartiles are approximated with a quantile sketch")} (ε = {quantile_sketch_epsilon:.2%}, {t("sketch_achieved", "achieved rank error")} ≤ {achieved:.3%})</div>',
+                    unsafe_allow_html=True,
+                )
+
             with col1:
                 st.markdown(
                     '<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">X_total</div>',
                     unsafe_allow_html=True,
                 )
                 x_stats_dict, x_freq_df = compute_descriptive_stats(
-                    x_total, "X_total"
+                    x_total, "X_total", sketch=x_sketch, weights=weights
                 )
                 if x_stats_dict:
                     st.metric("Mean", f"{x_stats_dict['Mean']:.4f}")
-                    st.metric("Median", f"{x_stats_dict['Median']:.4f}")
+                    st.metric(
+                        "Median",
+                        f"{x_stats_dict['Median']:.4f}",
+                        help=(
+                            f"Quantile sketch, rank error ≤ {x_stats_dict['Median rank error']:.3%} of n"
+                            if x_sketch is not None
+                            else None
+                        ),
+                    )
                     st.metric("Mode", f"{x_stats_dict['Mode']:.4f}")
                     st.metric("Minimum", f"{x_stats_dict['Minimum']:.4f}")
                     st.metric("Maximum", f"{x_stats_dict['Maximum']:.4f}")
                     st.metric("Standard Deviation", f"{x_stats_dict['Std Dev']:.4f}")
                     st.metric("Variance", f"{x_stats_dict['Variance']:.4f}")
                     st.metric("N", x_stats_dict["N"])
+                    if "Effective N" in x_stats_dict:
+                        st.metric("Effective N (Kish)", f"{x_stats_dict['Effective N']:.1f}")
 
                     with st.expander("Frequency Table: X_total"):
                         st.dataframe(x_freq_df, use_container_width=True)
@@ -1698,21 +5696,121 @@ if uploaded_file is not None:
                     unsafe_allow_html=True,
                 )
                 y_stats_dict, y_freq_df = compute_descriptive_stats(
-                    y_total, "Y_total"
+                    y_total, "Y_total", sketch=y_sketch, weights=weights
                 )
                 if y_stats_dict:
                     st.metric("Mean", f"{y_stats_dict['Mean']:.4f}")
-                    st.metric("Median", f"{y_stats_dict['Median']:.4f}")
+                    st.metric(
+                        "Median",
+                        f"{y_stats_dict['Median']:.4f}",
+                        help=(
+                            f"Quantile sketch, rank error ≤ {y_stats_dict['Median rank error']:.3%} of n"
+                            if y_sketch is not None
+                            else None
+                        ),
+                    )
                     st.metric("Mode", f"{y_stats_dict['Mode']:.4f}")
                     st.metric("Minimum", f"{y_stats_dict['Minimum']:.4f}")
                     st.metric("Maximum", f"{y_stats_dict['Maximum']:.4f}")
                     st.metric("Standard Deviation", f"{y_stats_dict['Std Dev']:.4f}")
                     st.metric("Variance", f"{y_stats_dict['Variance']:.4f}")
                     st.metric("N", y_stats_dict["N"])
+                    if "Effective N" in y_stats_dict:
+                        st.metric("Effective N (Kish)", f"{y_stats_dict['Effective N']:.1f}")
 
                     with st.expander("Frequency Table: Y_total"):
                         st.dataframe(y_freq_df, use_container_width=True)
 
+            # Incremental update: merge this upload into a saved summary
+            with st.expander(t("summary_title", "Incremental Summary (live surveys)")):
+                batch_summary = ResponseSummary.from_batch(
+                    x_total,
+                    y_total,
+                    meta={"X_total": x_spec.describe(), "Y_total": y_spec.describe()},
+                )
+                saved_summary_file = st.file_uploader(
+                    t("summary_resume", "Resume from a saved summary (JSON)"),
+                    type=["json"],
+                    key="summary_resume",
+                )
+                running_summary = batch_summary
+                if saved_summary_file is not None:
+                    try:
+                        saved_summary = ResponseSummary.from_json(
+                            saved_summary_file.getvalue().decode("utf-8")
+                        )
+                        if saved_summary.meta and saved_summary.meta != batch_summary.meta:
+                            st.markdown(
+                                f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">⚠️ {t("summary_meta_mismatch", "The saved summary was scored differently")}: {saved_summary.meta}</div>',
+                                unsafe_allow_html=True,
+                            )
+                        running_summary = saved_summary.merge(batch_summary)
+                    except (ValueError, KeyError) as e:
+                        st.markdown(
+                            f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">❌ {t("summary_invalid", "Invalid summary file")}: {str(e)}</div>',
+                            unsafe_allow_html=True,
+                        )
+
+                running_r, running_p = running_summary.pearson()
+                c1, c2, c3 = st.columns(3)
+                with c1:
+                    st.metric("N (pairs)", running_summary.joint["n"])
+                with c2:
+                    st.metric("Pearson Correlation (r)", f"{running_r:.4f}")
+                with c3:
+                    st.metric("p-value", f"{running_p:.4f}")
+                for name in SUMMARY_VARIABLES:
+                    summary_stats, summary_freq = running_summary.descriptives(name)
+                    if summary_stats:
+                        st.dataframe(
+                            pd.DataFrame([summary_stats]),
+                            hide_index=True,
+                            use_container_width=True,
+                        )
+                        st.dataframe(summary_freq, hide_index=True, use_container_width=True)
+                st.download_button(
+                    label=t("summary_save", "Save summary (JSON)"),
+                    key="download_summary",
+                    data=running_summary.to_json(),
+                    file_name="survey_summary.json",
+                    mime="application/json",
+                )
+
+            # Scale reliability (Cronbach's alpha)
+            st.markdown(
+                f'<p class="sub-section">{t("reliability_title", "Scale Reliability")}</p>',
+                unsafe_allow_html=True,
+            )
+
+            reliability = {}
+            col1, col2 = st.columns(2)
+            for column, name, item_data in (
+                (col1, "X_total", reverse_code_items(x_data, x_spec)),
+                (col2, "Y_total", reverse_code_items(y_data, y_spec)),
+            ):
+                with column:
+                    st.markdown(
+                        f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{name}</div>',
+                        unsafe_allow_html=True,
+                    )
+                    rel_summary, rel_items = compute_reliability(item_data)
+                    reliability[name] = rel_summary
+                    if rel_summary is None:
+                        st.markdown(
+                            f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">ℹ️ {t("reliability_unavailable", "Reliability needs at least 2 items and 3 complete responses.")}</div>',
+                            unsafe_allow_html=True,
+                        )
+                        continue
+                    st.metric("Cronbach's Alpha", f"{rel_summary['Alpha']:.4f}")
+                    st.metric("Items (k)", rel_summary["Items"])
+                    st.metric("Complete Responses", rel_summary["N"])
+                    st.markdown(
+                        f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">ℹ️ Internal consistency is {interpret_alpha(rel_summary["Alpha"])}.</div>',
+                        unsafe_allow_html=True,
+                    )
+                    with st.expander(f"Item Analysis: {name}"):
+                        st.dataframe(rel_items, use_container_width=True)
+
             # -------------------------------------------------
             # Section 4: Visualizations
             # -------------------------------------------------
@@ -1721,79 +5819,134 @@ if uploaded_file is not None:
                 unsafe_allow_html=True,
             )
 
-            col1, col2 = st.columns(2)
+            x_summary = composite_chart_summaries(
+                x_total, quantile_sketch_epsilon if x_sketch is not None else None
+            )
+            y_summary = composite_chart_summaries(
+                y_total, quantile_sketch_epsilon if y_sketch is not None else None
+            )
+            chart_summaries = {"X_total": x_summary, "Y_total": y_summary}
+
+            if chart_mode == CHART_MODE_INTERACTIVE:
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    st.markdown(
+                        f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{t("hist_x")}</div>',
+                        unsafe_allow_html=True,
+                    )
+                    if x_summary["hist"] is not None:
+                        st.vega_lite_chart(
+                            histogram_chart_spec(x_summary["hist"], "X_total", "#60a5fa"),
+                            use_container_width=True,
+                        )
+
+                with col2:
+                    st.markdown(
+                        f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{t("hist_y")}</div>',
+                        unsafe_allow_html=True,
+                    )
+                    if y_summary["hist"] is not None:
+                        st.vega_lite_chart(
+                            histogram_chart_spec(y_summary["hist"], "Y_total", "#f97373"),
+                            use_container_width=True,
+                        )
 
-            with col1:
                 st.markdown(
-                    f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{t("hist_x")}</div>',
+                    f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{t("boxplots")}</div>',
                     unsafe_allow_html=True,
                 )
-                fig1, ax1 = plt.subplots(figsize=(8, 6))
-                ax1.hist(
-                    x_total.dropna(),
-                    bins=20,
-                    edgecolor="black",
-                    alpha=0.7,
-                    color="#60a5fa",
-                )
-                ax1.set_xlabel("X_total")
-                ax1.set_ylabel("Frequency")
-                ax1.set_title("Distribution of X_total")
-                ax1.grid(True, alpha=0.3)
-                st.pyplot(fig1)
-                plt.close(fig1)
+                box_summaries = {
+                    name: summary["box"]
+                    for name, summary in chart_summaries.items()
+                    if summary["box"] is not None
+                }
+                if box_summaries:
+                    st.vega_lite_chart(
+                        boxplot_chart_spec(box_summaries), use_container_width=True
+                    )
 
-            with col2:
                 st.markdown(
-                    f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{t("hist_y")}</div>',
+                    f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{t("scatter")}</div>',
                     unsafe_allow_html=True,
                 )
-                fig2, ax2 = plt.subplots(figsize=(8, 6))
-                ax2.hist(
-                    y_total.dropna(),
-                    bins=20,
-                    edgecolor="black",
-                    alpha=0.7,
-                    color="#f97373",
-                )
-                ax2.set_xlabel("Y_total")
-                ax2.set_ylabel("Frequency")
-                ax2.set_title("Distribution of Y_total")
-                ax2.grid(True, alpha=0.3)
-                st.pyplot(fig2)
-                plt.close(fig2)
+                xy_grid = density_grid(x_total, y_total)
+                if xy_grid is not None:
+                    st.vega_lite_chart(
+                        density_chart_spec(xy_grid, "X_total", "Y_total", regression),
+                        use_container_width=True,
+                    )
+            else:
+                col1, col2 = st.columns(2)
 
-            st.markdown(
-                f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{t("boxplots")}</div>',
-                unsafe_allow_html=True,
-            )
-            fig3, (ax3, ax4) = plt.subplots(1, 2, figsize=(12, 6))
-            ax3.boxplot(x_total.dropna(), vert=True)
-            ax3.set_ylabel("X_total")
-            ax3.set_title("Boxplot: X_total")
-            ax3.grid(True, alpha=0.3)
+                with col1:
+                    st.markdown(
+                        f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{t("hist_x")}</div>',
+                        unsafe_allow_html=True,
+                    )
+                    fig1, ax1 = plt.subplots(figsize=(8, 6))
+                    if x_summary["hist"] is not None:
+                        plot_histogram(ax1, x_summary["hist"], "#60a5fa")
+                    ax1.set_xlabel("X_total")
+                    ax1.set_ylabel("Frequency")
+                    ax1.set_title("Distribution of X_total")
+                    ax1.grid(True, alpha=0.3)
+                    st.pyplot(fig1)
+                    plt.close(fig1)
 
-            ax4.boxplot(y_total.dropna(), vert=True)
-            ax4.set_ylabel("Y_total")
-            ax4.set_title("Boxplot: Y_total")
-            ax4.grid(True, alpha=0.3)
+                with col2:
+                    st.markdown(
+                        f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{t("hist_y")}</div>',
+                        unsafe_allow_html=True,
+                    )
+                    fig2, ax2 = plt.subplots(figsize=(8, 6))
+                    if y_summary["hist"] is not None:
+                        plot_histogram(ax2, y_summary["hist"], "#f97373")
+                    ax2.set_xlabel("Y_total")
+                    ax2.set_ylabel("Frequency")
+                    ax2.set_title("Distribution of Y_total")
+                    ax2.grid(True, alpha=0.3)
+                    st.pyplot(fig2)
+                    plt.close(fig2)
 
-            st.pyplot(fig3)
-            plt.close(fig3)
+                st.markdown(
+                    f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{t("boxplots")}</div>',
+                    unsafe_allow_html=True,
+                )
+                fig3, (ax3, ax4) = plt.subplots(1, 2, figsize=(12, 6))
+                if x_summary["box"] is not None:
+                    plot_boxplot(ax3, x_summary["box"])
+                ax3.set_ylabel("X_total")
+                ax3.set_title("Boxplot: X_total")
+                ax3.grid(True, alpha=0.3)
 
-            st.markdown(
-                f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{t("scatter")}</div>',
-                unsafe_allow_html=True,
-            )
-            fig4, ax5 = plt.subplots(figsize=(10, 6))
-            valid_data = pd.DataFrame({"X": x_total, "Y": y_total}).dropna()
-            ax5.scatter(valid_data["X"], valid_data["Y"], alpha=0.6, color="#22c55e")
-            ax5.set_xlabel("X_total")
-            ax5.set_ylabel("Y_total")
-            ax5.set_title("Scatter Plot: X_total vs Y_total")
-            ax5.grid(True, alpha=0.3)
-            st.pyplot(fig4)
-            plt.close(fig4)
+                if y_summary["box"] is not None:
+                    plot_boxplot(ax4, y_summary["box"])
+                ax4.set_ylabel("Y_total")
+                ax4.set_title("Boxplot: Y_total")
+                ax4.grid(True, alpha=0.3)
+
+                st.pyplot(fig3)
+                plt.close(fig3)
+
+                st.markdown(
+                    f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{t("scatter")}</div>',
+                    unsafe_allow_html=True,
+                )
+                fig4, ax5 = plt.subplots(figsize=(10, 6))
+                density = plot_xy_scatter(
+                    ax5, x_total, y_total, scatter_bin_threshold
+                )
+                if density is not None:
+                    fig4.colorbar(density, ax=ax5, label="Count")
+                if regression is not None:
+                    plot_regression(ax5, regression)
+                ax5.set_xlabel("X_total")
+                ax5.set_ylabel("Y_total")
+                ax5.set_title("Scatter Plot: X_total vs Y_total")
+                ax5.grid(True, alpha=0.3)
+                st.pyplot(fig4)
+                plt.close(fig4)
 
             # -------------------------------------------------
             # Section 5: Association Analysis
@@ -1885,15 +6038,36 @@ if uploaded_file is not None:
                     ),
                 )
 
-                if method_choice == "Spearman":
-                    correlation_r, correlation_p = stats.spearmanr(
-                        valid_data["X"], valid_data["Y"]
+                if weights is not None:
+                    correlation_r, correlation_p, n_eff = weighted_correlation(
+                        x_total, y_total, weights, method_choice
+                    )
+                    corr_type = method_choice
+                    st.markdown(
+                        f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">⚖️ {t("weighted_note", "Weighted by")} {weight_column} ({t("effective_n", "effective N")} = {n_eff:.1f})</div>',
+                        unsafe_allow_html=True,
+                    )
+                elif method_choice == "Spearman" and len(valid_data) > quantile_sketch_threshold:
+                    rank_sketches = (
+                        cached_quantile_sketch(valid_data["X"], quantile_sketch_epsilon),
+                        cached_quantile_sketch(valid_data["Y"], quantile_sketch_epsilon),
+                    )
+                    correlation_r, correlation_p = sketch_spearman(
+                        valid_data["X"], valid_data["Y"], *rank_sketches
                     )
                     corr_type = "Spearman"
-                else:
-                    correlation_r, correlation_p = stats.pearsonr(
+                    achieved = max(s.relative_error for s in rank_sketches)
+                    st.markdown(
+                        f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">ℹ️ {t("sketch_spearman_note", "Spearman ranks approximated with a quantile sketch")} (ε = {quantile_sketch_epsilon:.2%}, {t("sketch_achieved", "achieved rank error")} ≤ {achieved:.3%})</div>',
+                        unsafe_allow_html=True,
+                    )
+                elif method_choice == "Spearman":
+                    correlation_r, correlation_p = spearman_correlation(
                         valid_data["X"], valid_data["Y"]
                     )
+                    corr_type = "Spearman"
+                else:
+                    correlation_r, correlation_p = pearson_from_moments(xy_stats)
                     corr_type = "Pearson"
 
                 c1, c2, c3 = st.columns(3)
@@ -1909,7 +6083,12 @@ if uploaded_file is not None:
                         strength,
                         sig_text,
                         interpretation,
-                    ) = interpret_correlation(correlation_r, correlation_p)
+                    ) = interpret_correlation(
+                        # One test (X_total vs Y_total): a family of one needs
+                        # no correction, so the p-value is reported as is
+                        correlation_r,
+                        correlation_p,
+                    )
                     st.metric("Strength", strength.title())
 
                 st.markdown(
@@ -1939,6 +6118,208 @@ if uploaded_file is not None:
                 """
                 st.markdown(interpretation_details, unsafe_allow_html=True)
 
+                # Simple linear regression (same sufficient statistics as r)
+                if regression is not None:
+                    st.markdown(
+                        f'<p class="sub-section">{t("regression_title", "Linear Regression: Y_total on X_total")}</p>',
+                        unsafe_allow_html=True,
+                    )
+                    c1, c2, c3, c4 = st.columns(4)
+                    with c1:
+                        st.metric("Slope (b)", f"{regression['slope']:.4f}")
+                        st.metric("SE (b)", f"{regression['se_slope']:.4f}")
+                    with c2:
+                        st.metric("Intercept (a)", f"{regression['intercept']:.4f}")
+                        st.metric("SE (a)", f"{regression['se_intercept']:.4f}")
+                    with c3:
+                        st.metric("R²", f"{regression['r_squared']:.4f}")
+                        st.metric("Adjusted R²", f"{regression['adj_r_squared']:.4f}")
+                    with c4:
+                        st.metric("Residual Std. Error", f"{regression['residual_se']:.4f}")
+                        st.metric("F", f"{regression['f_stat']:.4f}")
+
+                    lo, hi = regression["slope_ci"]
+                    fitted, residuals, residual_checks = regression_residuals(
+                        regression, x_total, y_total
+                    )
+                    regression_details = f"""
+                <div class="glass-badge-inline" style="display: block; margin: 10px 0; padding: 16px;">
+                <ul style="margin: 0; padding-left: 20px;">
+                <li><strong>Equation:</strong> Y_total = {regression['intercept']:.4f} + {regression['slope']:.4f} × X_total</li>
+                <li><strong>{regression['confidence']:.0%} CI for slope:</strong> [{lo:.4f}, {hi:.4f}]</li>
+                <li><strong>Slope t-test:</strong> t({regression['df']}) = {regression['t_slope']:.4f}, p = {regression['p_slope']:.4f}</li>
+                <li><strong>Intercept t-test:</strong> t({regression['df']}) = {regression['t_intercept']:.4f}, p = {regression['p_intercept']:.4f}</li>
+                <li><strong>Max leverage:</strong> {regression['max_leverage']:.4f} (rule of thumb: {4 / regression['n']:.4f})</li>
+                <li><strong>Residual normality ({residual_checks['normality_test']}):</strong> statistic = {residual_checks['normality_stat']:.4f}, p = {residual_checks['normality_p']:.4f}</li>
+                <li><strong>Max Cook's distance:</strong> {residual_checks['max_cooks_d']:.4f} ({residual_checks['influential']} above 4/n = {4 / regression['n']:.4f})</li>
+                </ul>
+                </div>
+                """
+                    st.markdown(regression_details, unsafe_allow_html=True)
+
+                    st.markdown(
+                        f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{t("residual_plot", "Residuals vs Fitted")}</div>',
+                        unsafe_allow_html=True,
+                    )
+                    fig_residuals, ax_residuals = plt.subplots(figsize=(10, 4))
+                    density = plot_xy_scatter(
+                        ax_residuals, fitted, residuals, scatter_bin_threshold, color="#6366f1"
+                    )
+                    if density is not None:
+                        fig_residuals.colorbar(density, ax=ax_residuals, label="Count")
+                    ax_residuals.axhline(0, color="#dc2626", linewidth=1)
+                    ax_residuals.set_xlabel("Fitted Y_total")
+                    ax_residuals.set_ylabel("Residual")
+                    ax_residuals.grid(True, alpha=0.3)
+                    st.pyplot(fig_residuals)
+                    plt.close(fig_residuals)
+
+                # Grouped / stratified analysis
+                st.markdown(
+                    f'<p class="sub-section">{t("grouped_title", "Grouped Analysis")}</p>',
+                    unsafe_allow_html=True,
+                )
+                group_column = st.selectbox(
+                    t("group_by", "Group by"),
+                    options=[None] + [
+                        c for c in df.columns if c not in x_columns + y_columns
+                    ],
+                    format_func=lambda c: "—" if c is None else str(c),
+                    key="group_column",
+                )
+                if group_column is not None:
+                    n_groups = df[group_column].nunique()
+                    if n_groups > MAX_GROUPS:
+                        st.markdown(
+                            f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">⚠️ {t("too_many_groups", "Too many groups")}: {n_groups} &gt; {MAX_GROUPS}</div>',
+                            unsafe_allow_html=True,
+                        )
+                    else:
+                        group_table, group_test = grouped_analysis(
+                            x_total, y_total, df[group_column], corr_type, p_adjust_method
+                        )
+                        if group_table is not None:
+                            st.dataframe(group_table, use_container_width=True)
+                            bundle_tables["grouped"] = group_table.reset_index()
+                        if group_test is not None:
+                            bundle_tables["grouped_test"] = pd.DataFrame([group_test])
+                            test_text = (
+                                f"Fisher z test for equal {corr_type} correlations across "
+                                f"{group_test['groups']} groups: Q = {group_test['Q']:.4f}, "
+                                f"df = {group_test['df']}, p = {group_test['p-value']:.4f}"
+                            )
+                            if "z" in group_test:
+                                test_text += f" (z = {group_test['z']:.4f})"
+                            st.markdown(
+                                f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">📊 {test_text}</div>',
+                                unsafe_allow_html=True,
+                            )
+
+                # Partial correlation controlling for covariates
+                st.markdown(
+                    f'<p class="sub-section">{t("partial_title", "Partial Correlation")}</p>',
+                    unsafe_allow_html=True,
+                )
+                covariates = st.multiselect(
+                    t("covariates", "Control for (covariates)"),
+                    options=[
+                        c
+                        for c in df.columns
+                        if c not in x_columns + y_columns and pd.api.types.is_numeric_dtype(df[c])
+                    ],
+                    key="covariates",
+                )
+                if covariates:
+                    partial_data = pd.concat(
+                        [
+                            pd.DataFrame({"X_total": x_total, "Y_total": y_total}),
+                            dataset.numeric_frame(covariates),
+                        ],
+                        axis=1,
+                    )
+                    complete = partial_data.dropna()
+                    if len(complete) < partial_data.shape[1] + 2:
+                        st.markdown(
+                            f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">⚠️ {t("insufficient_data")}</div>',
+                            unsafe_allow_html=True,
+                        )
+                    else:
+                        partial_rows = []
+                        for partial_method in ("Pearson", "Spearman"):
+                            pcor, spcor, pcor_p, partial_n = partial_correlations(
+                                partial_data, partial_method
+                            )
+                            zero_order = (
+                                spearman_correlation
+                                if partial_method == "Spearman"
+                                else stats.pearsonr
+                            )(complete["X_total"], complete["Y_total"])[0]
+                            partial_rows.append(
+                                {
+                                    "Method": partial_method,
+                                    "N": partial_n,
+                                    "Zero-order r": zero_order,
+                                    "Partial r": pcor.loc["X_total", "Y_total"],
+                                    "Semi-partial r (Y | covariates removed from X)":
+                                        spcor.loc["Y_total", "X_total"],
+                                    "Semi-partial r (X | covariates removed from Y)":
+                                        spcor.loc["X_total", "Y_total"],
+                                    "p-value": pcor_p.loc["X_total", "Y_total"],
+                                    "df": partial_n - 2 - len(covariates),
+                                }
+                            )
+                        st.dataframe(
+                            pd.DataFrame(partial_rows), hide_index=True, use_container_width=True
+                        )
+                        bundle_tables["partial"] = pd.DataFrame(partial_rows).assign(
+                            Covariates=", ".join(covariates)
+                        )
+                        with st.expander(t("partial_matrix", "Full partial correlation matrix")):
+                            st.dataframe(pcor, use_container_width=True)
+
+                # Item-level association: crosstabs of single Likert items
+                st.markdown(
+                    f'<p class="sub-section">{t("item_association_title", "Item-level Association")}</p>',
+                    unsafe_allow_html=True,
+                )
+                x_items = reverse_code_items(x_data, x_spec)
+                y_items = reverse_code_items(y_data, y_spec)
+                x_ordinal = [c for c in x_items.columns if x_items[c].nunique() <= CONTINGENCY_MAX_CATEGORIES]
+                y_ordinal = [c for c in y_items.columns if y_items[c].nunique() <= CONTINGENCY_MAX_CATEGORIES]
+                skipped = [c for c in list(x_items.columns) + list(y_items.columns) if c not in x_ordinal + y_ordinal]
+                if skipped:
+                    st.markdown(
+                        f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">ℹ️ {t("association_skipped", "Skipped (more than {0} distinct values)").format(CONTINGENCY_MAX_CATEGORIES)}: {", ".join(skipped)}</div>',
+                        unsafe_allow_html=True,
+                    )
+                if x_ordinal and y_ordinal:
+                    (
+                        association,
+                        crosstabs,
+                        x_categories,
+                        y_categories,
+                    ) = item_association(x_items[x_ordinal], y_items[y_ordinal], p_adjust_method)
+                    st.dataframe(association, hide_index=True, use_container_width=True)
+                    bundle_tables["item_association"] = association
+                    bundle_tables["item_crosstabs"] = crosstab_records(
+                        crosstabs, x_ordinal, y_ordinal, x_categories, y_categories
+                    )
+                    pair = st.selectbox(
+                        t("association_pair", "Crosstab"),
+                        options=list(association.index),
+                        format_func=lambda i: f"{association.at[i, 'X item']} × {association.at[i, 'Y item']}",
+                        key="association_pair",
+                    )
+                    x_index, y_index = divmod(pair, len(y_ordinal))
+                    st.dataframe(
+                        pd.DataFrame(
+                            crosstabs[x_index, y_index, : len(x_categories[x_index]), : len(y_categories[y_index])],
+                            index=pd.Index(x_categories[x_index], name=x_ordinal[x_index]),
+                            columns=pd.Index(y_categories[y_index], name=y_ordinal[y_index]),
+                        ),
+                        use_container_width=True,
+                    )
+
                 # -------------------------------------------------
                 # Section 6: PDF Report Export
                 # -------------------------------------------------
@@ -1947,7 +6328,32 @@ if uploaded_file is not None:
                     unsafe_allow_html=True,
                 )
 
-                pdf_buffer = generate_pdf_report(
+                col_format, col_dpi = st.columns(2)
+                with col_format:
+                    chart_format = st.selectbox(
+                        t("pdf_chart_format", "Chart format"),
+                        options=list(PDF_CHART_FORMATS),
+                        index=list(PDF_CHART_FORMATS).index(PDF_CHART_FORMAT),
+                        format_func=lambda k: t(f"pdf_chart_{k}", PDF_CHART_FORMATS[k]),
+                        key="pdf_chart_format",
+                    )
+                with col_dpi:
+                    chart_dpi = st.slider(
+                        t("pdf_chart_dpi", "Raster resolution (DPI)"),
+                        min_value=50,
+                        max_value=300,
+                        value=PDF_CHART_DPI,
+                        step=25,
+                        disabled=chart_format == "vector",
+                        key="pdf_chart_dpi",
+                    )
+                include_appendix = st.checkbox(
+                    t("pdf_item_appendix", "Include item-level appendix (descriptives, frequencies and a chart per item)"),
+                    value=False,
+                    key="pdf_item_appendix",
+                )
+
+                pdf_args = (
                     df,
                     x_columns,
                     y_columns,
@@ -1966,13 +6372,89 @@ if uploaded_file is not None:
                     if "y_shapiro_stat" in locals() and y_shapiro_stat is not None else None,
                     lang_code,
                 )
+                pdf_kwargs = {
+                    "scatter_bin_threshold": scatter_bin_threshold,
+                    "chart_summaries": chart_summaries,
+                    "reliability": reliability,
+                    "composite_specs": {"X_total": x_spec, "Y_total": y_spec},
+                    "regression": regression,
+                    "weight_column": weight_column,
+                    "chart_format": chart_format,
+                    "chart_dpi": chart_dpi,
+                    "item_stats": item_stats if include_appendix else None,
+                }
+                # PDF dibangun di thread latar belakang; hasilnya diambil pada rerun berikutnya
+                pdf_key = fingerprint(
+                    dataset.key,
+                    *pdf_args[1:],
+                    scatter_bin_threshold,
+                    reliability,
+                    x_spec,
+                    y_spec,
+                    weight_column,
+                    chart_format,
+                    chart_dpi,
+                    include_appendix,
+                )
+                pdf_job = submit_job(
+                    "pdf",
+                    pdf_key,
+                    generate_pdf_report,
+                    *pdf_args,
+                    **pdf_kwargs,
+                )
 
-                st.download_button(
-                    label=t("download_pdf"),
-                    key="download_pdf",
-                    data=pdf_buffer,
-                    file_name="Statistics_Survey_Analysis_Report.pdf",
-                    mime="application/pdf",
+                if not pdf_job.done():
+                    job_progress("pdf", t("pdf_building", "Building PDF report…"))
+                elif pdf_job.future.exception() is not None:
+                    st.markdown(
+                        f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">❌ {t("pdf_failed", "Failed to build the PDF report")}: {pdf_job.future.exception()}</div>',
+                        unsafe_allow_html=True,
+                    )
+                else:
+                    pdf_file = pdf_job.result()
+                    pdf_file.seek(0)
+                    st.download_button(
+                        label=t("download_pdf"),
+                        key="download_pdf",
+                        data=pdf_file.read(),
+                        file_name="Statistics_Survey_Analysis_Report.pdf",
+                        mime="application/pdf",
+                    )
+
+                # Inputs of the results bundle, offered once every section has run
+                bundle_meta = bundle_metadata(
+                    dataset.key,
+                    uploaded_file.name,
+                    x_columns,
+                    y_columns,
+                    {"X_total": x_spec, "Y_total": y_spec},
+                    corr_type,
+                    p_adjust_method,
+                    weight_column,
+                    int(flags["Flagged"].sum()) if exclude_flagged else 0,
+                )
+                bundle_args = (
+                    x_columns,
+                    item_stats,
+                    {
+                        "X_total": (x_stats_dict, x_freq_df),
+                        "Y_total": (y_stats_dict, y_freq_df),
+                    },
+                    {
+                        "X_total": (x_shapiro_stat, x_shapiro_p, x_normality_text),
+                        "Y_total": (y_shapiro_stat, y_shapiro_p, y_normality_text),
+                    },
+                    {
+                        "Variables": "X_total ~ Y_total",
+                        "Method": corr_type,
+                        "r": correlation_r,
+                        # Single test: unadjusted, as used by the Interpretation
+                        "p-value": correlation_p,
+                        "N": len(valid_data),
+                        "Weighted": weight_column is not None,
+                        "Interpretation": interpretation,
+                    },
                 )
             else:
                 st.markdown(
@@ -1984,7 +6466,242 @@ if uploaded_file is not None:
                 f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">⚠️ {t("select_warning")}</div>',
                 unsafe_allow_html=True,
             )
-    else:
+
+        # -------------------------------------------------
+        # Section 7: Construct Correlation Matrix
+        # -------------------------------------------------
+        st.markdown(
+            f'<p class="section-header">{t("construct_title", "7. Construct Correlation Matrix")}</p>',
+            unsafe_allow_html=True,
+        )
+
+        with st.expander(t("construct_define", "Define constructs"), expanded=False):
+            construct_count = st.number_input(
+                t("construct_count", "Number of constructs"),
+                min_value=0,
+                max_value=50,
+                value=0,
+                step=1,
+                key="construct_count",
+            )
+            c1, c2 = st.columns(2)
+            with c1:
+                construct_scale_min = st.number_input(
+                    t("scale_min", "Scale minimum"), value=1.0, key="construct_scale_min"
+                )
+            with c2:
+                construct_scale_max = st.number_input(
+                    t("scale_max", "Scale maximum"), value=5.0, key="construct_scale_max"
+                )
+
+            construct_specs = {}
+            duplicate_names = []
+            for i in range(int(construct_count)):
+                c1, c2, c3 = st.columns([1, 2, 2])
+                with c1:
+                    name = st.text_input(
+                        t("construct_name", "Name"),
+                        value=f"C{i + 1}",
+                        key=f"construct_name_{i}",
+                    )
+                with c2:
+                    items = st.multiselect(
+                        t("construct_items", "Items"),
+                        options=df.columns.tolist(),
+                        key=f"construct_items_{i}",
+                    )
+                with c3:
+                    reverse = st.multiselect(
+                        t("reverse_items", "Reverse-coded items"),
+                        options=items,
+                        key=f"construct_reverse_{i}",
+                    )
+                name = name.strip()
+                if name in construct_specs:
+                    # Nama dipakai sebagai kunci: konstruk kedua dengan nama sama dilewati
+                    duplicate_names.append(name)
+                elif name and items:
+                    construct_specs[name] = CompositeSpec(
+                        items=tuple(items),
+                        reverse=tuple(item for item in items if item in reverse),
+                        scale_min=float(construct_scale_min),
+                        scale_max=float(construct_scale_max),
+                    )
+            if duplicate_names:
+                st.markdown(
+                    f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">⚠️ {t("construct_duplicate", "Duplicate construct names (later entries skipped)")}: {", ".join(dict.fromkeys(duplicate_names))}</div>',
+                    unsafe_allow_html=True,
+                )
+
+        if len(construct_specs) >= 2:
+            construct_method = st.radio(
+                t("corr_choice"),
+                options=["Pearson", "Spearman"],
+                horizontal=True,
+                key="construct_method",
+            )
+            construct_scores = pd.DataFrame(
+                {
+                    name: cached_composite(dataset.key, spec, _dataset=dataset)
+                    for name, spec in construct_specs.items()
+                }
+            )
+            (
+                construct_desc,
+                construct_r,
+                construct_p,
+                construct_n,
+            ) = construct_matrix_analysis(
+                construct_scores, construct_method, p_adjust_method
+            )
+
+            st.markdown(
+                f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{construct_method} Correlation (r)</div>',
+                unsafe_allow_html=True,
+            )
+            st.dataframe(
+                construct_r.style.format("{:.3f}").background_gradient(
+                    cmap="RdBu_r", vmin=-1, vmax=1
+                ),
+                use_container_width=True,
+            )
+            p_tab_label = (
+                "p-values"
+                if p_adjust_method == "none"
+                else f"p-values ({P_ADJUST_METHODS[p_adjust_method]})"
+            )
+            tab_p, tab_n, tab_desc = st.tabs(
+                [p_tab_label, "Pairwise N", t("descriptive_title")]
+            )
+            construct_pairs = matrix_pairs(
+                construct_r, construct_p, construct_n, p_adjust_method
+            )
+            with tab_p:
+                st.dataframe(construct_p.style.format("{:.4f}"), use_container_width=True)
+                st.dataframe(construct_pairs, use_container_width=True, hide_index=True)
+            with tab_n:
+                st.dataframe(construct_n, use_container_width=True)
+            with tab_desc:
+                st.dataframe(construct_desc, use_container_width=True)
+            bundle_tables["construct_matrix"] = construct_pairs.assign(
+                Method=construct_method
+            )
+            bundle_tables["construct_descriptives"] = construct_desc.rename_axis(
+                "Construct"
+            ).reset_index()
+        else:
+            st.markdown(
+                f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">ℹ️ {t("construct_hint", "Define at least two constructs to compute the correlation matrix.")}</div>',
+                unsafe_allow_html=True,
+            )
+
+        # -------------------------------------------------
+        # Section 8: Wave Comparison (same questionnaire, several files)
+        # -------------------------------------------------
+        if x_columns and y_columns:
+            st.markdown(
+                f'<p class="section-header">{t("waves_title", "8. Wave Comparison")}</p>',
+                unsafe_allow_html=True,
+            )
+            wave_files = st.file_uploader(
+                t("waves_upload", "Upload later waves (same questionnaire)"),
+                type=["csv", "xlsx", "xls", "gz", "xz", "zip"],
+                accept_multiple_files=True,
+                key="wave_files",
+            )
+            # Rows keyed by content (dataset key): two uploads that share a file
+            # name stay separate, re-uploading the same bytes adds nothing
+            wave_rows = {
+                dataset.key: {
+                    "Wave": uploaded_file.name,
+                    **wave_statistics(dataset.key, x_spec, y_spec, _dataset=dataset),
+                }
+            }
+            for name, key, entry in open_waves(wave_files or []):
+                if key in wave_rows:
+                    st.markdown(
+                        f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">ℹ️ {name}: {t("waves_duplicate", "same data as")} {wave_rows[key]["Wave"]}</div>',
+                        unsafe_allow_html=True,
+                    )
+                    continue
+                missing_items = [
+                    c for c in x_spec.items + y_spec.items if c not in entry.frame.columns
+                ]
+                if missing_items:
+                    st.markdown(
+                        f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">⚠️ {name}: {t("waves_missing", "missing columns")} {", ".join(missing_items)}</div>',
+                        unsafe_allow_html=True,
+                    )
+                    continue
+                labels = {row["Wave"] for row in wave_rows.values()}
+                label, copy = name, 1
+                while label in labels:
+                    copy += 1
+                    label = f"{name} ({copy})"
+                wave_rows[key] = {
+                    "Wave": label,
+                    **wave_statistics(key, x_spec, y_spec, _dataset=entry),
+                }
+
+            waves = pd.DataFrame(list(wave_rows.values())).set_index("Wave")
+            waves.index.name = t("waves_wave", "Wave")
+            if weights is not None or (exclude_flagged and flags["Flagged"].any()):
+                st.markdown(
+                    f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">ℹ️ {t("waves_unadjusted", "Wave statistics are unweighted and use every respondent, so the first row can differ from Sections 3–5 (survey weights and the respondent exclusion are not applied to the waves).")}</div>',
+                    unsafe_allow_html=True,
+                )
+            st.dataframe(waves, use_container_width=True)
+            bundle_tables["waves"] = waves.reset_index()
+            if len(waves) > 1:
+                st.markdown(
+                    f'<div class="text-badge" style="font-weight: bold; font-size: 1.1rem; margin-bottom: 10px;">{t("waves_deltas", "Wave-over-wave changes")}</div>',
+                    unsafe_allow_html=True,
+                )
+                bundle_tables["wave_deltas"] = wave_deltas(waves, p_adjust_method)
+                st.dataframe(
+                    bundle_tables["wave_deltas"],
+                    hide_index=True,
+                    use_container_width=True,
+                )
+            else:
+                st.markdown(
+                    f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">ℹ️ {t("waves_hint", "Upload at least one more wave to compare.")}</div>',
+                    unsafe_allow_html=True,
+                )
+
+        # -------------------------------------------------
+        # Section 9: Results Bundle (machine-readable export)
+        # -------------------------------------------------
+        if bundle_args is not None:
+            st.markdown(
+                f'<p class="section-header">{t("bundle_title", "9. Results Bundle")}</p>',
+                unsafe_allow_html=True,
+            )
+            bundle_format = st.radio(
+                t("bundle_format", "Format"),
+                options=list(BUNDLE_FORMATS),
+                format_func=lambda k: t(f"bundle_{k}", BUNDLE_FORMATS[k]),
+                horizontal=True,
+                key="bundle_format",
+            )
+            st.download_button(
+                label=t("bundle_download", "Download results bundle"),
+                key="download_bundle",
+                data=results_bundle(
+                    bundle_format,
+                    bundle_meta,
+                    *bundle_args,
+                    regression=regression,
+                    extra=bundle_tables,
+                ),
+                file_name=f"Statistics_Survey_Results.{bundle_format}",
+                mime=(
+                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    if bundle_format == "xlsx"
+                    else "application/zip"
+                ),
+            )
+    elif not empty_archive:
         st.markdown(
             f'<div class="glass-badge-inline" style="display: inline-block; margin: 10px 0;">❌ {t("error_loading")}</div>',
             unsafe_allow_html=True,